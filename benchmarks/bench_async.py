@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for DrGPT
+
+Compares running N completions serially through the synchronous
+``generate_completion`` path with fanning them out through
+``AIInterface.agather`` against a local mock SSE server.
+
+Usage:
+    python benchmarks/bench_async.py [--requests 200] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import AIInterface, OpenAIProvider  # noqa: E402
+
+
+def make_interface(base_url: str) -> AIInterface:
+    """Build an AIInterface talking only to the mock server"""
+    ai = AIInterface()
+    ai.providers["openai"] = OpenAIProvider("mock-key", base_url)
+    return ai
+
+
+def run(requests_count: int, concurrency: int, settings: MockSettings) -> dict:
+    """Run the sync and async paths and return timings"""
+    prompts = [f"prompt {index}" for index in range(requests_count)]
+    params = {"provider": "openai", "model": "mock", "use_cache": False}
+    
+    with MockProviderServer(settings) as server:
+        ai = make_interface(server.base_url)
+        
+        start = time.perf_counter()
+        serial = ["".join(ai.generate_completion(prompt, **params)) for prompt in prompts]
+        serial_s = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        gathered = asyncio.run(ai.agather(prompts, concurrency=concurrency, **params))
+        gathered_s = time.perf_counter() - start
+    
+    assert serial == gathered, "async results differ from sync results"
+    return {
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "sync_s": round(serial_s, 4),
+        "agather_s": round(gathered_s, 4),
+        "speedup": round(serial_s / gathered_s, 2) if gathered_s else None,
+    }
+
+
+def main() -> None:
+    """Run the concurrency benchmark"""
+    parser = argparse.ArgumentParser(description="DrGPT sync vs async benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds to first chunk")
+    args = parser.parse_args()
+    
+    settings = MockSettings(tokens=args.tokens, latency=args.latency)
+    print(json.dumps(run(args.requests, args.concurrency, settings), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SSE parser micro-benchmark for DrGPT
+
+Replays a recorded-style 10k-chunk OpenAI stream through the previous
+``iter_lines`` based parser and the incremental ``SSEDecoder``, feeding
+both from the same ``requests.Response`` so network read sizes are
+realistic.
+
+Usage:
+    python benchmarks/bench_sse.py [--chunks 10000] [--repeat 5]
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+from drgpt.core.ai_interface import iter_sse_events, json_loads  # noqa: E402
+
+
+def record_stream(chunks: int) -> bytes:
+    """Build an OpenAI-style stream with keep-alives, like a captured one"""
+    frames = [b": keep-alive\n\n"]
+    for index in range(chunks):
+        data = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 1700000000,
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": {"content": f" token{index}"}, "finish_reason": None}],
+        }
+        frames.append(b"data: " + json.dumps(data).encode("utf-8") + b"\n\n")
+        if index % 500 == 0:
+            frames.append(b": keep-alive\n\n")
+    frames.append(b"data: [DONE]\n\n")
+    return b"".join(frames)
+
+
+def make_response(stream: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(stream)
+    return response
+
+
+def old_parser(response: requests.Response) -> int:
+    """The line-based parser the providers used previously"""
+    total = 0
+    for line in response.iter_lines():
+        if line:
+            line = line.decode("utf-8")
+            if line.startswith("data: "):
+                line = line[6:]
+                if line.strip() == "[DONE]":
+                    break
+                try:
+                    data = json.loads(line)
+                    if "choices" in data and len(data["choices"]) > 0:
+                        content = data["choices"][0].get("delta", {}).get("content", "")
+                        if content:
+                            total += len(content)
+                except json.JSONDecodeError:
+                    continue
+    return total
+
+
+def new_parser(response: requests.Response) -> int:
+    """The incremental byte-level decoder"""
+    total = 0
+    for event in iter_sse_events(response):
+        if event.data.startswith(b"[DONE]"):
+            break
+        try:
+            data = json_loads(event.data)
+        except ValueError:
+            continue
+        if "choices" in data and len(data["choices"]) > 0:
+            content = data["choices"][0].get("delta", {}).get("content", "")
+            if content:
+                total += len(content)
+    return total
+
+
+def best_of(parser, stream: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        response = make_response(stream)
+        start = time.perf_counter()
+        parser(response)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the SSE parser benchmark"""
+    parser = argparse.ArgumentParser(description="DrGPT SSE parser benchmark")
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    stream = record_stream(args.chunks)
+    assert old_parser(make_response(stream)) == new_parser(make_response(stream))
+    
+    old_s = best_of(old_parser, stream, args.repeat)
+    new_s = best_of(new_parser, stream, args.repeat)
+    print(json.dumps({
+        "chunks": args.chunks,
+        "bytes": len(stream),
+        "json_backend": json_loads.__module__,
+        "old_ms": round(old_s * 1000, 2),
+        "new_ms": round(new_s * 1000, 2),
+        "speedup": round(old_s / new_s, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
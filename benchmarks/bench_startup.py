@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for DrGPT
+
+Runs each CLI subcommand in a fresh interpreter with ``-X importtime`` and
+reports the import cost attributable to DrGPT (everything imported after
+``site``), the heavy third-party modules that were pulled in, and the wall
+clock time of the whole process. With ``--check`` the script exits non-zero
+when a command exceeds its import budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--check]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Import budget per command in milliseconds (cold, excluding interpreter/site)
+BUDGETS_MS = {
+    "--version": 60,
+    "--help": 60,
+    "--list-models openai": 120,
+}
+
+HEAVY_MODULES = ("rich", "requests", "packaging", "urllib3")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """Parse ``-X importtime`` output
+    
+    Args:
+        stderr: Captured stderr of the interpreter
+    
+    Returns:
+        Tuple of (import time in ms after site, top-level modules imported)
+    """
+    total_us = 0
+    modules = []
+    after_site = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        if not after_site:
+            after_site = name == "site"
+            continue
+        total_us += int(parts[0])
+        modules.append(name)
+    return total_us / 1000.0, modules
+
+
+def run_command(command: str, home: str) -> Dict[str, object]:
+    """Run one cold CLI invocation
+    
+    Args:
+        command: Arguments passed to ``python -m drgpt``
+        home: Isolated HOME directory so no user config is touched
+    
+    Returns:
+        Measurement dictionary
+    """
+    env = dict(os.environ, HOME=home, PYTHONPATH=str(PROJECT_ROOT))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "drgpt", *command.split()],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=home,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    import_ms, modules = parse_importtime(result.stderr)
+    heavy = sorted({name for name in modules if name in HEAVY_MODULES})
+    return {
+        "returncode": result.returncode,
+        "wall_ms": wall_ms,
+        "import_ms": import_ms,
+        "heavy_modules": heavy,
+    }
+
+
+def benchmark(runs: int) -> Dict[str, Dict[str, object]]:
+    """Benchmark every budgeted command
+    
+    Args:
+        runs: Number of cold runs per command
+    
+    Returns:
+        Results keyed by command
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as home:
+        for command, budget in BUDGETS_MS.items():
+            samples = [run_command(command, home) for _ in range(runs)]
+            results[command] = {
+                "budget_ms": budget,
+                "import_ms": statistics.median(s["import_ms"] for s in samples),
+                "wall_ms": statistics.median(s["wall_ms"] for s in samples),
+                "heavy_modules": samples[-1]["heavy_modules"],
+                "returncode": samples[-1]["returncode"],
+            }
+    return results
+
+
+def main() -> int:
+    """Run the startup benchmark"""
+    parser = argparse.ArgumentParser(description="DrGPT startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Cold runs per command")
+    parser.add_argument("--check", action="store_true", help="Fail when a budget is exceeded")
+    args = parser.parse_args()
+    
+    results = benchmark(args.runs)
+    print(json.dumps(results, indent=2))
+    
+    if args.check:
+        over = [cmd for cmd, r in results.items() if r["import_ms"] > r["budget_ms"]]
+        if over:
+            print(f"Over budget: {', '.join(over)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Full benchmark suite for DrGPT
+
+Runs ``drgpt.bench.run_suite`` (CLI startup, time to first token and
+tokens/sec through the streaming handler, Markdown render cost and batch
+throughput) against the mock provider server with every knob exposed,
+and writes JSON. With ``--baseline`` the script exits non-zero when a
+median or rate regressed by more than ``--tolerance``.
+
+Usage:
+    python benchmarks/bench_suite.py [--jitter 0.005] [--error-rate 0.05] [-o results.json]
+    python benchmarks/bench_suite.py --baseline results.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.bench import SECTIONS, MockSettings, compare, run_suite  # noqa: E402
+
+
+def main() -> None:
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description="DrGPT benchmark suite")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help="Comma-separated sections to run")
+    parser.add_argument("--providers", default="openai,anthropic", help="Wire formats to exercise")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tokens", type=int, default=200, help="Chunks per response")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds to first chunk")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Chunks per second")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Max random extra delay per chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of streams cut off")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression")
+    args = parser.parse_args()
+    
+    settings = MockSettings(
+        tokens=args.tokens, latency=args.latency, token_rate=args.token_rate, jitter=args.jitter,
+        error_rate=args.error_rate, drop_rate=args.drop_rate, seed=args.seed,
+    )
+    results = run_suite(
+        args.sections.split(","), settings, providers=args.providers.split(","),
+        runs=args.runs, requests=args.requests, concurrency=args.concurrency,
+        progress=lambda name: print(f"Benchmarking {name}...", file=sys.stderr),
+    )
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(baseline, results, args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,13 +10,15 @@ __author__ = "DrGPT Contributors"
 __license__ = "MIT"
 __description__ = "Multi-Provider AI Assistant for developers and power users"
 
-from .core.config import Config, config
-from .core.ai_interface import AIInterface, ai_interface
-from .core.manager import DrGPTManager, manager
+# The global instances below are lazy proxies: nothing is read from disk,
+# no provider is initialized and no API key is requested until first use.
+from .core.config import Config, config, get_config
+from .core.ai_interface import AIInterface, ai_interface, get_ai_interface
+from .core.manager import DrGPTManager, manager, get_manager
 
 __all__ = [
-    "Config", "config", 
-    "AIInterface", "ai_interface", 
-    "DrGPTManager", "manager",
+    "Config", "config", "get_config",
+    "AIInterface", "ai_interface", "get_ai_interface",
+    "DrGPTManager", "manager", "get_manager",
     "__version__", "__description__"
 ]
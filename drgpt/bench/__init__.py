@@ -0,0 +1,10 @@
+"""
+DrGPT Benchmark Package
+
+A mock provider server and a benchmark suite that measures DrGPT against it.
+"""
+
+from .mock_server import MockProviderServer, MockSettings
+from .suite import SECTIONS, compare, run_suite
+
+__all__ = ['MockProviderServer', 'MockSettings', 'SECTIONS', 'compare', 'run_suite']
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Mock AI provider server for DrGPT benchmarks
+
+Serves OpenAI-style ``/chat/completions``, Anthropic-style ``/messages`` and
+Gemini-style ``/models/{model}:streamGenerateContent`` streaming endpoints over Server-Sent Events with a configurable first-token
+latency, token rate and jitter, and can inject HTTP errors and dropped
+streams. Connections are kept alive (HTTP/1.1 chunked encoding) so
+clients can exercise connection pooling.
+
+Usage:
+    python -m drgpt.bench.mock_server --port 8765 --tokens 50 --latency 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+# ETag of the (fixed) model list served by GET /models
+MODELS_ETAG = '"mock-models-1"'
+
+
+class MockSettings:
+    """Behaviour of the mock server"""
+    
+    def __init__(self, tokens: int = 20, latency: float = 0.0, token_rate: float = 0.0,
+                 fail_requests: int = 0, error_status: int = 503, retry_after: str = "",
+                 jitter: float = 0.0, error_rate: float = 0.0, drop_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """Initialize mock settings
+        
+        Args:
+            tokens: Number of content chunks per response
+            latency: Seconds before the first chunk is sent
+            token_rate: Chunks per second (0 means as fast as possible)
+            fail_requests: Number of initial requests answered with an error
+            error_status: HTTP status used for failed requests
+            retry_after: Retry-After header sent with failed requests
+            jitter: Up to this many random extra seconds before the first
+                chunk and between chunks
+            error_rate: Fraction of later requests answered with an error
+            drop_rate: Fraction of later streams cut off halfway
+            seed: Seed for jitter and injected faults (optional)
+        """
+        self.tokens = tokens
+        self.latency = latency
+        self.token_rate = token_rate
+        self.fail_requests = fail_requests
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.requests = 0
+        self.peers = set()
+        self.last_request = None
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+    
+    def next_request(self, peer=None) -> int:
+        """Count a request and return its sequence number
+        
+        Args:
+            peer: Client address, recorded to observe connection reuse
+        """
+        with self._lock:
+            self.requests += 1
+            if peer is not None:
+                self.peers.add(peer)
+            return self.requests
+    
+    def fault(self, sequence: int) -> Optional[str]:
+        """Decide whether a request fails
+        
+        Args:
+            sequence: Sequence number from next_request
+        
+        Returns:
+            ``"error"`` to answer with error_status, ``"drop"`` to cut the
+            stream off, or None
+        """
+        if sequence <= self.fail_requests:
+            return "error"
+        if not (self.error_rate or self.drop_rate):
+            return None
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.drop_rate:
+            return "drop"
+        return None
+    
+    def delay(self, seconds: float) -> float:
+        """Add random jitter to a delay
+        
+        Args:
+            seconds: Base delay in seconds
+        
+        Returns:
+            Delay to sleep for
+        """
+        if not self.jitter:
+            return seconds
+        with self._lock:
+            return seconds + self._random.uniform(0, self.jitter)
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    """Request handler emulating streaming provider APIs"""
+    
+    protocol_version = "HTTP/1.1"
+    settings = MockSettings()
+    
+    def log_message(self, format, *args):  # noqa: A002 - signature from base class
+        pass
+    
+    def do_GET(self):  # noqa: N802 - name from base class
+        settings = self.settings
+        settings.last_request = (self.path, dict(self.headers), None)
+        if not self.path.split("?", 1)[0].endswith("/models"):
+            self.send_error(404)
+            return
+        if settings.next_request(self.client_address) <= settings.fail_requests:
+            self.send_response(settings.error_status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        if self.headers.get("If-None-Match") == MODELS_ETAG:
+            self.send_response(304)
+            self.send_header("ETag", MODELS_ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        data = json.dumps({
+            "object": "list",
+            "data": [{"id": "mock-model", "object": "model"}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", MODELS_ETAG)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_POST(self):  # noqa: N802 - name from base class
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        
+        settings = self.settings
+        settings.last_request = (self.path, dict(self.headers), body)
+        fault = settings.fault(settings.next_request(self.client_address))
+        if fault == "error":
+            self.send_response(settings.error_status)
+            if settings.retry_after:
+                self.send_header("Retry-After", settings.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        if self.path.endswith("/chat/completions"):
+            frames = self._openai_frames(body)
+        elif self.path.endswith("/messages"):
+            frames = self._anthropic_frames(body)
+        elif ":streamGenerateContent" in self.path:
+            frames = self._gemini_frames(body)
+        else:
+            self.send_error(404)
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        delay = settings.delay(settings.latency)
+        if delay:
+            time.sleep(delay)
+        interval = 1.0 / settings.token_rate if settings.token_rate else 0.0
+        
+        frames = list(frames)
+        if fault == "drop":
+            # Cut the connection without the terminating chunk
+            frames = frames[:len(frames) // 2]
+            self.close_connection = True
+        for index, frame in enumerate(frames):
+            if index:
+                delay = settings.delay(interval)
+                if delay:
+                    time.sleep(delay)
+            self._write_chunk(frame.encode("utf-8"))
+        if fault != "drop":
+            self._write_chunk(b"")
+    
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+    
+    @staticmethod
+    def _prompt_tokens(body) -> int:
+        """Crude prompt token count reported in usage"""
+        return sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+    
+    def _openai_frames(self, body):
+        tokens = self.settings.tokens
+        for index in range(tokens):
+            data = {"choices": [{"index": 0, "delta": {"content": f"tok{index} "}}]}
+            yield f"data: {json.dumps(data)}\n\n"
+        data = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(data)}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {"prompt_tokens": self._prompt_tokens(body), "completion_tokens": tokens}
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    def _anthropic_frames(self, body):
+        tokens = self.settings.tokens
+        data = {"type": "message_start", "message": {"usage": {"input_tokens": self._prompt_tokens(body), "output_tokens": 1}}}
+        yield f"event: message_start\ndata: {json.dumps(data)}\n\n"
+        for index in range(tokens):
+            data = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": f"tok{index} "}}
+            yield f"event: content_block_delta\ndata: {json.dumps(data)}\n\n"
+        data = {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": tokens}}
+        yield f"event: message_delta\ndata: {json.dumps(data)}\n\n"
+        yield 'event: message_stop\ndata: {"type": "message_stop"}\n\n'
+    
+    def _gemini_frames(self, body):
+        # Shaped like a recorded streamGenerateContent?alt=sse response
+        tokens = self.settings.tokens
+        prompt_tokens = sum(
+            len(part.get("text", "").split())
+            for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        for index in range(tokens):
+            candidate = {"content": {"parts": [{"text": f"tok{index} "}], "role": "model"}, "index": 0}
+            if index == tokens - 1:
+                candidate["finishReason"] = "STOP"
+            usage = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": index + 1,
+                     "totalTokenCount": prompt_tokens + index + 1}
+            data = {"candidates": [candidate], "usageMetadata": usage, "modelVersion": "gemini-1.5-flash-002"}
+            yield f"data: {json.dumps(data)}\r\n\r\n"
+
+
+class MockProviderServer:
+    """Mock provider server running on a background thread"""
+    
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        """Initialize mock server
+        
+        Args:
+            settings: Server behaviour. If None, uses defaults.
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        handler = type("Handler", (MockProviderHandler,), {"settings": settings or MockSettings()})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    def start(self) -> "MockProviderServer":
+        """Start serving in the background"""
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop the server"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self) -> "MockProviderServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Run the mock server in the foreground"""
+    parser = argparse.ArgumentParser(description="Mock AI provider server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=20, help="Chunks per response")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to first chunk")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Chunks per second")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Max random extra delay per chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of streams cut off")
+    parser.add_argument("--seed", type=int, help="Seed for jitter and faults")
+    args = parser.parse_args()
+    
+    settings = MockSettings(
+        args.tokens, args.latency, args.token_rate,
+        jitter=args.jitter, error_rate=args.error_rate, drop_rate=args.drop_rate, seed=args.seed,
+    )
+    server = MockProviderServer(settings, args.host, args.port)
+    print(f"Mock provider listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+Benchmark suite for DrGPT
+
+Runs DrGPT against the local mock provider server and measures:
+
+* ``startup``: wall time of ``drgpt --version`` and ``drgpt --help`` in a
+  fresh interpreter
+* ``stream``: time to first token, tokens per second and wall time of a
+  query through the CLI's streaming handler, with and without Markdown
+* ``render``: cost of rendering a streamed Markdown response
+* ``batch``: throughput of many concurrent requests through ``agather``
+
+Everything runs against a throwaway configuration directory and a
+discarding console, so neither the user's settings nor the terminal are
+touched. Results are plain JSON; ``compare`` reports the metrics of one
+run that regressed against an earlier one.
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .. import __version__
+from ..core.ai_interface import ai_interface
+from ..core.config import Config, config
+from ..core.manager import manager
+from ..core.metrics import metrics
+from ..core.registry import registry
+from ..utils.console import console
+from .mock_server import MockProviderServer, MockSettings
+
+
+SECTIONS = ("startup", "stream", "render", "batch")
+
+STARTUP_COMMANDS = ("--version", "--help")
+
+BENCH_MODEL = "mock"
+
+# Lines of the synthetic response used by the render benchmark
+SAMPLE_MARKDOWN = (
+    "## Result\n",
+    "\n",
+    "The function below reads the file **once** and keeps a `dict` of counts.\n",
+    "\n",
+    "```python\n",
+    "def count_words(path):\n",
+    "    counts = {}\n",
+    "    with open(path) as file:\n",
+    "        for word in file.read().split():\n",
+    "            counts[word] = counts.get(word, 0) + 1\n",
+    "    return counts\n",
+    "```\n",
+    "\n",
+    "- Runs in *linear* time\n",
+    "- Uses memory proportional to the number of distinct words\n",
+    "\n",
+)
+
+
+class _NullWriter(io.TextIOBase):
+    """Text stream that discards everything written to it"""
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def _make_console():
+    """Rich console that renders like a terminal but prints nothing"""
+    from rich.console import Console
+    
+    return Console(file=_NullWriter(), force_terminal=True, color_system="truecolor", width=100)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Summarize durations
+    
+    Args:
+        values: Durations in seconds
+    
+    Returns:
+        Median, 95th percentile and minimum in milliseconds
+    """
+    if not values:
+        return {"median_ms": None, "p95_ms": None, "min_ms": None}
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+    }
+
+
+@contextmanager
+def isolated_environment(directory: Path, base_url: str, providers: Sequence[str]) -> Iterator[None]:
+    """Point the global config, AI interface, manager and console at the bench
+    
+    The given providers talk to base_url; everything the process writes
+    (config, usage ledger) goes to directory.
+    
+    Args:
+        directory: Scratch directory
+        base_url: Base URL of the mock server
+        providers: Provider names to connect to the mock server
+    """
+    saved = [proxy._instance for proxy in (config, ai_interface, manager, console)]
+    metrics_enabled = metrics.enabled
+    
+    config._reset_instance(Config(Path(directory) / "config"))
+    ai_interface._reset_instance()
+    manager._reset_instance()
+    console._reset_instance(_make_console())
+    for name in providers:
+        ai_interface.providers[name] = registry.get(name)("bench-key", base_url)
+    try:
+        yield
+    finally:
+        ai_interface._initialize_providers()
+        for proxy, instance in zip((config, ai_interface, manager, console), saved):
+            proxy._reset_instance(instance)
+        if not metrics_enabled:
+            # Drop the aggregates of the bench's own requests
+            metrics.enabled = False
+            metrics.reset()
+
+
+@contextmanager
+def collect_traces() -> Iterator[List]:
+    """Collect the traces of requests made inside the block"""
+    traces = []
+    exporter = metrics.add_exporter(traces.append)
+    try:
+        yield traces
+    finally:
+        metrics.remove_exporter(exporter)
+
+
+def bench_startup(runs: int, directory: Path) -> Dict[str, Any]:
+    """Time CLI commands in fresh interpreters
+    
+    Args:
+        runs: Runs per command
+        directory: Scratch directory used as HOME
+    
+    Returns:
+        Timing summary per command
+    """
+    env = dict(os.environ, HOME=str(directory), XDG_CONFIG_HOME=str(Path(directory) / ".config"))
+    project_root = str(Path(__file__).resolve().parents[2])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (project_root, env.get("PYTHONPATH"))))
+    
+    results = {}
+    for command in STARTUP_COMMANDS:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "drgpt", command],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+            )
+            times.append(time.perf_counter() - start)
+        results[command] = summarize(times)
+    return results
+
+
+def bench_stream(provider: str, runs: int, markdown: bool) -> Dict[str, Any]:
+    """Stream queries through the CLI's streaming handler
+    
+    Args:
+        provider: Provider connected to the mock server
+        runs: Number of queries
+        markdown: Render Markdown (otherwise print plain text)
+    
+    Returns:
+        Time to first token, decode rate and wall time
+    """
+    from ..cli.query_handler import _handle_streaming_query
+    from ..modes import StandardMode
+    
+    args = argparse.Namespace(provider=provider, model=BENCH_MODEL, no_markdown=not markdown, input_source=None)
+    mode = StandardMode(manager)
+    
+    walls = []
+    errors = 0
+    with collect_traces() as traces:
+        for index in range(runs):
+            start = time.perf_counter()
+            try:
+                _handle_streaming_query(f"Benchmark prompt {index}", args, mode, use_cache=False)
+            except Exception:
+                errors += 1
+                continue
+            walls.append(time.perf_counter() - start)
+    
+    completed = [trace for trace in traces if trace.status == "ok" and trace.first_token is not None]
+    rates = [
+        trace.tokens / (trace.duration - trace.first_token)
+        for trace in completed if trace.duration > trace.first_token
+    ]
+    return {
+        "runs": runs,
+        "errors": errors,
+        "ttft": summarize([trace.first_token for trace in completed]),
+        "wall": summarize(walls),
+        "tokens_per_s": round(statistics.median(rates), 1) if rates else None,
+    }
+
+
+def bench_render(runs: int, repeat: int = 40) -> Dict[str, Any]:
+    """Time rendering a streamed Markdown response
+    
+    The response is fed a few characters at a time, like provider tokens,
+    to the streaming Markdown renderer and, for reference, printed as
+    plain text.
+    
+    Args:
+        runs: Number of timed renders
+        repeat: Copies of SAMPLE_MARKDOWN in the response
+    
+    Returns:
+        Timing summaries for Markdown and plain output
+    """
+    from ..utils.markdown_stream import MarkdownStreamRenderer
+    
+    text = "".join(SAMPLE_MARKDOWN) * repeat
+    chunks = [text[index:index + 4] for index in range(0, len(text), 4)]
+    target = _make_console()
+    
+    def markdown() -> None:
+        renderer = MarkdownStreamRenderer(console=target)
+        for chunk in chunks:
+            renderer.feed(chunk)
+        renderer.finish()
+    
+    def plain() -> None:
+        for chunk in chunks:
+            target.print(chunk, end="")
+        target.print()
+    
+    results = {"chunks": len(chunks), "bytes": len(text.encode("utf-8"))}
+    for name, render in (("markdown", markdown), ("plain", plain)):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            render()
+            times.append(time.perf_counter() - start)
+        results[name] = summarize(times)
+        median = statistics.median(times)
+        results[name]["chunks_per_s"] = round(len(chunks) / median, 1) if median else None
+    return results
+
+
+def bench_batch(provider: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run many requests concurrently through agather
+    
+    Args:
+        provider: Provider connected to the mock server
+        requests: Number of requests
+        concurrency: Maximum requests in flight
+    
+    Returns:
+        Request and token throughput
+    """
+    prompts = [f"Benchmark prompt {index}" for index in range(requests)]
+    with collect_traces() as traces:
+        start = time.perf_counter()
+        asyncio.run(manager.ai.agather(
+            prompts, concurrency=concurrency, provider=provider, model=BENCH_MODEL, use_cache=False
+        ))
+        elapsed = time.perf_counter() - start
+    
+    tokens = sum(trace.tokens for trace in traces if trace.status == "ok")
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(trace.status != "ok" for trace in traces),
+        "seconds": round(elapsed, 4),
+        "requests_per_s": round(requests / elapsed, 1),
+        "tokens_per_s": round(tokens / elapsed, 1),
+    }
+
+
+def run_suite(
+    sections: Sequence[str] = SECTIONS,
+    settings: Optional[MockSettings] = None,
+    providers: Sequence[str] = ("openai", "anthropic"),
+    runs: int = 10,
+    requests: int = 200,
+    concurrency: int = 16,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Run benchmark sections against a mock provider server
+    
+    Args:
+        sections: Sections to run (see SECTIONS)
+        settings: Mock server behaviour. If None, 200 tokens per response
+            after 20 ms.
+        providers: Wire formats to exercise (providers served by the mock)
+        runs: Repetitions of the startup, stream and render measurements
+        requests: Requests in the batch section
+        concurrency: Maximum requests in flight in the batch section
+        progress: Called with the name of each measurement as it starts
+    
+    Returns:
+        JSON-serializable results
+    
+    Raises:
+        ValueError: If a section is unknown
+    """
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark section(s): {', '.join(unknown)} (choose from {', '.join(SECTIONS)})")
+    settings = settings or MockSettings(tokens=200, latency=0.02)
+    
+    def step(name: str) -> None:
+        if progress is not None:
+            progress(name)
+    
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="drgpt_bench_") as directory:
+        if "startup" in sections:
+            step("startup")
+            results["startup"] = bench_startup(runs, Path(directory))
+        
+        if "render" in sections:
+            step("render")
+            results["render"] = bench_render(runs)
+        
+        if "stream" in sections or "batch" in sections:
+            with MockProviderServer(settings) as server, \
+                    isolated_environment(Path(directory), server.base_url, providers):
+                for provider in providers:
+                    if "stream" in sections:
+                        for style in ("markdown", "plain"):
+                            step(f"stream {provider} {style}")
+                            results.setdefault("stream", {}).setdefault(provider, {})[style] = bench_stream(
+                                provider, runs, markdown=style == "markdown"
+                            )
+                    if "batch" in sections:
+                        step(f"batch {provider}")
+                        results.setdefault("batch", {})[provider] = bench_batch(provider, requests, concurrency)
+    
+    return {
+        "drgpt": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": {
+            "runs": runs,
+            "requests": requests,
+            "concurrency": concurrency,
+            "tokens": settings.tokens,
+            "latency": settings.latency,
+            "token_rate": settings.token_rate,
+            "jitter": settings.jitter,
+            "error_rate": settings.error_rate,
+            "drop_rate": settings.drop_rate,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> List[str]:
+    """Find metrics that got worse than in an earlier run
+    
+    Medians (``median_ms``, lower is better) and rates (``*_per_s``,
+    higher is better) present in both runs are compared.
+    
+    Args:
+        baseline: Results of the earlier run
+        current: Results of this run
+        tolerance: Allowed relative slowdown
+    
+    Returns:
+        One line per regressed metric
+    """
+    regressions = []
+    
+    def walk(old: Any, new: Any, path: str) -> None:
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in old:
+                if key in new:
+                    walk(old[key], new[key], f"{path}.{key}" if path else key)
+            return
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+            return
+        if path.endswith("median_ms") and new > old * (1 + tolerance):
+            regressions.append(f"{path}: {old} -> {new} ({new / old - 1:+.0%})")
+        elif path.endswith("_per_s") and new < old / (1 + tolerance):
+            regressions.append(f"{path}: {old} -> {new} ({new / old - 1:+.0%})")
+    
+    walk(baseline.get("results", {}), current.get("results", {}), "")
+    return regressions
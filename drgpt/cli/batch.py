@@ -0,0 +1,99 @@
+"""
+Batch handling for DrGPT CLI
+
+Runs a file (or stdin) of prompts through the batch runner and writes
+JSONL results.
+"""
+
+import argparse
+import sys
+from typing import Any, Dict
+
+from ..core.batch import BatchRunner, read_batch_items
+from ..core.manager import manager
+from ..modes import StandardMode, CodeMode, ShellMode
+from ..utils.console import print_error
+from ..utils.validation import validate_temperature, validate_max_tokens
+
+
+def handle_batch(args: argparse.Namespace) -> None:
+    """Handle --batch command
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    try:
+        temperature = validate_temperature(args.temperature)
+        max_tokens = validate_max_tokens(args.max_tokens)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    
+    defaults: Dict[str, Any] = {"mode": "code" if args.code else "shell" if args.shell else "default"}
+    if args.provider:
+        defaults["provider"] = args.provider
+    if args.model:
+        defaults["model"] = args.model
+    if temperature is not None:
+        defaults["temperature"] = temperature
+    if max_tokens is not None:
+        defaults["max_tokens"] = max_tokens
+    if args.no_cache:
+        defaults["use_cache"] = False
+    elif args.cache:
+        defaults["use_cache"] = True
+    
+    modes = {
+        "default": StandardMode(manager),
+        "code": CodeMode(manager),
+        "shell": ShellMode(manager),
+    }
+    
+    def prepare(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the item's mode to its prompt"""
+        mode = modes.get(item.get("mode", defaults["mode"]))
+        if mode is None:
+            raise ValueError(f"Unsupported batch mode: {item['mode']}")
+        if "prompt" in item:
+            item = dict(item, prompt=mode.process_prompt(item["prompt"]))
+        return item
+    
+    workers = args.workers or manager.config.get("MAX_CONCURRENCY", 8)
+    runner = BatchRunner(
+        manager,
+        workers=workers,
+        ordered=args.batch_order == "input",
+        prepare=prepare,
+        **defaults
+    )
+    
+    try:
+        source = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    except OSError as e:
+        print_error(f"Could not open batch file: {e}")
+        sys.exit(1)
+    
+    try:
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    except OSError as e:
+        print_error(f"Could not open output file: {e}")
+        sys.exit(1)
+    
+    try:
+        summary = runner.run(read_batch_items(source), output)
+    except KeyboardInterrupt:
+        sys.stderr.write("Batch interrupted by user\n")
+        sys.exit(1)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    # Keep stdout clean for JSONL, report the summary on stderr
+    sys.stderr.write(
+        f"Batch complete: {summary['succeeded']}/{summary['total']} succeeded, "
+        f"{summary['failed']} failed in {summary['duration_s']}s\n"
+    )
+    if summary["failed"]:
+        sys.exit(1)
@@ -0,0 +1,78 @@
+"""
+Benchmark handling for DrGPT CLI
+
+Runs the benchmark suite against a local mock provider and writes the
+results as JSON.
+"""
+
+import argparse
+import json
+import sys
+
+from ..utils.console import print_error
+
+# Providers whose wire format the mock server speaks
+MOCK_PROVIDERS = ("openai", "anthropic", "google", "custom")
+
+
+def handle_bench(args: argparse.Namespace) -> None:
+    """Handle --bench command
+    
+    Results go to stdout, or to the --output file. With --baseline, metrics
+    that regressed against the earlier results are listed on stderr and the
+    exit status is 1.
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    from ..bench import SECTIONS, compare, run_suite
+    
+    sections = SECTIONS if args.bench == "all" else [name.strip() for name in args.bench.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in SECTIONS]
+    if unknown or not sections:
+        names = ", ".join(unknown) or repr(args.bench)
+        print_error(f"Unknown benchmark section(s): {names}; choose from {', '.join(SECTIONS)} or all")
+        sys.exit(1)
+    providers = ("openai", "anthropic")
+    if args.provider:
+        if args.provider not in MOCK_PROVIDERS:
+            print_error(f"The mock server cannot serve {args.provider}; choose from {', '.join(MOCK_PROVIDERS)}")
+            sys.exit(1)
+        providers = (args.provider,)
+    
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as e:
+            print_error(f"Could not read baseline: {e}")
+            sys.exit(1)
+    
+    def progress(name: str) -> None:
+        sys.stderr.write(f"Benchmarking {name}...\n")
+    
+    kwargs = {"concurrency": args.workers} if args.workers else {}
+    try:
+        results = run_suite(sections, providers=providers, progress=progress, **kwargs)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        try:
+            with open(args.output, "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        except OSError as e:
+            print_error(f"Could not write results: {e}")
+            sys.exit(1)
+    else:
+        sys.stdout.write(output + "\n")
+    
+    if baseline is not None:
+        regressions = compare(baseline, results)
+        for line in regressions:
+            sys.stderr.write(f"Regression: {line}\n")
+        if regressions:
+            sys.exit(1)
@@ -4,20 +4,22 @@ Command handlers for DrGPT CLI
 Contains handlers for various CLI commands and operations.
 """
 
-from rich.console import Console
+import sys
 
 from ..core.manager import manager
 from ..core.config import SUPPORTED_PROVIDERS
+from ..utils.console import console
 
-# Initialize rich console
-console = Console()
 
-
-def handle_list_providers() -> None:
-    """Handle --list-providers command"""
+def handle_list_providers(refresh: bool = False) -> None:
+    """Handle --list-providers command
+    
+    Args:
+        refresh: Re-fetch model lists instead of using the cached ones
+    """
     console.print("\n[[bold green]+[/]] Available AI providers and models:\n")
     
-    providers = manager.list_providers()
+    providers = manager.list_providers(refresh)
     for provider_name, models in providers.items():
         console.print(f"[bold]{provider_name}:[/bold]")
         if models:
@@ -28,18 +30,19 @@ def handle_list_providers() -> None:
         console.print()
 
 
-def handle_list_models(provider: str) -> None:
+def handle_list_models(provider: str, refresh: bool = False) -> None:
     """Handle --list-models command
     
     Args:
         provider: Provider name to list models for
+        refresh: Re-fetch the model list instead of using the cached one
     """
     if provider not in SUPPORTED_PROVIDERS:
         console.print(f"[[bold red]-[/bold red]] Unsupported provider '{provider}'")
         console.print(f"[[bold green]+[/]] Available providers: {', '.join(SUPPORTED_PROVIDERS.keys())}")
         return
     
-    models = SUPPORTED_PROVIDERS[provider]["models"]
+    models = manager.ai.get_models(provider, refresh)
     console.print(f"\n[[bold green]+[/bold green]] Available models for {provider}:\n")
     
     if models:
@@ -69,16 +72,81 @@ def handle_status() -> None:
     console.print("Config: ", style="bold", end="")
     console.print(f"{status['config_path']}")
     
+    cache_stats = status['cache']
+    console.print("Cache: ", style="bold", end="")
+    console.print(
+        f"{cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+        f"{cache_stats['entries']} entries"
+    )
+    
     console.print("Available providers: ", style="bold", end="")
     console.print(f"{', '.join(status['available_providers'])}")
     console.print()
+
+
+def handle_usage(days: int) -> None:
+    """Handle --usage command
+    
+    Args:
+        days: Number of most recent days to report
+    """
+    ledger = manager.ai.ledger
+    if ledger is None:
+        console.print("[[bold red]-[/bold red]] The usage ledger is disabled (USAGE_LEDGER=false)")
+        return
     
-   
+    rows = ledger.report(days)
+    if not rows:
+        console.print(f"\n[[bold green]+[/bold green]] No usage recorded in the last {days} days\n")
+        return
+    
+    from rich.table import Table
+    
+    def cost_text(cost) -> str:
+        return "-" if cost is None else f"${cost:.4f}"
+    
+    table = Table(title=f"Usage in the last {days} days")
+    table.add_column("Day", no_wrap=True)
+    for column in ("Provider", "Model"):
+        table.add_column(column)
+    for column in ("Requests", "Errors", "Prompt", "Completion", "Cost"):
+        table.add_column(column, justify="right")
+    
+    totals = {}
+    for row in rows:
+        table.add_row(
+            row.day, row.provider, row.model, str(row.requests), str(row.errors),
+            f"{row.prompt_tokens:,}", f"{row.completion_tokens:,}", cost_text(row.cost)
+        )
+        total = totals.setdefault((row.provider, row.model), [0, 0, 0, 0, 0.0, True])
+        total[0] += row.requests
+        total[1] += row.errors
+        total[2] += row.prompt_tokens
+        total[3] += row.completion_tokens
+        if row.cost is None:
+            total[5] = False
+        else:
+            total[4] += row.cost
+    
+    table.add_section()
+    overall = 0.0
+    for (provider, model), (requests, errors, prompt, completion, cost, priced) in sorted(totals.items()):
+        overall += cost
+        table.add_row(
+            "[bold]Total[/bold]", provider, model, str(requests), str(errors),
+            f"{prompt:,}", f"{completion:,}", cost_text(cost if priced else None)
+        )
+    
+    console.print()
+    console.print(table)
+    console.print(f"Estimated cost: [bold]${overall:.4f}[/bold] (list prices, models without a price excluded)\n")
 
 
 def handle_version() -> None:
-    """Handle --version command"""
+    """Handle --version command
+    
+    Written without rich so that the fastest command stays fast.
+    """
     from .. import __version__, __description__
     
-    console.print(f"DrGPT v{__version__}", style="bold")
-    console.print(__description__, style="dim")
+    sys.stdout.write(f"DrGPT v{__version__}\n{__description__}\n")
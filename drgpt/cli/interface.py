@@ -170,6 +170,17 @@ function e: { drgpt --editor }
         console.print(f"[[bold red]-[/bold red]] Error updating profile: {e}")
 
 
+def _client_command() -> str:
+    """Command line running the lightweight daemon client
+    
+    The client only needs the standard library, so site-packages are
+    skipped (-S) to keep its startup fast. It falls back to the full
+    drgpt command when no daemon (drgpt --daemon) is running.
+    """
+    client_path = Path(__file__).resolve().parent.parent / "server" / "client.py"
+    return f'"{sys.executable}" -S "{client_path}"'
+
+
 def _setup_unix_aliases(shell_type: str) -> None:
     """Setup aliases for Unix-like systems (bash/zsh)"""
     if shell_type == "zsh":
@@ -177,19 +188,22 @@ def _setup_unix_aliases(shell_type: str) -> None:
     else:
         profile_path = os.path.expanduser("~/.bashrc")
     
+    client = _client_command()
+    
     # Shell aliases - fixed ! function for compatibility
-    aliases = '''
+    aliases = f'''
 # DrGPT Terminal Integration
 alias drg_chat="drgpt"
 alias drg_shell="drgpt --shell"
 alias drg_code="drgpt --code"
 alias drg_editor="drgpt --editor"
 
-# Shorter aliases - using functions for complex ones
-function :() { drgpt "$@"; }
-function s:() { drgpt --shell "$@"; }
-function c:() { drgpt --code "$@"; }
-function e:() { drgpt --editor; }
+# Shorter aliases - using functions for complex ones (served by the
+# daemon when "drgpt --daemon" is running)
+function :() {{ {client} "$@"; }}
+function s:() {{ {client} --shell "$@"; }}
+function c:() {{ {client} --code "$@"; }}
+function e:() {{ drgpt --editor; }}
 '''
     
     try:
@@ -222,16 +236,18 @@ def _setup_fish_aliases() -> None:
         # Create functions directory if it doesn't exist
         os.makedirs(functions_dir, exist_ok=True)
         
+        client = _client_command()
+        
         # Fish function definitions
         functions = {
-            "__drgpt_colon.fish": '''function :
-    drgpt $argv
+            "__drgpt_colon.fish": f'''function :
+    {client} $argv
 end''',
-            "s_colon.fish": '''function s:
-    drgpt --shell $argv
+            "s_colon.fish": f'''function s:
+    {client} --shell $argv
 end''',
-            "c_colon.fish": '''function c:
-    drgpt --code $argv
+            "c_colon.fish": f'''function c:
+    {client} --code $argv
 end''',
             "e_colon.fish": '''function e:
     drgpt --editor
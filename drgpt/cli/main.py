@@ -7,71 +7,171 @@ Provides the main CLI functionality for DrGPT.
 import sys
 
 from .parser import create_parser
-from .commands import handle_list_providers, handle_list_models, handle_status, handle_version
-from .interface import handle_interactive_interface
-from .editor import handle_editor_input
-from .query_handler import handle_query
-from ..core.updater import handle_update_command
-from ..utils.console import print_error
+from ..utils.console import print_error, print_warning
 
 
 def main() -> None:
-    """Main CLI entry point"""
+    """Main CLI entry point
+    
+    Handlers are imported inside their branches so that cheap commands
+    such as --version never pay for rich, requests or packaging.
+    """
     parser = create_parser()
     args = parser.parse_args()
     
     # Handle special commands first
     if args.version:
+        from .commands import handle_version
         handle_version()
         return
     
     if args.update:
+        from ..core.updater import handle_update_command
         success = handle_update_command()
         sys.exit(0 if success else 1)
     
     if args.list_providers:
-        handle_list_providers()
+        from .commands import handle_list_providers
+        handle_list_providers(refresh=args.refresh_models)
         return
     
     if args.list_models:
-        handle_list_models(args.list_models)
+        from .commands import handle_list_models
+        handle_list_models(args.list_models, refresh=args.refresh_models)
         return
     
     if args.status:
+        from .commands import handle_status
         handle_status()
         return
     
+    if args.usage is not None:
+        from .commands import handle_usage
+        handle_usage(args.usage)
+        return
+    
+    if args.bench is not None:
+        from .bench import handle_bench
+        handle_bench(args)
+        return
+    
     # Handle interactive interface
     if args.interface:
+        from .interface import handle_interactive_interface
         handle_interactive_interface()
         return
     
+    # Handle interactive session
+    if args.repl:
+        from .repl import handle_repl
+        handle_repl(args)
+        return
+    
+    # Handle batch processing
+    if args.batch:
+        from .batch import handle_batch
+        handle_batch(args)
+        return
+    
+    # Handle server mode
+    if args.serve:
+        from .serve import handle_serve
+        handle_serve(args)
+        return
+    
+    if args.daemon:
+        from .serve import handle_daemon
+        handle_daemon(args)
+        return
+    
     # Handle editor input
     if args.editor:
+        from .editor import handle_editor_input
         args.prompt = handle_editor_input()
     
-    # Check for stdin input if no prompt provided
-    if not args.prompt and not sys.stdin.isatty():
-        try:
-            stdin_content = sys.stdin.read().strip()
-            if stdin_content:
-                args.prompt = stdin_content
-        except Exception as e:
-            print_error(f"Error reading from stdin: {e}")
-            sys.exit(1)
-    # If both prompt and stdin content are available, combine them
-    elif args.prompt and not sys.stdin.isatty():
-        try:
-            stdin_content = sys.stdin.read().strip()
-            if stdin_content:
-                args.prompt = f"{args.prompt}\n\nInput data:\n{stdin_content}"
-        except Exception as e:
-            print_error(f"Error reading from stdin: {e}")
-            sys.exit(1)
+    # Read input data from --input or piped stdin
+    _read_input(args)
     
     # Handle regular query
+    from .query_handler import handle_query
     handle_query(args)
 
 
+def _read_input(args) -> None:
+    """Attach input data from --input or piped stdin to the query
+    
+    Input that fits in the model's context window is appended to the
+    prompt (or becomes the prompt). Larger input, or input larger than one
+    chunk with --chunk, is left unread on args.input_source, with the part
+    already read in args.input_head, for chunked processing. Input for a
+    model whose context window is unknown is sent whole unless --chunk is
+    given.
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    args.input_source = None
+    if args.input and args.input != "-":
+        try:
+            source = open(args.input, "r", encoding="utf-8", errors="replace")
+        except OSError as e:
+            print_error(f"Could not open input file: {e}")
+            sys.exit(1)
+    elif args.input or not sys.stdin.isatty():
+        source = sys.stdin
+    else:
+        return
+    
+    from ..core.config import get_config
+    from ..core.tokens import MIN_COMPLETION_TOKENS, context_window, get_counter
+    
+    config = get_config()
+    model = args.model or config.get("DEFAULT_MODEL") or ""
+    budget = None
+    if args.chunk:
+        limit = args.chunk_size or config.get("CHUNK_SIZE", 12000)
+    else:
+        window = None
+        if args.route is None:
+            window = context_window(args.provider or config.get("DEFAULT_PROVIDER"), model)
+        # A window too small to leave room for the answer always chunks
+        budget = max(window - MIN_COMPLETION_TOKENS, 0) if window else None
+        # Read no more than can fit, at about four characters per token
+        limit = budget * 4 if budget is not None else None
+    try:
+        head = source.read(limit + 1 if limit is not None else -1)
+    except Exception as e:
+        print_error(f"Error reading input: {e}")
+        sys.exit(1)
+    
+    too_large = limit is not None and len(head) > limit
+    if budget and not too_large:
+        # Dense text such as code has fewer characters per token
+        counter = get_counter(model)
+        too_large = counter.count_text(head) + counter.count_text(args.prompt or "") > budget
+    
+    if too_large:
+        # Too large for one request, answer it chunk by chunk
+        if not args.prompt:
+            from ..core.chunking import DEFAULT_TASK
+            
+            print_warning(f"Input is too large for one request and no prompt was given; asking: {DEFAULT_TASK}")
+            args.prompt = DEFAULT_TASK
+        args.input_source = source
+        args.input_head = head
+        return
+    
+    if source is not sys.stdin:
+        source.close()
+    content = head.strip()
+    if not content:
+        return
+    if args.prompt:
+        # If both prompt and input data are available, combine them
+        args.prompt = f"{args.prompt}\n\nInput data:\n{content}"
+    else:
+        args.prompt = content
+
+
 if __name__ == "__main__":
     main()
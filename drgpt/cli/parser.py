@@ -30,8 +30,16 @@ Examples:
   drgpt -e
   drgpt --output result.md "Explain AI"
   drgpt -o result.md "Explain AI"
+  drgpt --repl       # Interactive session (/mode, /model, /provider)
   drgpt --provider openai --model gpt-4 "Complex reasoning task"
+  drgpt --provider custom --base-url http://localhost:8000/v1 "Hello"
+  drgpt --route openai:gpt-4o-mini,anthropic:claude-3-5-haiku-20241022 "Hello"
   drgpt --list-providers
+  drgpt --batch prompts.jsonl -o results.jsonl
+  drgpt --input app.log "Which errors occur most often?"
+  drgpt --serve --port 8080
+  drgpt --daemon &   # Faster terminal aliases
+  drgpt --bench -o bench.json
   drgpt --update
   drgpt --version
   
@@ -81,6 +89,83 @@ After setup with -i, use these aliases in your terminal:
         help="Start or continue a chat session"
     )
     
+    parser.add_argument(
+        "--repl",
+        action="store_true",
+        help="Start an interactive session that keeps the connection and chat history between messages"
+    )
+    
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run prompts from a JSONL or text file ('-' for stdin) and write JSONL results"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Maximum concurrent requests per provider in batch and serve modes and for chunked input"
+    )
+    
+    parser.add_argument(
+        "--input",
+        metavar="FILE",
+        help="Read input data from FILE ('-' for stdin); input too large for the model's context window is processed in chunks"
+    )
+    
+    parser.add_argument(
+        "--chunk",
+        action="store_true",
+        help="Process input larger than one chunk in chunks, e.g. for models whose context window is unknown"
+    )
+    
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        metavar="CHARS",
+        help="Characters per chunk when input is processed in chunks (default: CHUNK_SIZE)"
+    )
+    
+    parser.add_argument(
+        "--chunk-overlap",
+        type=int,
+        metavar="CHARS",
+        help="Characters repeated between neighbouring chunks (default: CHUNK_OVERLAP)"
+    )
+    
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve an OpenAI-compatible API (/v1/chat/completions) on localhost"
+    )
+    
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a background daemon serving the terminal aliases over a Unix socket"
+    )
+    
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface for --serve to bind (default: 127.0.0.1)"
+    )
+    
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port for --serve to listen on (default: 8080)"
+    )
+    
+    parser.add_argument(
+        "--batch-order",
+        choices=["input", "completed"],
+        default="input",
+        help="Write batch results in input order (default) or as they complete"
+    )
+    
     # Provider management
     parser.add_argument(
         "--provider",
@@ -98,6 +183,21 @@ After setup with -i, use these aliases in your terminal:
         help="Set API key for the provider"
     )
     
+    parser.add_argument(
+        "--route",
+        nargs="?",
+        const="",
+        metavar="TARGETS",
+        help="Route over several providers with failover, e.g. "
+             "'openai:gpt-4o-mini,anthropic:claude-3-5-haiku-20241022' (default: ROUTE_TARGETS)"
+    )
+    
+    parser.add_argument(
+        "--base-url",
+        metavar="URL",
+        help="Set the provider's base URL, e.g. an OpenAI-compatible server for --provider custom"
+    )
+    
     parser.add_argument(
         "--list-providers",
         action="store_true",
@@ -110,6 +210,18 @@ After setup with -i, use these aliases in your terminal:
         help="List models for a specific provider"
     )
     
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print connect time, time to first token, token gaps and size of each request"
+    )
+    
+    parser.add_argument(
+        "--refresh-models",
+        action="store_true",
+        help="Re-fetch model lists instead of using the cached ones (with --list-providers/--list-models)"
+    )
+    
     # Output options
     parser.add_argument(
         "--output", "-o",
@@ -135,6 +247,18 @@ After setup with -i, use these aliases in your terminal:
         help="Disable markdown rendering (show plain text output only)"
     )
     
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the response cache even when temperature is above 0"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the response cache"
+    )
+    
     # AI parameters
     parser.add_argument(
         "--temperature",
@@ -163,6 +287,30 @@ After setup with -i, use these aliases in your terminal:
         help="Show current configuration status"
     )
     
+    parser.add_argument(
+        "--usage",
+        nargs="?",
+        type=int,
+        const=30,
+        metavar="DAYS",
+        help="Show token usage and estimated cost per day and model (default: last 30 days)"
+    )
+    
+    parser.add_argument(
+        "--bench",
+        nargs="?",
+        const="all",
+        metavar="SECTIONS",
+        help="Benchmark DrGPT against a local mock provider and print JSON results; "
+             "SECTIONS is a comma-separated subset of startup,stream,render,batch (default: all)"
+    )
+    
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="Compare --bench results with an earlier run and exit 1 on regressions"
+    )
+    
     parser.add_argument(
         "--update",
         action="store_true",
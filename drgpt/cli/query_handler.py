@@ -8,11 +8,13 @@ import sys
 import argparse
 from typing import List
 
-from rich.markdown import Markdown
-
+from ..core.events import iter_text
 from ..core.manager import manager
+from ..core.metrics import metrics
+from ..core.router import ROUTER_PROVIDER
 from ..modes import StandardMode, CodeMode, ShellMode, ChatMode
-from ..utils.console import console, print_error, print_markdown
+from ..utils.console import console, print_error, print_markdown, print_warning
+from ..utils.markdown_stream import MarkdownStreamRenderer
 from ..utils.file_handler import save_response_to_file
 from ..utils.validation import validate_temperature, validate_max_tokens
 
@@ -28,13 +30,7 @@ def handle_query(args: argparse.Namespace) -> None:
         console.print("Use 'drgpt --help' for usage information")
         sys.exit(1)
     
-    # Set provider if specified
-    if args.provider or args.api_key:
-        manager.set_provider(
-            provider=args.provider or manager.config.get("DEFAULT_PROVIDER"),
-            model=args.model,
-            api_key=args.api_key
-        )
+    apply_provider_options(args)
     
     # Validate parameters
     try:
@@ -53,11 +49,25 @@ def handle_query(args: argparse.Namespace) -> None:
         kwargs["temperature"] = temperature
     if max_tokens is not None:
         kwargs["max_tokens"] = max_tokens
+    if args.no_cache:
+        kwargs["use_cache"] = False
+    elif args.cache:
+        kwargs["use_cache"] = True
     
     # Process prompt through mode
     processed_prompt = mode.process_prompt(args.prompt)
     
-    # Generate response
+    # Collect request timings for --timings
+    traces = []
+    try:
+        metrics.configure(manager.config)
+    except ImportError:
+        print_warning("METRICS_OTEL needs opentelemetry-api (pip install drgpt[otel])")
+    if args.timings:
+        metrics.add_exporter(traces.append)
+    
+    # Generate response (provider errors are raised as CompletionError, so
+    # they are neither saved to a file nor recorded in chat history)
     response_chunks = []
     try:
         if args.no_streaming:
@@ -71,6 +81,11 @@ def handle_query(args: argparse.Namespace) -> None:
     except Exception as e:
         print_error(str(e))
         sys.exit(1)
+    finally:
+        mode.close()
+        # On stderr so piped output stays clean
+        for trace in traces:
+            sys.stderr.write(f"Timings: {trace.format()}\n")
     
     # Save to file if requested
     if args.output:
@@ -80,6 +95,33 @@ def handle_query(args: argparse.Namespace) -> None:
         save_response_to_file(response_chunks, args.output, is_code_mode, is_shell_mode)
 
 
+def apply_provider_options(args: argparse.Namespace) -> None:
+    """Apply --route, --provider, --model, --api-key and --base-url
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    # Route over a pool of providers instead of a single default
+    if args.route is not None:
+        if args.route:
+            try:
+                manager.ai.set_routes(args.route)
+            except ValueError as e:
+                print_error(str(e))
+                sys.exit(1)
+        args.provider = ROUTER_PROVIDER
+        args.model = None
+    
+    # Set provider if specified
+    elif args.provider or args.api_key or args.base_url:
+        manager.set_provider(
+            provider=args.provider or manager.config.get("DEFAULT_PROVIDER"),
+            model=args.model,
+            api_key=args.api_key,
+            base_url=args.base_url
+        )
+
+
 def _get_mode_instance(args: argparse.Namespace):
     """Get the appropriate mode instance
     
@@ -99,6 +141,48 @@ def _get_mode_instance(args: argparse.Namespace):
         return StandardMode(manager)
 
 
+def _query_events(prompt: str, args: argparse.Namespace, mode, **kwargs):
+    """Start the query, chunking input too large for a single request
+    
+    Args:
+        prompt: The processed prompt
+        args: Command line arguments
+        mode: The mode instance
+        **kwargs: Additional query parameters
+        
+    Returns:
+        Iterator of completion events
+    """
+    source = getattr(args, "input_source", None)
+    if source is not None:
+        from ..core.chunking import MapReduce
+        
+        # get_messages ends with the prompt itself, keep the turns before it
+        messages = mode.get_messages(prompt)
+        
+        runner = MapReduce(
+            manager,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            overlap=args.chunk_overlap,
+            mode=mode.get_mode_name(),
+            provider=args.provider,
+            model=args.model,
+            **kwargs
+        )
+        return runner.stream_events(prompt, source, prefix=args.input_head,
+                                    history=messages[:-1] if messages else None)
+    
+    return manager.query_events(
+        prompt=prompt,
+        provider=args.provider,
+        model=args.model,
+        mode=mode.get_mode_name(),
+        messages=mode.get_messages(prompt),
+        **kwargs
+    )
+
+
 def _handle_non_streaming_query(prompt: str, args: argparse.Namespace, mode, **kwargs) -> List[str]:
     """Handle non-streaming query
     
@@ -113,15 +197,14 @@ def _handle_non_streaming_query(prompt: str, args: argparse.Namespace, mode, **k
     """
     response_chunks = []
     
-    with console.status("[bold green]Generating response...", spinner="dots"):
-        for chunk in manager.query(
-            prompt=prompt,
-            provider=args.provider,
-            model=args.model,
-            mode=mode.get_mode_name(),
-            **kwargs
-        ):
-            response_chunks.append(chunk)
+    events = _query_events(prompt, args, mode, **kwargs)
+    try:
+        with console.status("[bold green]Generating response...", spinner="dots"):
+            for chunk in iter_text(events, raise_errors=True, on_notice=print_warning):
+                response_chunks.append(chunk)
+    finally:
+        # Close the response also when interrupted or failed
+        events.close()
     
     # Get the complete response and render it
     full_response = "".join(response_chunks)
@@ -130,11 +213,13 @@ def _handle_non_streaming_query(prompt: str, args: argparse.Namespace, mode, **k
         # Handle mode-specific response processing
         if isinstance(mode, ShellMode):
             mode.handle_response(full_response)
-        elif args.no_markdown:
-            console.print(full_response)
         else:
-            # Show only markdown formatting by default for all modes
-            print_markdown(full_response)
+            if args.no_markdown:
+                console.print(full_response)
+            else:
+                # Show only markdown formatting by default for all modes
+                print_markdown(full_response)
+            mode.handle_response(full_response)
     
     return response_chunks
 
@@ -154,29 +239,32 @@ def _handle_streaming_query(prompt: str, args: argparse.Namespace, mode, **kwarg
     response_chunks = []
     
     # Streaming mode - show response as it comes
+    renderer = None
+    if not args.no_markdown and not isinstance(mode, ShellMode):
+        # Render markdown incrementally instead of after the full response
+        renderer = MarkdownStreamRenderer()
     
-    for chunk in manager.query(
-        prompt=prompt,
-        provider=args.provider,
-        model=args.model,
-        mode=mode.get_mode_name(),
-        **kwargs
-    ):
-        if args.no_markdown:
-            # Show raw text immediately if markdown is disabled
-            console.print(chunk, end="")
-        response_chunks.append(chunk)
-    
-    # Add final newline after streaming
-    console.print()
+    events = _query_events(prompt, args, mode, **kwargs)
+    try:
+        for chunk in iter_text(events, raise_errors=True, on_notice=print_warning):
+            if args.no_markdown:
+                # Show raw text immediately if markdown is disabled
+                console.print(chunk, end="")
+            elif renderer is not None:
+                renderer.feed(chunk)
+            response_chunks.append(chunk)
+    finally:
+        # Close the response now, also when interrupted, so a cancelled
+        # stream never holds on to its pooled connection
+        events.close()
+        if renderer is not None:
+            renderer.finish()
+        else:
+            # Add final newline after streaming
+            console.print()
     
     # Special post-processing for modes
     full_response = "".join(response_chunks)
-    if isinstance(mode, ShellMode):
-        mode.handle_response(full_response)
-    elif not args.no_markdown:
-        # Show formatted markdown version only if markdown is enabled
-        if full_response.strip():
-            print_markdown(full_response)
+    mode.handle_response(full_response)
     
     return response_chunks
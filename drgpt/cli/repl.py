@@ -0,0 +1,327 @@
+"""
+Interactive REPL for DrGPT
+
+Keeps one process, manager, provider connection pool and chat session
+alive across turns, so only the first question pays for imports, config
+parsing and the TLS handshake.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .. import __version__
+from ..core.config import SUPPORTED_PROVIDERS
+from ..core.manager import manager
+from ..core.metrics import metrics
+from ..core.router import ROUTER_PROVIDER
+from ..modes import ChatMode, CodeMode, ShellMode
+from ..utils.console import console, print_error, print_warning
+from ..utils.validation import validate_temperature, validate_max_tokens
+from .query_handler import _handle_streaming_query, apply_provider_options
+
+REPL_MODES = ("chat", "code", "shell")
+
+# Default session of chat mode when --chat is not given
+REPL_SESSION = "repl"
+
+HELP_TEXT = """Commands:
+  /mode [chat|code|shell]   Show or switch the mode
+  /provider [NAME]          Show or switch the provider (auto routes over ROUTE_TARGETS)
+  /model [NAME]             Show the models of the provider or switch the model
+  /clear                    Forget the chat session's history
+  /help                     Show this help
+  /exit                     Leave (or Ctrl-D)
+
+End a line with \\ to continue it, or wrap several lines in \"\"\".
+Ctrl-C stops the answer being streamed; the connection pool is kept."""
+
+
+class LineReader:
+    """Line input with editing and a persistent history
+    
+    Uses prompt_toolkit when it is installed, otherwise readline where the
+    platform has it, otherwise plain input().
+    """
+    
+    def __init__(self, history_path: Path):
+        """Initialize line reader
+    
+        Args:
+            history_path: File holding previously entered lines
+        """
+        self.history_path = history_path
+        self._session = None
+        self._readline = None
+    
+        try:
+            from prompt_toolkit import PromptSession
+            from prompt_toolkit.history import FileHistory
+        except ImportError:
+            self._init_readline()
+        else:
+            history_path.parent.mkdir(parents=True, exist_ok=True)
+            self._session = PromptSession(history=FileHistory(str(history_path)))
+    
+    def _init_readline(self) -> None:
+        """Load the history into readline, if available"""
+        try:
+            import readline
+        except ImportError:
+            return
+    
+        self._readline = readline
+        readline.set_history_length(1000)
+        try:
+            readline.read_history_file(str(self.history_path))
+        except OSError:
+            pass
+    
+    def read(self, prompt: str) -> str:
+        """Read one line
+    
+        Args:
+            prompt: Prompt shown before the input
+    
+        Returns:
+            The line without its newline
+    
+        Raises:
+            EOFError: On Ctrl-D
+            KeyboardInterrupt: On Ctrl-C
+        """
+        if self._session is not None:
+            return self._session.prompt(prompt)
+        return input(prompt)
+    
+    def read_message(self, prompt: str, continuation: str = "... ") -> str:
+        """Read a possibly multiline message
+    
+        A line ending in a backslash continues on the next line, and a line
+        holding only \"\"\" starts a block that ends at the next such line.
+    
+        Args:
+            prompt: Prompt shown before the first line
+            continuation: Prompt shown before further lines
+    
+        Returns:
+            The message
+        """
+        line = self.read(prompt)
+        if line.strip() == '"""':
+            lines = []
+            while True:
+                line = self.read(continuation)
+                if line.strip() == '"""':
+                    return "\n".join(lines)
+                lines.append(line)
+    
+        lines = []
+        while line.endswith("\\"):
+            lines.append(line[:-1])
+            line = self.read(continuation)
+        lines.append(line)
+        return "\n".join(lines)
+    
+    def close(self) -> None:
+        """Save the history"""
+        if self._readline is None:
+            return
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            self._readline.write_history_file(str(self.history_path))
+        except OSError:
+            pass
+
+
+class Repl:
+    """Read-eval-print loop over one DrGPT manager"""
+    
+    def __init__(self, args: argparse.Namespace, reader: Optional[LineReader] = None):
+        """Initialize REPL
+    
+        Args:
+            args: Parsed command line arguments (--chat, --code, --shell,
+                --provider, --model, --temperature, --max-tokens,
+                --no-markdown and --no-cache are honoured)
+            reader: Line reader. If None, one with the history file next
+                to the config file.
+        """
+        self.provider = args.provider
+        self.model = args.model or self._default_model(args.provider)
+        self.no_markdown = args.no_markdown
+        self.mode_name = "code" if args.code else "shell" if args.shell else "chat"
+        self.session_id = args.chat or REPL_SESSION
+        self._modes: Dict[str, Any] = {}
+    
+        self.kwargs: Dict[str, Any] = {}
+        temperature = validate_temperature(args.temperature)
+        max_tokens = validate_max_tokens(args.max_tokens)
+        if temperature is not None:
+            self.kwargs["temperature"] = temperature
+        if max_tokens is not None:
+            self.kwargs["max_tokens"] = max_tokens
+        if args.no_cache:
+            self.kwargs["use_cache"] = False
+    
+        if reader is None:
+            reader = LineReader(Path(manager.config.config_path).parent / "repl_history")
+        self.reader = reader
+    
+    @property
+    def mode(self):
+        """Mode instance of the current mode (kept for the whole session)"""
+        mode = self._modes.get(self.mode_name)
+        if mode is None:
+            if self.mode_name == "code":
+                mode = CodeMode(manager)
+            elif self.mode_name == "shell":
+                mode = ShellMode(manager)
+            else:
+                mode = ChatMode(manager, self.session_id)
+            self._modes[self.mode_name] = mode
+        return mode
+    
+    def run(self) -> None:
+        """Read and answer messages until /exit or Ctrl-D"""
+        console.print(f"DrGPT {__version__} - type /help for commands, Ctrl-D to leave")
+        try:
+            while True:
+                try:
+                    line = self.reader.read_message(f"{self.mode_name}> ")
+                except KeyboardInterrupt:
+                    # Discard the line being typed, like a shell
+                    console.print()
+                    continue
+                except EOFError:
+                    console.print()
+                    break
+    
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("/"):
+                    if not self.command(line):
+                        break
+                else:
+                    self.ask(line)
+        finally:
+            self.reader.close()
+            for mode in self._modes.values():
+                mode.close()
+    
+    def ask(self, prompt: str) -> None:
+        """Stream the answer to one message
+    
+        Ctrl-C stops the stream: its response is closed, so that one
+        connection is discarded while the rest of the pool stays open.
+    
+        Args:
+            prompt: The message
+        """
+        mode = self.mode
+        args = argparse.Namespace(
+            provider=self.provider, model=self.model, no_markdown=self.no_markdown, input_source=None
+        )
+        try:
+            _handle_streaming_query(mode.process_prompt(prompt), args, mode, **self.kwargs)
+        except KeyboardInterrupt:
+            console.print("[[yellow]-[/yellow]] Cancelled")
+        except Exception as e:
+            print_error(str(e))
+    
+    def command(self, line: str) -> bool:
+        """Run a slash command
+    
+        Args:
+            line: The command line, starting with /
+    
+        Returns:
+            False if the REPL should exit
+        """
+        name, _, value = line[1:].partition(" ")
+        name = name.lower()
+        value = value.strip()
+    
+        if name in ("exit", "quit", "q"):
+            return False
+    
+        if name == "help":
+            console.print(HELP_TEXT, markup=False, highlight=False)
+        elif name == "mode":
+            if not value:
+                console.print(f"Mode: {self.mode_name} (choose from {', '.join(REPL_MODES)})")
+            elif value in REPL_MODES:
+                self.mode_name = value
+            else:
+                print_error(f"Unknown mode: {value} (choose from {', '.join(REPL_MODES)})")
+        elif name == "provider":
+            if not value:
+                console.print(f"Provider: {self._provider_name()} "
+                              f"(choose from {', '.join(SUPPORTED_PROVIDERS)}, {ROUTER_PROVIDER})")
+            elif value in SUPPORTED_PROVIDERS or value == ROUTER_PROVIDER:
+                self.provider = value
+                self.model = self._default_model(value)
+            else:
+                print_error(f"Unknown provider: {value}")
+        elif name == "model":
+            if value:
+                self.model = value
+            elif self._provider_name() == ROUTER_PROVIDER:
+                console.print("Models are chosen by the router")
+            else:
+                models = manager.ai.get_models(self._provider_name())
+                console.print(f"Model: {self.model or manager.config.get('DEFAULT_MODEL')} "
+                              f"({self._provider_name()})")
+                if models:
+                    console.print("Available: " + ", ".join(models))
+        elif name == "clear":
+            if self.mode_name == "chat":
+                self.mode.history.clear()
+                console.print(f"Cleared chat session {self.session_id}")
+            else:
+                print_warning("Only chat mode keeps a history")
+        else:
+            print_error(f"Unknown command: /{name} (type /help)")
+        return True
+    
+    def _provider_name(self) -> str:
+        """Provider used for the next message"""
+        return self.provider or manager.config.get("DEFAULT_PROVIDER")
+    
+    @staticmethod
+    def _default_model(provider: Optional[str]) -> Optional[str]:
+        """Model used for a provider when none was chosen
+    
+        The configured DEFAULT_MODEL belongs to DEFAULT_PROVIDER; other
+        providers start with their first listed model, like --provider.
+        Unlike --provider, switching in the REPL leaves the config alone.
+        """
+        if provider is None or provider == manager.config.get("DEFAULT_PROVIDER"):
+            return None
+        models = SUPPORTED_PROVIDERS.get(provider, {}).get("models")
+        return models[0] if models else None
+
+
+def handle_repl(args: argparse.Namespace) -> None:
+    """Handle --repl command
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    if not sys.stdin.isatty():
+        print_error("--repl needs an interactive terminal")
+        sys.exit(1)
+    
+    apply_provider_options(args)
+    try:
+        repl = Repl(args)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    
+    if args.timings:
+        metrics.add_exporter(lambda trace: sys.stderr.write(f"Timings: {trace.format()}\n"))
+    
+    repl.run()
@@ -0,0 +1,56 @@
+"""
+Server handling for DrGPT CLI
+
+Runs the OpenAI-compatible HTTP server and the alias daemon.
+"""
+
+import argparse
+import socket
+import sys
+
+from ..core.manager import get_manager
+from ..utils.console import print_error
+
+
+def handle_serve(args: argparse.Namespace) -> None:
+    """Handle --serve command
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    from ..server import run_server
+    
+    manager = get_manager()
+    
+    def ready(server) -> None:
+        host, port = server.address
+        sys.stderr.write(f"DrGPT serving OpenAI-compatible API on http://{host}:{port}/v1\n")
+    
+    try:
+        run_server(manager, args.host, args.port, args.workers, ready=ready)
+    except OSError as e:
+        print_error(f"Could not start server: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.stderr.write("Server stopped\n")
+
+
+def handle_daemon(args: argparse.Namespace) -> None:
+    """Handle --daemon command
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        print_error("The daemon needs Unix domain sockets, which this platform does not support")
+        sys.exit(1)
+    
+    from ..server.daemon import run_daemon
+    
+    try:
+        run_daemon(get_manager(), workers=args.workers)
+    except OSError as e:
+        print_error(f"Could not start daemon: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.stderr.write("Daemon stopped\n")
@@ -1,11 +1,17 @@
 """Core module initialization"""
 
-from .config import Config, config, SUPPORTED_PROVIDERS
-from .ai_interface import AIInterface, ai_interface
-from .manager import DrGPTManager, manager
+from .config import Config, config, get_config, SUPPORTED_PROVIDERS
+from .ai_interface import AIInterface, ai_interface, get_ai_interface
+from .manager import DrGPTManager, manager, get_manager
+from .events import (
+    CompletionError, CompletionEvent, CompletionResult, ErrorEvent, Finish, Notice, TextDelta, Usage
+)
+from .stream import CompletionStream
 
 __all__ = [
-    "Config", "config", "SUPPORTED_PROVIDERS",
-    "AIInterface", "ai_interface", 
-    "DrGPTManager", "manager"
+    "Config", "config", "get_config", "SUPPORTED_PROVIDERS",
+    "AIInterface", "ai_interface", "get_ai_interface",
+    "DrGPTManager", "manager", "get_manager",
+    "CompletionEvent", "TextDelta", "Usage", "Finish", "ErrorEvent", "Notice",
+    "CompletionError", "CompletionResult", "CompletionStream"
 ]
@@ -6,28 +6,287 @@ OpenAI, Anthropic, Google, and custom APIs.
 """
 
 import json
-import requests
-from typing import Dict, List, Generator, Optional, Any
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING, Callable, Dict, List, Generator, AsyncGenerator, Iterable, NamedTuple, Optional, Any, Tuple, Union
+)
 from abc import ABC, abstractmethod
 
 from .config import config, SUPPORTED_PROVIDERS
+from .events import (
+    CompletionEvent, CompletionResult, ErrorEvent, Finish, Notice, TextDelta, Usage,
+    aiter_text, text_events
+)
+from .registry import register_provider, registry
+from ..utils.lazy import LazyObject
+
+if TYPE_CHECKING:
+    # Imported where used, so importing drgpt (e.g. for --version) stays cheap
+    from concurrent.futures import Executor
+    from .cache import ResponseCache
+    from .catalog import ModelCatalog
+    from .ledger import UsageLedger
+    from .retry import RetryPolicy
+    from .router import Router
+    from .stream import CompletionStream
+    from .transport import TransportSettings
+
+try:
+    # Optional faster JSON backend (pip install drgpt[speedups])
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+# Bytes requested per network read when streaming responses
+SSE_READ_SIZE = 16384
+
+# Provider-specific finish reasons mapped to OpenAI's vocabulary
+FINISH_REASONS = {
+    "end_turn": "stop",
+    "stop_sequence": "stop",
+    "max_tokens": "length",
+    "tool_use": "tool_calls",
+    # Gemini
+    "STOP": "stop",
+    "MAX_TOKENS": "length",
+    "SAFETY": "content_filter",
+    "RECITATION": "content_filter",
+    "BLOCKLIST": "content_filter",
+    "PROHIBITED_CONTENT": "content_filter",
+}
+
+
+class SSEEvent(NamedTuple):
+    """A dispatched Server-Sent Event"""
+    event: str
+    data: bytes
+
+
+class SSEDecoder:
+    """Incremental Server-Sent Events decoder
+    
+    Works directly on raw bytes: each network read is split into lines in
+    one C-level pass, lines are never decoded to str, blank separators and
+    ``:`` keep-alive comments are skipped with a single byte comparison,
+    and multi-line ``data:`` fields are joined per the SSE specification.
+    Event payloads are returned as bytes, ready for ``json_loads``.
+    """
+    
+    __slots__ = ("_buffer", "_event", "_data")
+    
+    def __init__(self):
+        """Initialize SSE decoder"""
+        self._buffer = b""
+        self._event = b""
+        self._data = None
+    
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Feed raw bytes and return the events they complete
+        
+        Args:
+            chunk: Bytes received from the network
+            
+        Returns:
+            List of complete events
+        """
+        lines = (self._buffer + chunk if self._buffer else chunk).split(b"\n")
+        # The last element is an incomplete line (or b"" after a newline)
+        self._buffer = lines.pop()
+        
+        events = []
+        data = self._data
+        for line in lines:
+            if not line or line == b"\r":
+                # Blank line: dispatch the pending event, if any
+                if data is not None:
+                    events.append(SSEEvent(
+                        self._event.decode("utf-8") if self._event else "message",
+                        data[0] if len(data) == 1 else b"\n".join(data)
+                    ))
+                    self._event = b""
+                    data = None
+                continue
+            
+            if line[-1] == 13:
+                line = line[:-1]
+            
+            first = line[0]
+            if first == 100 and line.startswith(b"data:"):
+                value = line[6:] if line.startswith(b"data: ") else line[5:]
+                if data is None:
+                    data = [value]
+                else:
+                    data.append(value)
+            elif first == 58:
+                # ":" comment / keep-alive
+                continue
+            elif line.startswith(b"event:"):
+                self._event = line[7:] if line.startswith(b"event: ") else line[6:]
+            # Other fields (id, retry) are not used by any provider
+        
+        self._data = data
+        return events
+    
+    def flush(self) -> List[SSEEvent]:
+        """Finish the stream, dispatching a final unterminated event
+        
+        Returns:
+            List of remaining events
+        """
+        return self.feed(b"\n\n" if self._buffer else b"\n")
+
+
+def iter_sse_events(
+    response,
+    chunk_size: int = SSE_READ_SIZE,
+    on_chunk: Optional[Callable[[int], None]] = None
+) -> Generator[SSEEvent, None, None]:
+    """Iterate over the Server-Sent Events of a streaming response
+    
+    Args:
+        response: Streaming requests response
+        chunk_size: Maximum bytes per network read
+        on_chunk: Called with the size of every chunk read (optional)
+        
+    Yields:
+        Decoded events
+    """
+    decoder = SSEDecoder()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if chunk:
+            if on_chunk is not None:
+                on_chunk(len(chunk))
+            yield from decoder.feed(chunk)
+    yield from decoder.flush()
 
 
 class AIProvider(ABC):
     """Abstract base class for AI providers"""
     
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        retry_policy: Optional["RetryPolicy"] = None,
+        transport: Optional["TransportSettings"] = None
+    ):
         """Initialize AI provider
         
         Args:
             api_key: API key for authentication
             base_url: Base URL for API calls
+            retry_policy: Retry policy for requests. If None, built from config.
+            transport: Connection settings. If None, built from config.
         """
+        from .retry import LatencyTracker, RetryPolicy
+        from .transport import TransportSettings, create_session
+        
         self.api_key = api_key
         self.base_url = base_url
-        self.session = requests.Session()
+        self.transport = transport or TransportSettings.from_config(config)
+        self.session = create_session(self.transport)
+        self.retry_policy = retry_policy or RetryPolicy.from_config(config)
+        self.latency = LatencyTracker()
         self._setup_headers()
     
+    def _post_stream(self, url: str, payload: Dict[str, Any]):
+        """Send a streaming POST request with retries and optional hedging
+        
+        Retries and hedging only happen before the response body is read,
+        so no streamed text is ever duplicated.
+        
+        Args:
+            url: Request URL
+            payload: JSON payload
+            
+        Returns:
+            Streaming response with a successful status
+            
+        Raises:
+            requests.exceptions.RequestException: If every attempt fails
+        """
+        if not config.get("HEDGE_REQUESTS"):
+            return self._post_with_retry(url, payload)
+        
+        from .retry import hedged_call
+        
+        # Hedge after the configured delay, or the observed p95 latency
+        hedge_after = config.get("HEDGE_AFTER") or self.latency.percentile(0.95)
+        if not hedge_after:
+            return self._post_with_retry(url, payload)
+        
+        return hedged_call(
+            lambda: self._post_with_retry(url, payload),
+            hedge_after,
+            discard=lambda response: response.close()
+        )
+    
+    def _stream_sse(self, url: str, payload: Dict[str, Any]) -> Generator[SSEEvent, None, None]:
+        """POST a streaming request and iterate over its Server-Sent Events
+        
+        The response is always closed; when the stream is read to the end
+        its connection goes back to the pool for the next request. It is
+        registered with the CompletionStream being read, if any, so
+        cancelling that stream interrupts a blocked read.
+        
+        Args:
+            url: Request URL
+            payload: JSON payload
+            
+        Yields:
+            Decoded events
+        """
+        from .metrics import current_trace
+        from .stream import attached
+        
+        trace = current_trace.get()
+        with self._post_stream(url, payload) as response, attached(response):
+            if trace is None:
+                yield from iter_sse_events(response)
+                return
+            trace.connected()
+            yield from iter_sse_events(response, on_chunk=trace.received)
+    
+    def _post_with_retry(self, url: str, payload: Dict[str, Any]):
+        """Send a streaming POST request, retrying per the retry policy
+        
+        Args:
+            url: Request URL
+            payload: JSON payload
+            
+        Returns:
+            Streaming response with a successful status
+            
+        Raises:
+            requests.exceptions.RequestException: If every attempt fails
+        """
+        import requests
+        
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.post(url, json=payload, stream=True, timeout=self.transport.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= policy.max_attempts:
+                    raise
+                time.sleep(policy.delay(attempt))
+                continue
+            
+            if attempt < policy.max_attempts and policy.is_retryable_status(response.status_code):
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+                time.sleep(policy.delay(attempt, retry_after))
+                continue
+            
+            response.raise_for_status()
+            # Time until response headers, i.e. until streaming can start
+            self.latency.record(response.elapsed.total_seconds())
+            return response
+    
     def _setup_headers(self) -> None:
         """Setup default headers for requests"""
         self.session.headers.update({
@@ -36,18 +295,128 @@ class AIProvider(ABC):
         })
     
     @abstractmethod
-    def generate_completion(self, messages: List[Dict], model: str, **kwargs) -> Generator[str, None, None]:
+    def stream_events(self, messages: List[Dict], model: str, **kwargs) -> Generator[CompletionEvent, None, None]:
+        """Stream a completion from the AI provider as typed events
+        
+        Failures are reported as an ErrorEvent rather than raised, so a
+        partially streamed response is never lost.
+        
+        Args:
+            messages: List of conversation messages
+            model: Model name to use
+            **kwargs: Additional parameters
+            
+        Yields:
+            TextDelta, Usage, Finish and ErrorEvent events
+        """
+        pass
+    
+    def generate_completion(
+        self,
+        messages: List[Dict],
+        model: str,
+        deadline: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        **kwargs
+    ) -> "CompletionStream":
         """Generate completion from the AI provider
         
+        Text-only view of stream_events; errors are yielded in-band as
+        ``"Error: ..."`` / ``"Network error: ..."`` chunks.
+        
+        Args:
+            messages: List of conversation messages
+            model: Model name to use
+            deadline: Seconds the completion may take. If None, uses
+                STREAM_DEADLINE from config.
+            idle_timeout: Seconds to wait for each token. If None, uses
+                STREAM_IDLE_TIMEOUT from config.
+            **kwargs: Additional parameters
+            
+        Returns:
+            Cancellable stream of generated text chunks
+        """
+        from .stream import CompletionStream
+        
+        return CompletionStream.from_config(
+            self.stream_events(messages, model, **kwargs), config, deadline, idle_timeout, text=True
+        )
+    
+    async def astream_events(
+        self,
+        messages: List[Dict],
+        model: str,
+        executor: Optional["Executor"] = None,
+        **kwargs
+    ) -> AsyncGenerator[CompletionEvent, None]:
+        """Asynchronously stream a completion as typed events
+        
+        The default implementation drives the streaming generator on a
+        worker thread, so concurrent completions share this provider's
+        session and its connection pool. Closing the generator (e.g. when
+        the consuming task is cancelled) shuts the response down even
+        while the worker is blocked reading it. STREAM_DEADLINE and
+        STREAM_IDLE_TIMEOUT from config apply to each request.
+        
+        Args:
+            messages: List of conversation messages
+            model: Model name to use
+            executor: Executor running the blocking reads (optional)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Completion events
+        """
+        import asyncio
+        import contextvars
+        from .stream import CompletionStream
+        
+        loop = asyncio.get_running_loop()
+        events = CompletionStream.from_config(self.stream_events(messages, model, **kwargs), config)
+        # Carry context variables (the request trace) to the worker thread
+        context = contextvars.copy_context()
+        done = object()
+        try:
+            while True:
+                event = await loop.run_in_executor(executor, context.run, next, events, done)
+                if event is done:
+                    break
+                yield event
+        finally:
+            events.close()
+    
+    async def agenerate_completion(
+        self,
+        messages: List[Dict],
+        model: str,
+        executor: Optional["Executor"] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Asynchronously generate completion from the AI provider
+        
         Args:
             messages: List of conversation messages
             model: Model name to use
+            executor: Executor running the blocking reads (optional)
             **kwargs: Additional parameters
             
         Yields:
             Generated text chunks
         """
-        pass
+        async for chunk in aiter_text(self.astream_events(messages, model, executor=executor, **kwargs)):
+            yield chunk
+    
+    def resize_pool(self, size: int) -> None:
+        """Make the session keep at least size connections per host
+        
+        Args:
+            size: Number of pooled connections
+        """
+        from .transport import create_adapter, mount_adapter, pool_size_of
+        
+        if pool_size_of(self.session) >= size:
+            return
+        mount_adapter(self.session, create_adapter(self.transport, size))
     
     @abstractmethod
     def get_models(self) -> List[str]:
@@ -57,8 +426,44 @@ class AIProvider(ABC):
             List of model names
         """
         pass
+    
+    def fetch_models(self, etag: Optional[str] = None) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Fetch the model list from the provider's models endpoint
+        
+        Args:
+            etag: ETag of the previously fetched list, for revalidation
+            
+        Returns:
+            Tuple of (model names, or None if the list is unchanged; ETag)
+            
+        Raises:
+            NotImplementedError: If the provider has no models endpoint
+            requests.exceptions.RequestException: If the request fails
+        """
+        raise NotImplementedError
+    
+    def _get_json(self, url: str, etag: Optional[str] = None,
+                  params: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """Send a conditional GET request
+        
+        Args:
+            url: Request URL
+            etag: Value for If-None-Match (optional)
+            params: Query parameters (optional)
+            
+        Returns:
+            Tuple of (decoded JSON, or None on 304 Not Modified; ETag)
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        response = self.session.get(url, params=params, headers=headers, timeout=self.transport.timeout)
+        with response:
+            if response.status_code == 304:
+                return None, etag
+            response.raise_for_status()
+            return json_loads(response.content), response.headers.get("ETag")
 
 
+@register_provider("openai")
 class OpenAIProvider(AIProvider):
     """OpenAI API Provider"""
     
@@ -70,7 +475,7 @@ class OpenAIProvider(AIProvider):
             "User-Agent": "DrGPT/1.0.0"
         })
     
-    def generate_completion(self, messages: List[Dict], model: str, **kwargs) -> Generator[str, None, None]:
+    def stream_events(self, messages: List[Dict], model: str, **kwargs) -> Generator[CompletionEvent, None, None]:
         """Generate streaming completion from OpenAI
         
         Args:
@@ -79,8 +484,10 @@ class OpenAIProvider(AIProvider):
             **kwargs: Additional parameters (temperature, max_tokens, etc.)
             
         Yields:
-            Generated text chunks
+            Completion events
         """
+        import requests
+        
         url = f"{self.base_url}/chat/completions"
         
         payload = {
@@ -89,39 +496,61 @@ class OpenAIProvider(AIProvider):
             "stream": True,
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 2048),
-            "top_p": kwargs.get("top_p", 1.0)
+            "top_p": kwargs.get("top_p", 1.0),
+            # Ask for a final usage chunk
+            "stream_options": {"include_usage": True}
         }
         
         try:
-            response = self.session.post(url, json=payload, stream=True, timeout=60)
-            response.raise_for_status()
-            
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        line = line[6:]
-                        if line.strip() == '[DONE]':
-                            break
-                        try:
-                            data = json.loads(line)
-                            if 'choices' in data and len(data['choices']) > 0:
-                                delta = data['choices'][0].get('delta', {})
-                                content = delta.get('content', '')
-                                if content:
-                                    yield content
-                        except json.JSONDecodeError:
-                            continue
+            finish_reason = None
+            for event in self._stream_sse(url, payload):
+                if event.data.startswith(b'[DONE]'):
+                    # Keep reading to the end so the connection is reused
+                    continue
+                try:
+                    data = json_loads(event.data)
+                except ValueError:
+                    continue
+                if data.get('error'):
+                    error = data['error']
+                    yield ErrorEvent(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+                    return
+                if 'choices' in data and len(data['choices']) > 0:
+                    choice = data['choices'][0]
+                    delta = choice.get('delta') or {}
+                    content = delta.get('content', '')
+                    if content:
+                        yield TextDelta(content)
+                    if choice.get('finish_reason'):
+                        finish_reason = choice['finish_reason']
+                usage = data.get('usage')
+                if usage:
+                    yield Usage(usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0))
+            yield Finish(finish_reason or "stop")
         except requests.exceptions.RequestException as e:
-            yield f"Network error: {str(e)}"
+            yield ErrorEvent(str(e), "network")
         except Exception as e:
-            yield f"Error: {str(e)}"
+            yield ErrorEvent(str(e))
     
     def get_models(self) -> List[str]:
         """Get available OpenAI models"""
         return SUPPORTED_PROVIDERS["openai"]["models"]
+    
+    # Chat models among everything /models lists (embeddings, audio, ...)
+    MODEL_PREFIXES: Tuple[str, ...] = ("gpt-", "chatgpt-", "o1", "o3", "o4")
+    
+    def fetch_models(self, etag: Optional[str] = None) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Fetch models from GET /models, see AIProvider.fetch_models"""
+        data, etag = self._get_json(f"{self.base_url}/models", etag)
+        if data is None:
+            return None, etag
+        models = [item["id"] for item in data.get("data", []) if item.get("id")]
+        if self.MODEL_PREFIXES:
+            models = [model for model in models if model.startswith(self.MODEL_PREFIXES)]
+        return sorted(models), etag
 
 
+@register_provider("anthropic")
 class AnthropicProvider(AIProvider):
     """Anthropic (Claude) API Provider"""
     
@@ -134,7 +563,7 @@ class AnthropicProvider(AIProvider):
             "User-Agent": "DrGPT/1.0.0"
         })
     
-    def generate_completion(self, messages: List[Dict], model: str, **kwargs) -> Generator[str, None, None]:
+    def stream_events(self, messages: List[Dict], model: str, **kwargs) -> Generator[CompletionEvent, None, None]:
         """Generate completion from Anthropic API
         
         Args:
@@ -143,8 +572,10 @@ class AnthropicProvider(AIProvider):
             **kwargs: Additional parameters
             
         Yields:
-            Generated text chunks
+            Completion events
         """
+        import requests
+        
         url = f"{self.base_url}/messages"
         
         # Convert messages format for Anthropic
@@ -168,38 +599,236 @@ class AnthropicProvider(AIProvider):
             payload["system"] = system_message
         
         try:
-            response = self.session.post(url, json=payload, stream=True, timeout=60)
-            response.raise_for_status()
+            input_tokens = output_tokens = 0
+            stop_reason = None
+            for event in self._stream_sse(url, payload):
+                try:
+                    data = json_loads(event.data)
+                except ValueError:
+                    continue
+                event_type = data.get("type")
+                if event_type == "content_block_delta":
+                    delta = data.get("delta", {})
+                    text = delta.get("text", "")
+                    if text:
+                        yield TextDelta(text)
+                elif event_type == "message_start":
+                    usage = data.get("message", {}).get("usage") or {}
+                    input_tokens = usage.get("input_tokens", input_tokens)
+                    output_tokens = usage.get("output_tokens", output_tokens)
+                elif event_type == "message_delta":
+                    stop_reason = data.get("delta", {}).get("stop_reason") or stop_reason
+                    output_tokens = (data.get("usage") or {}).get("output_tokens", output_tokens)
+                elif event_type == "error":
+                    error = data.get("error") or {}
+                    yield ErrorEvent(error.get("message", "Unknown error"))
+                    return
             
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        line = line[6:]
-                        try:
-                            data = json.loads(line)
-                            if data.get("type") == "content_block_delta":
-                                delta = data.get("delta", {})
-                                text = delta.get("text", "")
-                                if text:
-                                    yield text
-                        except json.JSONDecodeError:
-                            continue
+            if input_tokens or output_tokens:
+                yield Usage(input_tokens, output_tokens)
+            yield Finish(FINISH_REASONS.get(stop_reason, stop_reason or "stop"))
         except requests.exceptions.RequestException as e:
-            yield f"Network error: {str(e)}"
+            yield ErrorEvent(str(e), "network")
         except Exception as e:
-            yield f"Error: {str(e)}"
+            yield ErrorEvent(str(e))
     
     def get_models(self) -> List[str]:
         """Get available Anthropic models"""
         return SUPPORTED_PROVIDERS["anthropic"]["models"]
+    
+    def fetch_models(self, etag: Optional[str] = None) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Fetch models from GET /models, see AIProvider.fetch_models"""
+        # Only the first page is revalidated
+        data, etag = self._get_json(f"{self.base_url}/models", etag, {"limit": 1000})
+        if data is None:
+            return None, etag
+        models = []
+        while True:
+            models.extend(item["id"] for item in data.get("data", []) if item.get("id"))
+            if not data.get("has_more") or not data.get("last_id"):
+                return models, etag
+            data, _ = self._get_json(f"{self.base_url}/models", params={"limit": 1000, "after_id": data["last_id"]})
+
+
+@register_provider("google")
+class GoogleProvider(AIProvider):
+    """Google Gemini API Provider"""
+    
+    # Gemini names the assistant role "model"
+    ROLES = {"user": "user", "assistant": "model"}
+    
+    def _setup_headers(self) -> None:
+        """Setup Google specific headers"""
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key,
+            "User-Agent": "DrGPT/1.0.0"
+        })
+    
+    def _build_payload(self, messages: List[Dict], **kwargs) -> Dict[str, Any]:
+        """Convert chat messages to a generateContent request
+        
+        System messages become the system instruction; consecutive turns
+        of the same role are merged, as Gemini expects alternating turns.
+        
+        Args:
+            messages: List of conversation messages
+            **kwargs: Generation parameters
+            
+        Returns:
+            Request payload
+        """
+        system_parts = []
+        contents = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_parts.append({"text": msg["content"]})
+                continue
+            role = self.ROLES.get(msg["role"], "user")
+            if contents and contents[-1]["role"] == role:
+                contents[-1]["parts"].append({"text": msg["content"]})
+            else:
+                contents.append({"role": role, "parts": [{"text": msg["content"]}]})
+        
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": kwargs.get("temperature", 0.7),
+                "maxOutputTokens": kwargs.get("max_tokens", 2048),
+                "topP": kwargs.get("top_p", 1.0)
+            }
+        }
+        if system_parts:
+            payload["systemInstruction"] = {"parts": system_parts}
+        return payload
+    
+    def stream_events(self, messages: List[Dict], model: str, **kwargs) -> Generator[CompletionEvent, None, None]:
+        """Generate streaming completion from Gemini
+        
+        Args:
+            messages: List of conversation messages
+            model: Gemini model name
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+            
+        Yields:
+            Completion events
+        """
+        import requests
+        
+        url = f"{self.base_url}/models/{model}:streamGenerateContent?alt=sse"
+        payload = self._build_payload(messages, **kwargs)
+        
+        try:
+            finish_reason = None
+            usage = None
+            for event in self._stream_sse(url, payload):
+                try:
+                    data = json_loads(event.data)
+                except ValueError:
+                    continue
+                if data.get("error"):
+                    error = data["error"]
+                    yield ErrorEvent(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+                    return
+                block_reason = (data.get("promptFeedback") or {}).get("blockReason")
+                if block_reason:
+                    yield ErrorEvent(f"Prompt blocked by Gemini ({block_reason})")
+                    return
+                for candidate in data.get("candidates") or []:
+                    for part in (candidate.get("content") or {}).get("parts") or []:
+                        text = part.get("text")
+                        if text:
+                            yield TextDelta(text)
+                    if candidate.get("finishReason"):
+                        finish_reason = candidate["finishReason"]
+                    # Only the first candidate is requested
+                    break
+                # Counts are cumulative, the last chunk has the totals
+                usage = data.get("usageMetadata") or usage
+            if usage:
+                yield Usage(usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0))
+            yield Finish(FINISH_REASONS.get(finish_reason, (finish_reason or "stop").lower()))
+        except requests.exceptions.RequestException as e:
+            yield ErrorEvent(str(e), "network")
+        except Exception as e:
+            yield ErrorEvent(str(e))
+    
+    def get_models(self) -> List[str]:
+        """Get available Gemini models"""
+        return SUPPORTED_PROVIDERS["google"]["models"]
+    
+    def fetch_models(self, etag: Optional[str] = None) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Fetch models that support generateContent, see AIProvider.fetch_models"""
+        # Only the first page is revalidated
+        data, etag = self._get_json(f"{self.base_url}/models", etag, {"pageSize": 1000})
+        if data is None:
+            return None, etag
+        models = []
+        while True:
+            for item in data.get("models", []):
+                name = item.get("name", "").split("/", 1)[-1]
+                if name and "generateContent" in item.get("supportedGenerationMethods", ["generateContent"]):
+                    models.append(name)
+            if not data.get("nextPageToken"):
+                return models, etag
+            data, _ = self._get_json(
+                f"{self.base_url}/models", params={"pageSize": 1000, "pageToken": data["nextPageToken"]}
+            )
+
 
+@register_provider("custom")
+class CustomProvider(OpenAIProvider):
+    """OpenAI-compatible server, e.g. llama.cpp, vLLM or Ollama
+    
+    The base URL comes from CUSTOM_BASE_URL (e.g. http://localhost:8000/v1)
+    and the API key is optional.
+    """
+    
+    def _setup_headers(self) -> None:
+        """Setup headers, sending Authorization only when a key is set"""
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "User-Agent": "DrGPT/1.0.0"
+        })
+        if self.api_key:
+            self.session.headers["Authorization"] = f"Bearer {self.api_key}"
+    
+    def stream_events(self, messages: List[Dict], model: str, **kwargs) -> Generator[CompletionEvent, None, None]:
+        """Generate streaming completion from the configured server
+        
+        Args:
+            messages: List of conversation messages
+            model: Model name served by the server
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+            
+        Yields:
+            Completion events
+        """
+        if not self.base_url:
+            yield ErrorEvent("No base URL configured for the custom provider (set CUSTOM_BASE_URL)")
+            return
+        yield from super().stream_events(messages, model, **kwargs)
+    
+    # Local servers list only what they serve
+    MODEL_PREFIXES = ()
+    
+    def get_models(self) -> List[str]:
+        """Discover the server's models through GET /models
+        
+        Returns:
+            Model names, or the configured list if discovery fails
+        """
+        try:
+            return self.fetch_models()[0]
+        except Exception:
+            return list(SUPPORTED_PROVIDERS["custom"]["models"])
 
-class CustomProvider(AIProvider):
-    """Custom API Provider (fallback)"""
+
+class FallbackProvider(AIProvider):
+    """Placeholder answering when no provider is available"""
     
-    def generate_completion(self, messages: List[Dict], model: str, **kwargs) -> Generator[str, None, None]:
-        """Generate fallback response for custom provider
+    def stream_events(self, messages: List[Dict], model: str, **kwargs) -> Generator[CompletionEvent, None, None]:
+        """Generate fallback response
         
         Args:
             messages: List of conversation messages
@@ -207,7 +836,7 @@ class CustomProvider(AIProvider):
             **kwargs: Additional parameters (ignored)
             
         Yields:
-            Fallback response
+            Fallback response events
         """
         # Extract the user's message
         user_message = ""
@@ -217,64 +846,160 @@ class CustomProvider(AIProvider):
                 break
         
         # Generate a simple fallback response
-        yield "Hello! I'm DrGPT, your AI assistant. "
-        yield f"I received your message: '{user_message[:50]}...' " if len(user_message) > 50 else f"I received your message: '{user_message}' "
-        yield "However, I don't have access to an AI provider right now. "
-        yield "Please configure an API key for OpenAI, Anthropic, or another supported provider to get intelligent responses."
+        yield TextDelta("Hello! I'm DrGPT, your AI assistant. ")
+        yield TextDelta(f"I received your message: '{user_message[:50]}...' " if len(user_message) > 50 else f"I received your message: '{user_message}' ")
+        yield TextDelta("However, I don't have access to an AI provider right now. ")
+        yield TextDelta("Please configure an API key for OpenAI, Anthropic, or another supported provider to get intelligent responses.")
+        yield Finish()
     
     def get_models(self) -> List[str]:
-        """Get available custom models"""
-        return ["custom-model"]
+        """Get available fallback models"""
+        return []
 
 
 class AIInterface:
     """Main AI interface that manages different providers"""
     
     def __init__(self):
-        """Initialize AI interface"""
+        """Initialize AI interface
+        
+        Providers are created on first use, so constructing the interface
+        opens no sessions and prompts for no API keys.
+        """
         self.providers = {}
-        self._initialize_providers()
+        self._cache = None
+        self._router = None
+        self._catalog = None
+        self._ledger = None
+        self._fallback = None
     
-    def _initialize_providers(self) -> None:
-        """Initialize available providers based on configuration
-        
-        On first run, only prompts for OpenAI API key (default provider).
-        Other providers are initialized only if their keys already exist.
-        """
-        # Only initialize OpenAI as default provider on first run
-        default_provider = config.get("DEFAULT_PROVIDER")
-        
-        # OpenAI - always initialize if it's the default provider
-        if default_provider == "openai":
-            openai_key = config.get_api_key("openai")
-            if openai_key:
-                openai_config = config.get_provider_config("openai")
-                self.providers["openai"] = OpenAIProvider(
-                    openai_key, 
-                    openai_config["base_url"]
-                )
-        
-        # Anthropic - only initialize if key already exists (don't prompt)
-        anthropic_key = config.get_api_key_silent("anthropic")
-        if anthropic_key:
-            anthropic_config = config.get_provider_config("anthropic")
-            self.providers["anthropic"] = AnthropicProvider(
-                anthropic_key,
-                anthropic_config["base_url"]
+    @property
+    def cache(self) -> "ResponseCache":
+        """Response cache, created on first use"""
+        if self._cache is None:
+            from .cache import ResponseCache
+            
+            self._cache = ResponseCache(
+                Path(config.get("CACHE_PATH")),
+                config.get("CACHE_LENGTH", 100)
             )
+        return self._cache
+    
+    @property
+    def catalog(self) -> "ModelCatalog":
+        """Model list cache, created on first use"""
+        if self._catalog is None:
+            from .catalog import ModelCatalog
+            
+            self._catalog = ModelCatalog(
+                Path(config.get("MODELS_CACHE_PATH")),
+                config.get("MODELS_CACHE_TTL", 86400)
+            )
+        return self._catalog
+    
+    @property
+    def ledger(self) -> Optional["UsageLedger"]:
+        """Usage ledger, created on first use (None if USAGE_LEDGER is off)"""
+        if not config.get("USAGE_LEDGER", True):
+            return None
+        if self._ledger is None:
+            path = config.get("USAGE_LEDGER_PATH") or Path(config.config_path).parent / "usage"
+            from .ledger import UsageLedger
+            
+            self._ledger = UsageLedger(Path(path))
+        return self._ledger
+    
+    @property
+    def router(self) -> "Router":
+        """Router over the ROUTE_TARGETS pool, created on first use"""
+        if self._router is None:
+            from .router import Router
+            
+            self._router = Router.from_config(self, config)
+        return self._router
+    
+    def set_routes(self, targets: str) -> "Router":
+        """Route ``provider="auto"`` requests over a different target pool
+        
+        Args:
+            targets: Comma-separated ``provider:model[@weight]`` list
+            
+        Returns:
+            The new router
+            
+        Raises:
+            ValueError: If the target list is invalid
+        """
+        from .router import Router
+        
+        self._router = Router.from_config(self, config, targets)
+        return self._router
+    
+    def _initialize_providers(self) -> None:
+        """Forget created providers so they are rebuilt from current settings"""
+        providers, self.providers = self.providers, {}
+        for provider in providers.values():
+            session = getattr(provider, "session", None)
+            if session is not None:
+                session.close()
+    
+    def _create_provider(self, provider_name: str, prompt: bool = True) -> Optional[AIProvider]:
+        """Instantiate a registered provider from configuration
+        
+        Only the default provider prompts for a missing API key; other
+        providers are created only if their key already exists.
+        
+        Args:
+            provider_name: Name of provider
+            prompt: Allow prompting for the default provider's API key
+            
+        Returns:
+            AI provider instance, or None if it is unknown or has no key
+            or base URL
+        """
+        provider_class = registry.get(provider_name)
+        if provider_class is None or provider_name not in SUPPORTED_PROVIDERS:
+            return None
+        
+        provider_config = config.get_provider_config(provider_name)
+        base_url = self._base_url(provider_name)
+        if not base_url:
+            return None
         
-        # Google - only initialize if key already exists (don't prompt)
-        google_key = config.get_api_key_silent("google")
-        if google_key:
-            google_config = config.get_provider_config("google")
-            # Note: Google provider class would need to be implemented
-            # self.providers["google"] = GoogleProvider(google_key, google_config["base_url"])
+        if prompt and provider_name == config.get("DEFAULT_PROVIDER"):
+            api_key = config.get_api_key(provider_name)
+        else:
+            api_key = config.get_api_key_silent(provider_name)
         
-        # Always have custom provider as fallback
-        self.providers["custom"] = CustomProvider("", "")
+        if not api_key and provider_config.get("requires_auth", True):
+            return None
+        
+        provider = provider_class(api_key, base_url)
+        self.providers[provider_name] = provider
+        return provider
+    
+    def _base_url(self, provider_name: str) -> str:
+        """Base URL a provider uses, from its instance or configuration
+        
+        Args:
+            provider_name: Name of provider
+            
+        Returns:
+            Base URL without a trailing slash, or "" if none is configured
+        """
+        provider = self.providers.get(provider_name)
+        if provider is not None:
+            return provider.base_url
+        
+        base_url = config.get_provider_config(provider_name)["base_url"]
+        if provider_name == "custom":
+            base_url = config.get("CUSTOM_BASE_URL")
+            if not base_url and config.get("DEFAULT_PROVIDER") == "custom":
+                base_url = config.get("API_BASE_URL")
+        return (base_url or "").rstrip("/")
     
     def get_provider(self, provider_name: Optional[str] = None) -> AIProvider:
-        """Get AI provider instance
+        """Get AI provider instance, creating it on first use
         
         Args:
             provider_name: Name of provider. If None, uses default.
@@ -285,51 +1010,355 @@ class AIInterface:
         if provider_name is None:
             provider_name = config.get("DEFAULT_PROVIDER")
         
-        if provider_name in self.providers:
-            return self.providers[provider_name]
+        provider = self.providers.get(provider_name) or self._create_provider(provider_name)
+        if provider is not None:
+            return provider
+        
+        # Unavailable (unknown, no API key or no base URL), answer with a hint
+        if self._fallback is None:
+            self._fallback = FallbackProvider("", "")
+        return self._fallback
+    
+    def provider_names(self) -> List[str]:
+        """Names of all providers that can be requested"""
+        names = [name for name in registry.names() if name in SUPPORTED_PROVIDERS]
+        return names + [name for name in self.providers if name not in names]
+    
+    def stream_events(
+        self,
+        prompt: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        deadline: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        **kwargs
+    ) -> "CompletionStream":
+        """Stream a completion as typed events
+        
+        The returned stream can be cancelled from any thread; closing it
+        early also closes the provider's response.
+        
+        Args:
+            prompt: User prompt (ignored when messages are given)
+            provider: Provider name (optional)
+            model: Model name (optional)
+            role: System role (optional)
+            messages: Full conversation to send, e.g. chat history (optional)
+            deadline: Seconds the whole completion, including any router
+                failover, may take. If None, uses STREAM_DEADLINE.
+            idle_timeout: Seconds to wait for each token. If None, uses
+                STREAM_IDLE_TIMEOUT.
+            **kwargs: Additional parameters. ``use_cache`` forces (True) or
+                bypasses (False) the response cache; by default only
+                deterministic requests (temperature 0) are cached.
+            
+        Returns:
+            Cancellable stream of Notice events for context adjustments,
+            then TextDelta, Usage, Finish and ErrorEvent events
+            
+        Raises:
+            ValueError: If neither prompt nor messages are given (when
+                iteration starts)
+        """
+        from .stream import CompletionStream
+        
+        return CompletionStream.from_config(
+            self._completion_events(prompt, provider, model, role, messages, kwargs),
+            config, deadline, idle_timeout
+        )
+    
+    def _completion_events(
+        self,
+        prompt: Optional[str],
+        provider: Optional[str],
+        model: Optional[str],
+        role: Optional[str],
+        messages: Optional[List[Dict]],
+        kwargs: Dict[str, Any]
+    ) -> Generator[CompletionEvent, None, None]:
+        """Event generator behind stream_events"""
+        from .router import ROUTER_PROVIDER
+        
+        if (provider or config.get("DEFAULT_PROVIDER")) == ROUTER_PROVIDER:
+            # The router picks the provider and model for each attempt
+            yield from self.router.stream_events(prompt, role, messages, **kwargs)
+            return
+        
+        ai_provider, model, messages, params, cache_key, notices = self._prepare_request(
+            prompt, provider, model, role, messages, kwargs
+        )
         
-        # Fallback to custom provider
-        return self.providers["custom"]
+        for notice in notices:
+            yield Notice(notice)
+        
+        yield from self._request_events(ai_provider, model, messages, params, cache_key)
+    
+    def _request_events(
+        self,
+        ai_provider: AIProvider,
+        model: str,
+        messages: List[Dict],
+        params: Dict[str, Any],
+        cache_key: Optional[str]
+    ) -> Generator[CompletionEvent, None, None]:
+        """Stream a prepared request, going through the response cache
+        
+        Args:
+            ai_provider: Provider instance
+            model: Model name
+            messages: Messages to send
+            params: Generation parameters
+            cache_key: Cache key, or None to bypass the cache
+            
+        Yields:
+            Completion events
+        """
+        if cache_key is None:
+            yield from self._provider_events(ai_provider, messages, model, params)
+            return
+        
+        cached_chunks = self.cache.get(cache_key)
+        if cached_chunks is not None:
+            yield from text_events(cached_chunks)
+            return
+        
+        result = CompletionResult()
+        for event in self._provider_events(ai_provider, messages, model, params):
+            result.add(event)
+            yield event
+        
+        self._store_response(cache_key, result)
     
     def generate_completion(
         self,
-        prompt: str,
+        prompt: Optional[str] = None,
         provider: Optional[str] = None,
         model: Optional[str] = None,
         role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        deadline: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
         **kwargs
-    ) -> Generator[str, None, None]:
+    ) -> "CompletionStream":
         """Generate completion using specified or default provider
         
+        Text-only view of stream_events: errors (including an expired
+        deadline or idle timeout) are yielded in-band as ``"Error: ..."`` /
+        ``"Network error: ..."`` chunks.
+        
         Args:
-            prompt: User prompt
+            prompt: User prompt (ignored when messages are given)
             provider: Provider name (optional)
             model: Model name (optional)
             role: System role (optional)
-            **kwargs: Additional parameters
+            messages: Full conversation to send, e.g. chat history (optional)
+            deadline: Seconds the completion may take, see stream_events
+            idle_timeout: Seconds to wait for each token, see stream_events
+            **kwargs: Additional parameters, see stream_events
+            
+        Returns:
+            Cancellable stream of generated text chunks
+            
+        Raises:
+            ValueError: If neither prompt nor messages are given (when
+                iteration starts)
+        """
+        from .stream import CompletionStream
+        
+        return CompletionStream.from_config(
+            self._completion_events(prompt, provider, model, role, messages, kwargs),
+            config, deadline, idle_timeout, text=True
+        )
+    
+    async def astream_events(
+        self,
+        prompt: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        executor: Optional["Executor"] = None,
+        **kwargs
+    ) -> AsyncGenerator[CompletionEvent, None]:
+        """Asynchronous variant of stream_events
+        
+        Args:
+            prompt: User prompt (ignored when messages are given)
+            provider: Provider name (optional)
+            model: Model name (optional)
+            role: System role (optional)
+            messages: Full conversation to send (optional)
+            executor: Executor running blocking provider reads (optional)
+            **kwargs: Additional parameters, see stream_events
+            
+        Yields:
+            Completion events
+        """
+        from .router import ROUTER_PROVIDER
+        
+        if (provider or config.get("DEFAULT_PROVIDER")) == ROUTER_PROVIDER:
+            async for event in self.router.astream_events(
+                prompt, role, messages, executor=executor, **kwargs
+            ):
+                yield event
+            return
+        
+        ai_provider, model, messages, params, cache_key, notices = self._prepare_request(
+            prompt, provider, model, role, messages, kwargs
+        )
+        
+        for notice in notices:
+            yield Notice(notice)
+        
+        async for event in self._arequest_events(
+            ai_provider, model, messages, params, cache_key, executor=executor
+        ):
+            yield event
+    
+    async def _arequest_events(
+        self,
+        ai_provider: AIProvider,
+        model: str,
+        messages: List[Dict],
+        params: Dict[str, Any],
+        cache_key: Optional[str],
+        executor: Optional["Executor"] = None
+    ) -> AsyncGenerator[CompletionEvent, None]:
+        """Asynchronous variant of _request_events"""
+        if cache_key is not None:
+            cached_chunks = self.cache.get(cache_key)
+            if cached_chunks is not None:
+                for event in text_events(cached_chunks):
+                    yield event
+                return
+        
+        events = ai_provider.astream_events(messages, model, executor=executor, **params)
+        from .metrics import metrics
+        
+        if metrics.enabled:
+            events = metrics.atrace(events, self._provider_label(ai_provider), model)
+        ledger = self.ledger
+        provider_name = getattr(ai_provider, "provider_name", None)
+        if ledger is not None and provider_name:
+            events = ledger.atrack(events, provider_name, model)
+        
+        result = CompletionResult()
+        async for event in events:
+            result.add(event)
+            yield event
+        
+        if cache_key is not None:
+            self._store_response(cache_key, result)
+    
+    async def agenerate_completion(
+        self,
+        prompt: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        executor: Optional["Executor"] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Asynchronous variant of generate_completion
+        
+        Args:
+            prompt: User prompt (ignored when messages are given)
+            provider: Provider name (optional)
+            model: Model name (optional)
+            role: System role (optional)
+            messages: Full conversation to send (optional)
+            executor: Executor running blocking provider reads (optional)
+            **kwargs: Additional parameters, see stream_events
             
         Yields:
             Generated text chunks
         """
+        async for chunk in aiter_text(self.astream_events(
+            prompt, provider, model, role, messages, executor=executor, **kwargs
+        )):
+            yield chunk
+    
+    async def agather(
+        self,
+        prompts: Iterable[Union[str, Dict[str, Any]]],
+        concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[str]:
+        """Run many completions concurrently
+        
+        Args:
+            prompts: Prompt strings, or dicts of agenerate_completion
+                arguments (prompt, messages, provider, model, role, ...)
+            concurrency: Maximum number of requests in flight.
+                If None, uses MAX_CONCURRENCY from config.
+            **kwargs: Parameters shared by every request
+            
+        Returns:
+            Full responses in the same order as prompts
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        
+        if concurrency is None:
+            concurrency = config.get("MAX_CONCURRENCY", 8)
+        concurrency = max(1, int(concurrency))
+        
+        request_list = []
+        for item in prompts:
+            request_args = dict(kwargs)
+            if isinstance(item, dict):
+                request_args.update(item)
+            else:
+                request_args["prompt"] = item
+            request_list.append(request_args)
+        
+        # One pool per provider, sized so no request has to re-handshake
+        for request_args in request_list:
+            self.get_provider(request_args.get("provider")).resize_pool(concurrency)
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="drgpt") as executor:
+            
+            async def run_one(request_args: Dict[str, Any]) -> str:
+                async with semaphore:
+                    chunks = []
+                    async for chunk in self.agenerate_completion(executor=executor, **request_args):
+                        chunks.append(chunk)
+                    return "".join(chunks)
+            
+            return await asyncio.gather(*(run_one(request_args) for request_args in request_list))
+    
+    def _prepare_request(
+        self,
+        prompt: Optional[str],
+        provider: Optional[str],
+        model: Optional[str],
+        role: Optional[str],
+        messages: Optional[List[Dict]],
+        kwargs: Dict[str, Any]
+    ) -> Tuple[AIProvider, str, List[Dict], Dict[str, Any], Optional[str], List[str]]:
+        """Resolve provider, model, messages, parameters and cache key
+        
+        Messages are fitted into the model's context window (unless
+        FIT_CONTEXT is disabled) before the cache key is computed.
+        
+        Returns:
+            Tuple of (provider instance, model, messages, params, cache key
+            or None when the cache is bypassed, context notices)
+        """
+        use_cache = kwargs.pop("use_cache", None)
+        
         if provider is None:
             provider = config.get("DEFAULT_PROVIDER")
         
         if model is None:
             model = config.get("DEFAULT_MODEL")
         
-        # Build messages
-        messages = []
-        
-        # Add system role if specified
-        if role and role != "default":
-            system_content = self._get_role_content(role)
-            if system_content:
-                messages.append({"role": "system", "content": system_content})
-        
-        # Add user prompt
-        messages.append({"role": "user", "content": prompt})
-        
-        # Get provider and generate completion
+        messages = self.build_messages(prompt, role, messages)
         ai_provider = self.get_provider(provider)
         
         generation_params = {
@@ -339,7 +1368,111 @@ class AIInterface:
             **kwargs
         }
         
-        yield from ai_provider.generate_completion(messages, model, **generation_params)
+        notices = []
+        if config.get("FIT_CONTEXT", True):
+            from .tokens import fit_messages
+            
+            fit = fit_messages(messages, provider, model, generation_params.get("max_tokens"))
+            messages, notices = fit.messages, fit.notices
+            if generation_params.get("max_tokens") is not None:
+                generation_params["max_tokens"] = fit.max_tokens
+        
+        cache_key = None
+        if self._should_cache(provider, generation_params, use_cache):
+            from .cache import ResponseCache
+            
+            cache_key = ResponseCache.make_key(
+                provider, model, messages, generation_params, getattr(ai_provider, "base_url", "")
+            )
+        
+        return ai_provider, model, messages, generation_params, cache_key, notices
+    
+    def _provider_events(self, ai_provider, messages: List[Dict], model: str,
+                         params: Dict[str, Any]) -> Iterable[CompletionEvent]:
+        """Stream events from a provider
+        
+        The stream is timed when metrics are enabled, and the usage of
+        registered providers is recorded in the usage ledger.
+        """
+        events = ai_provider.stream_events(messages, model, **params)
+        from .metrics import metrics
+        
+        if metrics.enabled:
+            events = metrics.trace(events, self._provider_label(ai_provider), model)
+        ledger = self.ledger
+        provider_name = getattr(ai_provider, "provider_name", None)
+        if ledger is not None and provider_name:
+            events = ledger.track(events, provider_name, model)
+        return events
+    
+    @staticmethod
+    def _provider_label(ai_provider) -> str:
+        """Provider name used in metrics"""
+        return getattr(ai_provider, "provider_name", None) or type(ai_provider).__name__
+    
+    def _store_response(self, cache_key: str, result: CompletionResult) -> None:
+        """Store a completed response unless it failed or is empty"""
+        if result.ok and result.finish_reason is not None and result.chunks:
+            self.cache.put(cache_key, result.chunks)
+    
+    def _should_cache(self, provider: str, params: Dict[str, Any], use_cache: Optional[bool]) -> bool:
+        """Decide whether a request goes through the response cache
+        
+        Args:
+            provider: Requested provider name
+            params: Generation parameters
+            use_cache: Explicit user choice, or None for automatic
+            
+        Returns:
+            True if the response cache should be used
+        """
+        if use_cache is False:
+            return False
+        
+        # Never cache the canned fallback under a real provider's name
+        if provider not in self.providers:
+            return False
+        
+        if use_cache:
+            return True
+        
+        temperature = params.get("temperature") or 0
+        return temperature <= 0 or bool(config.get("CACHE_ALL_TEMPERATURES"))
+    
+    def build_messages(
+        self,
+        prompt: Optional[str] = None,
+        role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None
+    ) -> List[Dict]:
+        """Build the message list sent to a provider
+        
+        Args:
+            prompt: User prompt (ignored when messages are given)
+            role: System role (optional)
+            messages: Existing conversation (optional)
+            
+        Returns:
+            Messages with the system role prepended
+            
+        Raises:
+            ValueError: If neither prompt nor messages are given
+        """
+        if messages is None:
+            if prompt is None:
+                raise ValueError("Either prompt or messages must be provided")
+            messages = [{"role": "user", "content": prompt}]
+        
+        result = []
+        
+        # Add system role if specified
+        if role and role != "default":
+            system_content = self._get_role_content(role)
+            if system_content:
+                result.append({"role": "system", "content": system_content})
+        
+        result.extend(messages)
+        return result
     
     def _get_role_content(self, role: str) -> str:
         """Get content for a specific role
@@ -362,16 +1495,44 @@ class AIInterface:
         else:
             return ""
     
-    def list_providers(self) -> Dict[str, List[str]]:
+    def get_models(self, provider_name: str, refresh: bool = False) -> List[str]:
+        """Get a provider's models from its API, through the model catalog
+        
+        Answered from the on-disk catalog while it is fresh (MODELS_CACHE_TTL);
+        falls back to the static list when the provider is unreachable or
+        not configured. Never prompts for an API key.
+        
+        Args:
+            provider_name: Name of provider
+            refresh: Revalidate the cached list even if it is fresh
+            
+        Returns:
+            List of model names
+        """
+        return self.catalog.get(
+            provider_name,
+            lambda: self.providers.get(provider_name) or self._create_provider(provider_name, prompt=False),
+            refresh,
+            self._base_url(provider_name)
+        )
+    
+    def list_providers(self, refresh: bool = False) -> Dict[str, List[str]]:
         """List available providers and their models
         
+        Model lists that are not cached are fetched concurrently.
+        
+        Args:
+            refresh: Revalidate cached model lists even if they are fresh
+            
         Returns:
             Dictionary mapping provider names to model lists
         """
-        result = {}
-        for provider_name, provider_config in SUPPORTED_PROVIDERS.items():
-            result[provider_name.upper()] = provider_config["models"]
-        return result
+        from concurrent.futures import ThreadPoolExecutor
+        
+        names = list(SUPPORTED_PROVIDERS)
+        with ThreadPoolExecutor(max_workers=len(names) or 1, thread_name_prefix="drgpt-models") as executor:
+            model_lists = list(executor.map(lambda name: self.get_models(name, refresh), names))
+        return {name.upper(): models for name, models in zip(names, model_lists)}
     
     def add_provider(self, provider_name: str, api_key: str) -> bool:
         """Add a new provider with API key
@@ -391,15 +1552,21 @@ class AIInterface:
         # Store the API key
         config.set(provider_config["api_key_env"], api_key)
         
-        # Initialize the provider
-        if provider_name == "openai":
-            self.providers["openai"] = OpenAIProvider(api_key, provider_config["base_url"])
-        elif provider_name == "anthropic":
-            self.providers["anthropic"] = AnthropicProvider(api_key, provider_config["base_url"])
-        # Add other providers as needed
-        
-        return True
+        # Rebuild the provider with the new key
+        previous = self.providers.pop(provider_name, None)
+        if previous is not None:
+            previous.session.close()
+        return self._create_provider(provider_name) is not None
+
+
+def get_ai_interface() -> AIInterface:
+    """Get the global AI interface, creating it on first use
+    
+    Returns:
+        Shared AIInterface instance
+    """
+    return ai_interface._get_instance()
 
 
-# Global AI interface instance
-ai_interface = AIInterface()
+# Global AI interface instance (constructed on first access)
+ai_interface = LazyObject(AIInterface)
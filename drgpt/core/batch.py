@@ -0,0 +1,236 @@
+"""
+Batch processing for DrGPT
+
+Runs many queries concurrently with per-provider concurrency caps and
+writes one JSON result per line, either in input order or as completed.
+"""
+
+import asyncio
+import functools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from .events import CompletionResult
+from .tokens import get_counter
+
+
+def parse_batch_line(line: str) -> Optional[Dict[str, Any]]:
+    """Parse one line of batch input
+    
+    Lines may be JSON objects with a ``prompt`` (or ``messages``) key and
+    optional ``id``, ``provider``, ``model``, ``mode``, ``temperature`` and
+    ``max_tokens`` keys, JSON strings, or plain text prompts.
+    
+    Args:
+        line: Raw input line
+    
+    Returns:
+        Item dictionary, or None for blank lines
+    """
+    line = line.strip()
+    if not line:
+        return None
+    
+    if line[0] in "{\"":
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = line
+    else:
+        data = line
+    
+    if isinstance(data, dict):
+        return data
+    if isinstance(data, str):
+        return {"prompt": data}
+    return {"prompt": line}
+
+
+def read_batch_items(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Lazily parse batch input lines
+    
+    Args:
+        lines: Iterable of raw input lines (e.g. an open file)
+    
+    Yields:
+        Item dictionaries
+    """
+    for line in lines:
+        item = parse_batch_line(line)
+        if item is not None:
+            yield item
+
+
+def _estimate_tokens(text: str, model: str = "") -> int:
+    """Token estimate, used when the provider reports no usage"""
+    return get_counter(model).count_text(text)
+
+
+class BatchRunner:
+    """Concurrent batch executor built on DrGPTManager.aquery_events"""
+    
+    # Query arguments a batch item may set
+    QUERY_KEYS = ("prompt", "messages", "provider", "model", "mode", "temperature", "max_tokens", "top_p")
+    
+    def __init__(self, manager, workers: int = 8, ordered: bool = True,
+                 prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None, **defaults):
+        """Initialize batch runner
+        
+        Args:
+            manager: DrGPTManager instance
+            workers: Maximum concurrent requests per provider
+            ordered: Write results in input order instead of as completed
+            prepare: Optional hook turning an item into query arguments
+            **defaults: Query arguments applied to every item
+        """
+        self.manager = manager
+        self.workers = max(1, int(workers))
+        self.ordered = ordered
+        self.prepare = prepare
+        self.defaults = defaults
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+    
+    def run(self, items: Iterable[Dict[str, Any]], output: TextIO) -> Dict[str, Any]:
+        """Run a batch to completion
+        
+        Args:
+            items: Batch items (may be a lazy iterator)
+            output: Text stream receiving JSONL results
+        
+        Returns:
+            Summary with counts and total duration
+        """
+        return asyncio.run(self.arun(items, output))
+    
+    async def arun(self, items: Iterable[Dict[str, Any]], output: TextIO) -> Dict[str, Any]:
+        """Asynchronously run a batch to completion
+        
+        Args:
+            items: Batch items (may be a lazy iterator)
+            output: Text stream receiving JSONL results
+        
+        Returns:
+            Summary with counts and total duration
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        summary = {"total": 0, "succeeded": 0, "failed": 0}
+        
+        # Bound memory: never read further ahead of the last written result
+        # than this many items (the window is released as results are written)
+        window = asyncio.Semaphore(self.workers * 4)
+        finished: Dict[int, Dict[str, Any]] = {}
+        next_to_write = 0
+        tasks = set()
+        
+        def write(record: Dict[str, Any]) -> None:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            window.release()
+        
+        def complete(record: Dict[str, Any]) -> None:
+            nonlocal next_to_write
+            summary["failed" if record.get("error") else "succeeded"] += 1
+            if not self.ordered:
+                write(record)
+                return
+            finished[record["index"]] = record
+            while next_to_write in finished:
+                write(finished.pop(next_to_write))
+                next_to_write += 1
+        
+        def settle(index: int, task: asyncio.Future) -> None:
+            # A cancelled item still gets its record, or ordered output would stall
+            complete({"index": index, "error": "Cancelled"} if task.cancelled() else task.result())
+        
+        iterator = iter(items)
+        done = object()
+        with ThreadPoolExecutor(max_workers=self.workers * 4, thread_name_prefix="drgpt-batch") as executor:
+            index = 0
+            while True:
+                await window.acquire()
+                # Reading may block (stdin), keep it off the event loop
+                item = await loop.run_in_executor(executor, next, iterator, done)
+                if item is done:
+                    window.release()
+                    break
+                
+                task = asyncio.ensure_future(self._run_item(index, item, executor))
+                task.add_done_callback(functools.partial(settle, index))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                index += 1
+            
+            summary["total"] = index
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        
+        summary["duration_s"] = round(time.perf_counter() - start, 3)
+        return summary
+    
+    async def _run_item(self, index: int, item: Dict[str, Any], executor) -> Dict[str, Any]:
+        """Run a single batch item and build its result record
+        
+        Never raises: any failure, including a malformed item, becomes the
+        record's ``error``, so every input line gets exactly one result.
+        """
+        record: Dict[str, Any] = {"index": index}
+        try:
+            if "id" in item:
+                record["id"] = item["id"]
+            await self._query_item(record, item, executor)
+        except Exception as e:
+            # Keep the first error, e.g. the query's over a later one
+            record.setdefault("error", str(e))
+        return record
+    
+    async def _query_item(self, record: Dict[str, Any], item: Dict[str, Any], executor) -> None:
+        """Run a batch item's query and fill in its result record"""
+        if self.prepare is not None:
+            item = self.prepare(item)
+        query = dict(self.defaults)
+        query.update({key: item[key] for key in self.QUERY_KEYS if key in item})
+        
+        provider = query.get("provider") or self.manager.config.get("DEFAULT_PROVIDER")
+        query["provider"] = provider
+        limit = self._limits.get(provider)
+        if limit is None:
+            limit = self._limits[provider] = asyncio.Semaphore(self.workers)
+            self.manager.ai.get_provider(provider).resize_pool(self.workers)
+        
+        async with limit:
+            start = time.perf_counter()
+            result = CompletionResult()
+            try:
+                async for event in self.manager.aquery_events(executor=executor, **query):
+                    result.add(event)
+            except Exception as e:
+                record["error"] = str(e)
+            latency = time.perf_counter() - start
+        
+        if result.error is not None:
+            record["error"] = str(result.error)
+        if result.notices:
+            record["notices"] = result.notices
+        
+        response = result.text
+        model = query.get("model") or self.manager.config.get("DEFAULT_MODEL")
+        if result.usage is not None:
+            prompt_tokens, completion_tokens = result.usage
+        else:
+            prompt_text = query.get("prompt") or "".join(
+                str(message.get("content", "")) for message in query.get("messages") or []
+            )
+            prompt_tokens = _estimate_tokens(prompt_text, model)
+            completion_tokens = _estimate_tokens(response, model)
+        record.update({
+            "provider": provider,
+            "model": model,
+            "response": response,
+            "finish_reason": result.finish_reason,
+            "latency_ms": round(latency * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        })
@@ -0,0 +1,186 @@
+"""
+Response cache for DrGPT
+
+Stores completed responses in a content-addressed on-disk store so that
+identical requests can be replayed without a network round trip.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..utils.storage import ensure_private_dir, open_private
+
+
+class ResponseCache:
+    """Content-addressed response cache with LRU eviction
+    
+    Each entry is a JSON file named after the SHA-256 of the request
+    (provider, endpoint, model, messages and sampling parameters) holding
+    the response chunks. Access times are tracked through file mtimes and
+    the least recently used entries are evicted beyond ``max_entries``.
+    The directory and entries are accessible to the current user only.
+    """
+    
+    STATS_FILE = "stats.json"
+    
+    def __init__(self, directory: Path, max_entries: int = 100):
+        """Initialize response cache
+        
+        Args:
+            directory: Directory holding cache entries
+            max_entries: Maximum number of cached responses
+        """
+        self.directory = Path(directory)
+        self.max_entries = max(0, int(max_entries))
+        self._checked = False
+    
+    @staticmethod
+    def make_key(provider: str, model: str, messages: List[Dict], params: Dict[str, Any],
+                 base_url: str = "") -> str:
+        """Build the cache key for a request
+        
+        Args:
+            provider: Provider name
+            model: Model name
+            messages: Messages sent to the provider (including system role)
+            params: Sampling parameters
+            base_url: Provider endpoint, so a custom provider pointed at
+                another server does not replay the previous server's answers
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {"provider": provider, "base_url": base_url, "model": model,
+             "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _private_directory(self) -> Path:
+        """Cache directory, created private to the current user on first use
+        
+        Raises:
+            PermissionError: If the directory belongs to another user
+        """
+        if not self._checked:
+            ensure_private_dir(self.directory)
+            self._checked = True
+        return self.directory
+    
+    def _entry_path(self, key: str) -> Path:
+        return self._private_directory() / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[List[str]]:
+        """Look up a cached response
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached response chunks, or None on a miss
+        """
+        try:
+            path = self._entry_path(key)
+            with open(path, "r", encoding="utf-8") as file:
+                chunks = json.load(file)["chunks"]
+            # Mark as recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._record("misses")
+            return None
+        
+        self._record("hits")
+        return chunks
+    
+    def put(self, key: str, chunks: List[str]) -> None:
+        """Store a completed response
+        
+        Args:
+            key: Cache key
+            chunks: Response chunks in streaming order
+        """
+        if self.max_entries == 0:
+            return
+        try:
+            self._write_json(self._entry_path(key), {"chunks": chunks})
+            self._evict()
+        except OSError:
+            # Caching is best effort
+            pass
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries beyond the size bound"""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            if path.name == self.STATS_FILE:
+                continue
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+        
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    def clear(self) -> None:
+        """Remove all cached responses and statistics"""
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    def stats(self) -> Dict[str, int]:
+        """Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses and entries counts
+        """
+        stats = self._read_counters()
+        try:
+            entries = sum(1 for path in self.directory.glob("*.json") if path.name != self.STATS_FILE)
+        except OSError:
+            entries = 0
+        stats["entries"] = entries
+        return stats
+    
+    def _read_counters(self) -> Dict[str, int]:
+        """Read persisted hit/miss counters"""
+        counters = {"hits": 0, "misses": 0}
+        try:
+            with open(self._private_directory() / self.STATS_FILE, "r", encoding="utf-8") as file:
+                counters.update(json.load(file))
+        except (OSError, ValueError):
+            pass
+        return counters
+    
+    def _record(self, counter: str) -> None:
+        """Increment a persisted hit/miss counter"""
+        stats = self._read_counters()
+        stats[counter] = stats.get(counter, 0) + 1
+        try:
+            self._write_json(self._private_directory() / self.STATS_FILE, stats)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _write_json(path: Path, data: Any) -> None:
+        """Atomically write JSON data to path"""
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open_private(tmp_path, "wb") as file:
+            file.write(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        os.replace(tmp_path, path)
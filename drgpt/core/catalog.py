@@ -0,0 +1,141 @@
+"""
+Model catalog for DrGPT
+
+Keeps each provider's model list, fetched from its models endpoint, in a
+small on-disk cache. Fresh entries are answered without any network
+access; stale ones are revalidated with ``If-None-Match`` so an unchanged
+list costs a single 304 response. When a provider cannot be reached its
+last known list (or the static list from SUPPORTED_PROVIDERS) is used.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.storage import ensure_private_dir, open_private
+from .config import SUPPORTED_PROVIDERS
+
+
+class ModelCatalog:
+    """Provider model lists cached on disk with a TTL and ETag revalidation"""
+    
+    def __init__(self, directory: Path, ttl: float = 86400):
+        """Initialize model catalog
+        
+        Args:
+            directory: Directory holding one JSON file per provider
+            ttl: Seconds a fetched list is used without revalidation
+        """
+        self.directory = Path(directory)
+        self.ttl = float(ttl)
+        self._checked = False
+    
+    def get(
+        self,
+        name: str,
+        provider_factory: Callable[[], Any],
+        refresh: bool = False,
+        base_url: Optional[str] = None
+    ) -> List[str]:
+        """Get a provider's models, fetching them if the cache is stale
+        
+        Args:
+            name: Provider name
+            provider_factory: Returns the provider instance (with a
+                ``fetch_models`` method), or None if it is unavailable.
+                Only called when the cache cannot answer.
+            refresh: Revalidate even if the cached list is fresh
+            base_url: Configured base URL of the provider. A list fetched
+                from another server is never served, however fresh.
+        
+        Returns:
+            Model names
+        """
+        entry = self._read(name)
+        if entry is not None and base_url is not None and entry.get("base_url") != base_url:
+            entry = None
+        if entry is not None and not refresh and time.time() - entry.get("fetched", 0) < self.ttl:
+            return entry["models"]
+        
+        provider = provider_factory()
+        if provider is None:
+            return self._fallback(name, entry)
+        
+        # A list fetched from another server (custom base URL) is not reused
+        if entry is not None and entry.get("base_url") != provider.base_url:
+            entry = None
+        
+        try:
+            models, etag = provider.fetch_models(entry.get("etag") if entry else None)
+        except NotImplementedError:
+            return self._fallback(name, entry)
+        except Exception:
+            # Offline or rejected, keep serving what we know
+            return self._fallback(name, entry)
+        
+        if models is None:
+            # 304 Not Modified
+            models = entry["models"]
+        if not models:
+            return self._fallback(name, entry)
+        
+        self._write(name, {
+            "fetched": time.time(),
+            "etag": etag,
+            "base_url": provider.base_url,
+            "models": models,
+        })
+        return models
+    
+    def clear(self) -> None:
+        """Remove all cached model lists"""
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _fallback(name: str, entry: Optional[Dict[str, Any]]) -> List[str]:
+        """Last fetched list, or the static list shipped with DrGPT"""
+        if entry is not None and entry.get("models"):
+            return entry["models"]
+        return list(SUPPORTED_PROVIDERS.get(name, {}).get("models", []))
+    
+    def _private_directory(self) -> Path:
+        """Catalog directory, created private to the current user on first use
+        
+        Raises:
+            PermissionError: If the directory belongs to another user
+        """
+        if not self._checked:
+            ensure_private_dir(self.directory)
+            self._checked = True
+        return self.directory
+    
+    def _path(self, name: str) -> Path:
+        return self._private_directory() / f"{name}.json"
+    
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        """Read a cache entry, or None if it is missing, corrupt or not ours"""
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("models"), list):
+            return None
+        return entry
+    
+    def _write(self, name: str, entry: Dict[str, Any]) -> None:
+        """Atomically write a cache entry (best effort)"""
+        try:
+            path = self._path(name)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open_private(tmp_path, "wb") as file:
+                file.write(json.dumps(entry).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
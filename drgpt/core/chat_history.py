@@ -0,0 +1,206 @@
+"""
+Chat history storage for DrGPT
+
+Stores chat sessions as append-only logs with a compact offset index so
+that the most recent messages can be loaded by reading only the tail of
+the log, no matter how long the session has grown.
+"""
+
+import json
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.storage import ensure_private_dir, open_private
+
+
+# One little-endian unsigned 64-bit log offset per record
+_INDEX_ENTRY = struct.Struct("<Q")
+_SAFE_SESSION_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ChatHistoryStore:
+    """Append-only message log for a single chat session
+    
+    Each message is one JSON line in ``<session>.jsonl``. The companion
+    ``<session>.idx`` file holds the byte offset of every record, so loading
+    the last N messages costs N index entries plus the tail of the log.
+    Writes are fsynced in batches and the log is compacted down to the
+    rolling window once it grows past twice its size. Session files are
+    readable by the current user only.
+    """
+    
+    def __init__(self, directory: Path, session_id: str, max_length: int = 100,
+                 sync_every: int = 8):
+        """Initialize chat history store
+        
+        Args:
+            directory: Directory holding chat session files
+            session_id: Chat session identifier
+            max_length: Number of messages kept in the rolling window
+            sync_every: Number of appended records between fsync calls
+        """
+        self.directory = Path(directory)
+        self.session_id = session_id
+        self.max_length = max(1, int(max_length))
+        self.sync_every = max(1, int(sync_every))
+        
+        safe_id = _SAFE_SESSION_ID.sub("_", session_id) or "default"
+        self.log_path = self.directory / f"{safe_id}.jsonl"
+        self.index_path = self.directory / f"{safe_id}.idx"
+        
+        self._log = None
+        self._index = None
+        self._pending = 0
+    
+    def _open(self) -> None:
+        """Open log and index files for appending"""
+        if self._log is None:
+            ensure_private_dir(self.directory)
+            self._log = open_private(self.log_path, "ab")
+            self._index = open_private(self.index_path, "ab")
+    
+    def __len__(self) -> int:
+        """Number of records currently in the log"""
+        if self._index is not None:
+            self._index.flush()
+        try:
+            return os.path.getsize(self.index_path) // _INDEX_ENTRY.size
+        except OSError:
+            return 0
+    
+    def append(self, role: str, content: str) -> None:
+        """Append a message to the session
+        
+        Args:
+            role: Message role (user or assistant)
+            content: Message content
+        """
+        self._open()
+        record = json.dumps({"role": role, "content": content}, ensure_ascii=False)
+        offset = self._log.tell()
+        self._log.write(record.encode("utf-8") + b"\n")
+        self._index.write(_INDEX_ENTRY.pack(offset))
+        
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.flush()
+    
+    def flush(self, sync: bool = True) -> None:
+        """Flush pending records and fsync them to disk
+        
+        Args:
+            sync: Also fsync. Without it records are only handed to the
+                OS, and the fsync still happens every sync_every records.
+        """
+        if self._log is None or not self._pending:
+            return
+        if not sync:
+            self._log.flush()
+            self._index.flush()
+            return
+        # Log first, so the index never points past durable data
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._pending = 0
+    
+    def close(self) -> None:
+        """Flush pending records, compact if needed and close files"""
+        if self._log is None:
+            return
+        self.flush()
+        self._log.close()
+        self._index.close()
+        self._log = None
+        self._index = None
+        
+        if len(self) > 2 * self.max_length:
+            self.compact()
+    
+    def load(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Load the most recent messages of the session
+        
+        The window is trimmed to whole turns: it never starts with an
+        assistant message, which providers such as Anthropic reject.
+        
+        Args:
+            limit: Maximum number of messages. If None, uses the rolling window.
+        
+        Returns:
+            List of message dictionaries, oldest first
+        """
+        if limit is None:
+            limit = self.max_length
+        if limit <= 0:
+            return []
+        
+        self.flush()
+        try:
+            with open(self.index_path, "rb") as index_file:
+                index_file.seek(0, os.SEEK_END)
+                total = index_file.tell() // _INDEX_ENTRY.size
+                if total == 0:
+                    return []
+                count = min(limit, total)
+                index_file.seek((total - count) * _INDEX_ENTRY.size)
+                (start,) = _INDEX_ENTRY.unpack(index_file.read(_INDEX_ENTRY.size))
+            
+            with open(self.log_path, "rb") as log_file:
+                log_file.seek(start)
+                tail = log_file.read()
+        except (OSError, struct.error):
+            return []
+        
+        messages = []
+        for line in tail.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write from an interrupted process
+                continue
+            if isinstance(record, dict) and "role" in record and "content" in record:
+                messages.append({"role": record["role"], "content": record["content"]})
+        messages = messages[-limit:]
+        
+        # Drop the answer whose question fell out of the window
+        start = 0
+        while start < len(messages) and messages[start]["role"] == "assistant":
+            start += 1
+        return messages[start:]
+    
+    def compact(self) -> None:
+        """Rewrite the session keeping only the rolling window"""
+        messages = self.load(self.max_length)
+        
+        log_tmp = self.log_path.with_suffix(".jsonl.tmp")
+        index_tmp = self.index_path.with_suffix(".idx.tmp")
+        with open_private(log_tmp, "wb") as log_file, open_private(index_tmp, "wb") as index_file:
+            for message in messages:
+                index_file.write(_INDEX_ENTRY.pack(log_file.tell()))
+                log_file.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        
+        os.replace(log_tmp, self.log_path)
+        os.replace(index_tmp, self.index_path)
+    
+    def clear(self) -> None:
+        """Delete all stored messages of the session"""
+        self.close()
+        for path in (self.log_path, self.index_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def __enter__(self) -> "ChatHistoryStore":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,263 @@
+"""
+Chunked map-reduce for large inputs
+
+Input that does not fit in one request is read in bounded chunks, each
+chunk is answered concurrently (map) and the partial answers are folded
+into one answer as they arrive (reduce). Only a few chunks and at most
+about one chunk of partial answers per reduce level are held in memory,
+however large the input is.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator, Dict, Generator, Iterator, List, Optional, TextIO
+
+from .events import CompletionError, CompletionEvent, CompletionResult, Finish, Notice, TextDelta
+
+
+MAP_TEMPLATE = "{task}\n\nInput data (part {number}):\n{chunk}"
+
+REDUCE_TEMPLATE = (
+    "{task}\n\n"
+    "The input data was too large for one request, so it was split into "
+    "consecutive parts that were answered separately. Combine these partial "
+    "answers, in order, into a single answer:\n\n{answers}"
+)
+
+# Task used when large input arrives without a prompt
+DEFAULT_TASK = "Summarize the input data."
+
+
+def iter_chunks(source: TextIO, chunk_size: int, overlap: int = 0,
+                prefix: str = "") -> Iterator[str]:
+    """Read a text stream in bounded, overlapping chunks
+    
+    Chunks end at a line break in their second half when there is one.
+    The overlap is capped at a quarter of the chunk size.
+    
+    Args:
+        source: Text stream to read
+        chunk_size: Maximum characters per chunk
+        overlap: Characters repeated at the start of the next chunk
+        prefix: Text already read from source
+    
+    Yields:
+        Chunks of at most chunk_size characters (prefix may exceed it)
+    
+    Raises:
+        ValueError: If chunk_size is not positive
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    overlap = max(0, min(overlap, chunk_size // 4))
+    
+    buffer = prefix
+    carried = 0
+    eof = False
+    while True:
+        while not eof and len(buffer) < chunk_size:
+            data = source.read(chunk_size - len(buffer))
+            if not data:
+                eof = True
+            buffer += data
+        
+        if eof and len(buffer) <= chunk_size:
+            if len(buffer) > carried and buffer.strip():
+                yield buffer
+            return
+        
+        cut = buffer.rfind("\n", chunk_size // 2, chunk_size)
+        cut = chunk_size if cut == -1 else cut + 1
+        yield buffer[:cut]
+        carried = min(overlap, cut)
+        buffer = buffer[cut - carried:]
+
+
+class MapReduce:
+    """Answers a task over input too large for a single request"""
+    
+    def __init__(self, manager, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 overlap: Optional[int] = None, mode: str = "default", **query):
+        """Initialize map-reduce runner
+        
+        Args:
+            manager: DrGPTManager instance
+            workers: Concurrent chunk requests. If None, uses MAX_CONCURRENCY.
+            chunk_size: Characters per chunk. If None, uses CHUNK_SIZE.
+            overlap: Characters shared by neighbouring chunks.
+                If None, uses CHUNK_OVERLAP.
+            mode: Query mode (default, code, shell, etc.)
+            **query: Query arguments for every request (provider, model, ...)
+        """
+        self.manager = manager
+        self.workers = max(1, int(workers or manager.config.get("MAX_CONCURRENCY", 8)))
+        self.chunk_size = int(chunk_size or manager.config.get("CHUNK_SIZE", 12000))
+        self.overlap = int(overlap if overlap is not None else manager.config.get("CHUNK_OVERLAP", 200))
+        self.mode = mode
+        self.query = {key: value for key, value in query.items() if value is not None}
+    
+    def stream_events(self, task: str, source: TextIO, prefix: str = "",
+                      history: Optional[List[Dict]] = None) -> Generator[CompletionEvent, None, None]:
+        """Synchronous variant of astream_events"""
+        loop = asyncio.new_event_loop()
+        events = self.astream_events(task, source, prefix, history)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(events.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            try:
+                loop.run_until_complete(events.aclose())
+            finally:
+                loop.close()
+    
+    async def astream_events(self, task: str, source: TextIO, prefix: str = "",
+                             history: Optional[List[Dict]] = None) -> AsyncGenerator[CompletionEvent, None]:
+        """Map the task over chunks of source and stream the combined answer
+        
+        Args:
+            task: What to do with the input (the user's prompt)
+            source: Text stream with the input data
+            prefix: Input already read from source
+            history: Earlier conversation, sent with the final request
+        
+        Yields:
+            A Notice with the number of parts, then the events of the final
+            reduce request, or an ErrorEvent if any request failed
+        """
+        provider = self.query.get("provider") or self.manager.config.get("DEFAULT_PROVIDER")
+        self.manager.ai.get_provider(provider).resize_pool(self.workers)
+        
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(self.workers)
+        # Bound read-ahead: at most this many chunks wait for a worker
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers)
+        executor = ThreadPoolExecutor(max_workers=self.workers + 1, thread_name_prefix="drgpt-map")
+        
+        async def produce() -> None:
+            chunks = iter_chunks(source, self.chunk_size, self.overlap, prefix)
+            done = object()
+            number = 0
+            while True:
+                # Reading may block (stdin), keep it off the event loop
+                chunk = await loop.run_in_executor(executor, next, chunks, done)
+                if chunk is done:
+                    break
+                number += 1
+                prompt = MAP_TEMPLATE.format(task=task, number=number, chunk=chunk)
+                mapped = asyncio.ensure_future(self._complete(prompt, limit, executor))
+                try:
+                    await queue.put(mapped)
+                except asyncio.CancelledError:
+                    mapped.cancel()
+                    raise
+            await queue.put(None)
+        
+        producer = asyncio.ensure_future(produce())
+        levels: List[List[str]] = []
+        parts = 0
+        try:
+            while True:
+                mapped = await queue.get()
+                if mapped is None:
+                    break
+                await self._fold(task, levels, 0, await mapped, limit, executor)
+                parts += 1
+            await producer
+            
+            # Higher levels hold earlier input
+            partials = [text for level in reversed(levels) for text in level]
+            while len(partials) > 1 and sum(map(len, partials)) > self.chunk_size:
+                groups = self._group(partials)
+                if len(groups) == len(partials):
+                    # Every answer is a chunk on its own, reducing won't shrink them
+                    break
+                partials = list(await asyncio.gather(*(
+                    self._combine(task, group, limit, executor) for group in groups
+                )))
+        except CompletionError as e:
+            yield e.event
+            return
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                pending = queue.get_nowait()
+                if pending is None:
+                    continue
+                if pending.done() and not pending.cancelled():
+                    pending.exception()  # retrieved, so asyncio does not log it
+                pending.cancel()
+            # Threads blocked on a read or a response must not hold up exit
+            executor.shutdown(wait=False)
+        
+        yield Notice(f"Input was split into {parts} parts and answered in a map-reduce pass")
+        if len(partials) == 1 and parts == 1 and not history:
+            yield TextDelta(partials[0])
+            yield Finish()
+            return
+        
+        prompt = self._reduce_prompt(task, partials)
+        messages = [*history, {"role": "user", "content": prompt}] if history else None
+        async for event in self.manager.aquery_events(
+            prompt=prompt, messages=messages, mode=self.mode, **self.query
+        ):
+            yield event
+    
+    async def _complete(self, prompt: str, limit: asyncio.Semaphore, executor) -> str:
+        """Run one intermediate request and return its text
+        
+        Raises:
+            CompletionError: If the request failed
+        """
+        async with limit:
+            result = CompletionResult()
+            async for event in self.manager.aquery_events(
+                prompt=prompt, mode=self.mode, executor=executor, **self.query
+            ):
+                result.add(event)
+        if result.error is not None:
+            raise CompletionError(result.error)
+        return result.text
+    
+    async def _combine(self, task: str, group: List[str], limit: asyncio.Semaphore, executor) -> str:
+        """Reduce a group of partial answers to one"""
+        if len(group) == 1:
+            return group[0]
+        return await self._complete(self._reduce_prompt(task, group), limit, executor)
+    
+    async def _fold(self, task: str, levels: List[List[str]], level: int, text: str,
+                    limit: asyncio.Semaphore, executor) -> None:
+        """Add a partial answer, reducing a level once it holds a chunk's worth"""
+        if len(levels) == level:
+            levels.append([])
+        group = levels[level]
+        group.append(text)
+        if len(group) > 1 and sum(map(len, group)) >= self.chunk_size:
+            levels[level] = []
+            combined = await self._combine(task, group, limit, executor)
+            await self._fold(task, levels, level + 1, combined, limit, executor)
+    
+    def _group(self, partials: List[str]) -> List[List[str]]:
+        """Split partial answers into consecutive groups of about a chunk each"""
+        groups: List[List[str]] = [[]]
+        size = 0
+        for text in partials:
+            if groups[-1] and size + len(text) > self.chunk_size:
+                groups.append([])
+                size = 0
+            groups[-1].append(text)
+            size += len(text)
+        if len(groups) > 1 and len(groups[-1]) == 1:
+            # A lone trailing answer would not shrink, merge it
+            groups[-2].extend(groups.pop())
+        return groups
+    
+    @staticmethod
+    def _reduce_prompt(task: str, partials: List[str]) -> str:
+        """Build the prompt combining partial answers"""
+        answers = "\n\n".join(
+            f"Partial answer {number}:\n{text}" for number, text in enumerate(partials, 1)
+        )
+        return REDUCE_TEMPLATE.format(task=task, answers=answers)
@@ -6,10 +6,13 @@ provider settings, API keys, and user preferences.
 """
 
 import os
+from contextlib import contextmanager
 from getpass import getpass
 from pathlib import Path
 from tempfile import gettempdir
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ..utils.lazy import LazyObject
 
 
 # Configuration paths
@@ -18,7 +21,9 @@ DRGPT_CONFIG_FOLDER = Path(CONFIG_FOLDER) / "drgpt"
 DRGPT_CONFIG_PATH = DRGPT_CONFIG_FOLDER / "config"
 ROLE_STORAGE_PATH = DRGPT_CONFIG_FOLDER / "roles"
 CHAT_CACHE_PATH = Path(gettempdir()) / "drgpt_chats"
-CACHE_PATH = Path(gettempdir()) / "drgpt_cache"
+# Cached responses are per user, so other users cannot read or plant them
+CACHE_PATH = Path(gettempdir()) / (f"drgpt_cache_{os.getuid()}" if hasattr(os, "getuid") else "drgpt_cache")
+MODELS_CACHE_PATH = Path(gettempdir()) / (f"drgpt_models_{os.getuid()}" if hasattr(os, "getuid") else "drgpt_models")
 
 # Supported AI providers configuration
 SUPPORTED_PROVIDERS = {
@@ -27,28 +32,68 @@ SUPPORTED_PROVIDERS = {
         "base_url": "https://api.openai.com/v1",
         "models": ["gpt-4", "gpt-4-turbo", "gpt-3.5-turbo", "gpt-4o", "gpt-4o-mini"],
         "api_key_env": "OPENAI_API_KEY",
-        "requires_auth": True
+        "requires_auth": True,
+        "context_window": 128000,
+        "context_windows": {
+            "gpt-4": 8192,
+            "gpt-4-turbo": 128000,
+            "gpt-3.5-turbo": 16385,
+            "gpt-4o": 128000,
+            "gpt-4o-mini": 128000
+        },
+        # USD per million (prompt, completion) tokens, for usage reports
+        "prices": {
+            "gpt-4": (30.0, 60.0),
+            "gpt-4-turbo": (10.0, 30.0),
+            "gpt-3.5-turbo": (0.5, 1.5),
+            "gpt-4o": (2.5, 10.0),
+            "gpt-4o-mini": (0.15, 0.6)
+        }
     },
     "anthropic": {
         "name": "Anthropic",
         "base_url": "https://api.anthropic.com/v1",
         "models": ["claude-3-haiku", "claude-3-sonnet", "claude-3-opus"],
         "api_key_env": "ANTHROPIC_API_KEY",
-        "requires_auth": True
+        "requires_auth": True,
+        "context_window": 200000,
+        "prices": {
+            "claude-3-haiku": (0.25, 1.25),
+            "claude-3-sonnet": (3.0, 15.0),
+            "claude-3-opus": (15.0, 75.0),
+            "claude-3-5-haiku": (0.8, 4.0),
+            "claude-3-5-sonnet": (3.0, 15.0)
+        }
     },
     "google": {
         "name": "Google",
-        "base_url": "https://generativelanguage.googleapis.com/v1",
-        "models": ["gemini-pro", "gemini-pro-vision"],
+        "base_url": "https://generativelanguage.googleapis.com/v1beta",
+        "models": ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro", "gemini-pro-vision"],
         "api_key_env": "GOOGLE_API_KEY",
-        "requires_auth": True
+        "requires_auth": True,
+        "context_window": 32760,
+        "context_windows": {
+            "gemini-1.5-flash": 1048576,
+            "gemini-1.5-pro": 2097152,
+            "gemini-pro": 32760,
+            "gemini-pro-vision": 16384
+        },
+        "prices": {
+            "gemini-1.5-flash": (0.075, 0.3),
+            "gemini-1.5-pro": (1.25, 5.0),
+            "gemini-pro": (0.5, 1.5)
+        }
     },
     "huggingface": {
         "name": "Hugging Face",
         "base_url": "https://api-inference.huggingface.co/models",
         "models": ["microsoft/DialoGPT-large", "facebook/blenderbot-400M-distill"],
         "api_key_env": "HUGGINGFACE_API_KEY",
-        "requires_auth": True
+        "requires_auth": True,
+        "context_windows": {
+            "microsoft/DialoGPT-large": 1024,
+            "facebook/blenderbot-400M-distill": 128
+        }
     },
     "custom": {
         "name": "Custom",
@@ -66,12 +111,41 @@ DEFAULT_CONFIG = {
     "CACHE_PATH": str(CACHE_PATH),
     "CHAT_CACHE_LENGTH": 100,
     "CACHE_LENGTH": 100,
+    "CACHE_ALL_TEMPERATURES": False,
+    "MODELS_CACHE_PATH": str(MODELS_CACHE_PATH),
+    "MODELS_CACHE_TTL": 86400,
     "REQUEST_TIMEOUT": 60,
+    "CONNECT_TIMEOUT": 10,
+    # Seconds a completion may take in total / wait for each token (0: no limit)
+    "STREAM_DEADLINE": 0,
+    "STREAM_IDLE_TIMEOUT": 0,
+    "MAX_CONCURRENCY": 8,
+    "HTTP_POOL_SIZE": 10,
+    "TCP_KEEPALIVE": True,
+    "HTTP2": False,
+    "PROXY_URL": "",
+    "CA_BUNDLE": "",
+    "RETRY_MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF_BASE": 0.5,
+    "RETRY_BACKOFF_MAX": 20.0,
+    "HEDGE_REQUESTS": False,
+    "HEDGE_AFTER": 0,
+    "FIT_CONTEXT": True,
+    "CHUNK_SIZE": 12000,
+    "CHUNK_OVERLAP": 200,
+    "METRICS_OTEL": False,
+    "USAGE_LEDGER": True,
+    # Empty: "usage" next to the config file
+    "USAGE_LEDGER_PATH": "",
     
     # AI Provider settings
     "DEFAULT_PROVIDER": "openai",
     "DEFAULT_MODEL": "gpt-4o-mini",
     "API_BASE_URL": "https://api.openai.com/v1",
+    "CUSTOM_BASE_URL": "",
+    "ROUTE_TARGETS": "",
+    "ROUTE_STRATEGY": "latency",
+    "ROUTE_COOLDOWN": 30,
     
     # API Keys (empty by default)
     "OPENAI_API_KEY": "",
@@ -94,8 +168,49 @@ DEFAULT_CONFIG = {
 }
 
 
+# Parsed config files by path, reused while their (mtime, size) is unchanged
+_PARSED_FILES: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a lock file next to path
+    
+    Serializes config writers across processes (several terminals running
+    aliases at once). Readers never block.
+    """
+    lock_path = path.with_name(f".{path.name}.lock")
+    with open(lock_path, "a") as handle:
+        try:
+            import fcntl
+        except ImportError:
+            # Windows
+            import msvcrt
+            
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
 class Config:
-    """Configuration manager for DrGPT"""
+    """Configuration manager for DrGPT
+    
+    The config file is a list of KEY=VALUE lines. Writes are atomic
+    (temp file and rename) and serialized with a lock file; keys changed
+    by other processes in the meantime are merged rather than overwritten.
+    Use transaction() to batch several set() calls into one write.
+    """
     
     def __init__(self, config_path: Optional[Path] = None):
         """Initialize configuration manager
@@ -105,6 +220,9 @@ class Config:
         """
         self.config_path = config_path or DRGPT_CONFIG_PATH
         self._config = DEFAULT_CONFIG.copy()
+        self._dirty = set()
+        self._transaction_depth = 0
+        self._file_stamp: Optional[Tuple[int, int]] = None
         self._load_config()
     
     def _load_config(self) -> None:
@@ -119,38 +237,127 @@ class Config:
         if self.config_path.exists():
             self._read_config_file()
         else:
-            # Create config directory if it doesn't exist
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
+            # Create the config file with every key
+            self._dirty.update(self._config)
             self._write_config_file()
     
+    def _parse_config_file(self) -> Tuple[Optional[Tuple[int, int]], Dict[str, str]]:
+        """Parse the config file, reusing the last parse if it is unchanged
+        
+        Returns:
+            Tuple of ((mtime, size) stamp or None if missing, raw values)
+            
+        Raises:
+            OSError: If the file exists but cannot be read
+        """
+        try:
+            stat = self.config_path.stat()
+        except FileNotFoundError:
+            return None, {}
+        
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _PARSED_FILES.get(str(self.config_path))
+        if cached is not None and cached[0] == stamp:
+            return stamp, cached[1]
+        
+        values = {}
+        with open(self.config_path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    if "=" in line:
+                        key, value = line.split("=", 1)
+                        values[key.strip()] = value.strip()
+        
+        _PARSED_FILES[str(self.config_path)] = (stamp, values)
+        return stamp, values
+    
     def _read_config_file(self) -> None:
-        """Read configuration from file"""
+        """Read configuration from file
+        
+        Keys with pending (unwritten) changes keep their new value.
+        """
         try:
-            with open(self.config_path, "r", encoding="utf-8") as file:
-                for line in file:
-                    line = line.strip()
-                    if line and not line.startswith("#"):
-                        if "=" in line:
-                            key, value = line.split("=", 1)
-                            key = key.strip()
-                            value = value.strip()
-                            if key in self._config:
-                                self._config[key] = self._convert_value(value)
+            stamp, values = self._parse_config_file()
         except Exception as e:
             print(f"Warning: Could not read config file: {e}")
+            return
+        
+        for key, value in values.items():
+            if key in self._config and key not in self._dirty:
+                self._config[key] = self._convert_value(value)
+        self._file_stamp = stamp
     
     def _write_config_file(self) -> None:
-        """Write configuration to file"""
+        """Atomically write configuration to file"""
         try:
-            with open(self.config_path, "w", encoding="utf-8") as file:
-                file.write("# DrGPT Configuration File\n")
-                file.write("# This file is automatically generated\n\n")
+            self.config_path.parent.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self.config_path):
+                # Pick up keys other processes changed since our last read
+                if self.config_path.exists():
+                    self._read_config_file()
+                
+                tmp_path = self.config_path.with_name(f".{self.config_path.name}.{os.getpid()}.tmp")
+                # The file holds API keys, keep it private to the user
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with open(fd, "w", encoding="utf-8") as file:
+                    file.write("# DrGPT Configuration File\n")
+                    file.write("# This file is automatically generated\n\n")
+                    
+                    for key, value in self._config.items():
+                        file.write(f"{key}={value}\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.config_path)
                 
-                for key, value in self._config.items():
-                    file.write(f"{key}={value}\n")
+                stat = self.config_path.stat()
+                self._file_stamp = (stat.st_mtime_ns, stat.st_size)
+                self._dirty.clear()
         except Exception as e:
             print(f"Warning: Could not write config file: {e}")
     
+    def refresh(self) -> bool:
+        """Re-read the config file if another process changed it
+        
+        Cheap enough to call before every request in long-running
+        processes: an unchanged file costs a single stat call.
+        
+        Returns:
+            True if the file changed and was re-read
+        """
+        try:
+            stat = self.config_path.stat()
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self._file_stamp:
+            return False
+        self._read_config_file()
+        return True
+    
+    @contextmanager
+    def transaction(self) -> Iterator["Config"]:
+        """Batch several set() calls into a single write
+        
+        Changes are written once when the outermost transaction ends, or
+        rolled back if it raises.
+        
+        Yields:
+            This Config instance
+        """
+        if self._transaction_depth == 0:
+            snapshot = (dict(self._config), set(self._dirty))
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._config, self._dirty = snapshot
+            raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0 and self._dirty:
+            self._write_config_file()
+    
     def _convert_value(self, value: str) -> Any:
         """Convert string value to appropriate type"""
         if value.lower() in ("true", "false"):
@@ -186,8 +393,23 @@ class Config:
             key: Configuration key
             value: Configuration value
         """
+        if key in self._config and self._config[key] == value and key not in self._dirty:
+            return
+        
         self._config[key] = value
-        self._write_config_file()
+        self._dirty.add(key)
+        if self._transaction_depth == 0:
+            self._write_config_file()
+    
+    def update(self, values: Dict[str, Any]) -> None:
+        """Set several configuration values with a single write
+        
+        Args:
+            values: Configuration keys and values
+        """
+        with self.transaction():
+            for key, value in values.items():
+                self.set(key, value)
     
     def get_provider_config(self, provider: Optional[str] = None) -> Dict[str, Any]:
         """Get configuration for a specific AI provider
@@ -270,24 +492,29 @@ class Config:
         if provider not in SUPPORTED_PROVIDERS:
             raise ValueError(f"Unsupported provider: {provider}")
         
-        self.set("DEFAULT_PROVIDER", provider)
-        
-        provider_config = SUPPORTED_PROVIDERS[provider]
-        
-        if model:
-            if (model not in provider_config["models"] and 
-                provider != "custom" and 
-                provider_config["models"]):
-                print(f"Warning: Model {model} not in default list for {provider}")
-            self.set("DEFAULT_MODEL", model)
-        elif provider_config["models"]:
-            # Set first available model as default
-            self.set("DEFAULT_MODEL", provider_config["models"][0])
-        
-        if base_url:
-            self.set("API_BASE_URL", base_url)
-        elif provider_config["base_url"]:
-            self.set("API_BASE_URL", provider_config["base_url"])
+        with self.transaction():
+            self.set("DEFAULT_PROVIDER", provider)
+            
+            provider_config = SUPPORTED_PROVIDERS[provider]
+            
+            if model:
+                if (model not in provider_config["models"] and 
+                    provider != "custom" and 
+                    provider_config["models"]):
+                    print(f"Warning: Model {model} not in default list for {provider}")
+                self.set("DEFAULT_MODEL", model)
+            elif provider_config["models"]:
+                # Set first available model as default
+                self.set("DEFAULT_MODEL", provider_config["models"][0])
+            
+            if base_url:
+                self.set("API_BASE_URL", base_url)
+                if provider == "custom":
+                    self.set("CUSTOM_BASE_URL", base_url)
+            elif provider == "custom" and self.get("CUSTOM_BASE_URL"):
+                self.set("API_BASE_URL", self.get("CUSTOM_BASE_URL"))
+            elif provider_config["base_url"]:
+                self.set("API_BASE_URL", provider_config["base_url"])
     
     def list_providers(self) -> Dict[str, Dict[str, Any]]:
         """List all supported providers with their models
@@ -300,8 +527,18 @@ class Config:
     def reset_to_defaults(self) -> None:
         """Reset configuration to default values"""
         self._config = DEFAULT_CONFIG.copy()
+        self._dirty.update(self._config)
         self._write_config_file()
 
 
-# Global configuration instance
-config = Config()
+def get_config() -> Config:
+    """Get the global configuration instance, creating it on first use
+    
+    Returns:
+        Shared Config instance
+    """
+    return config._get_instance()
+
+
+# Global configuration instance (constructed on first access)
+config = LazyObject(Config)
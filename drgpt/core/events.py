@@ -0,0 +1,187 @@
+"""
+Completion events for DrGPT
+
+Providers stream typed events instead of bare strings, so text, token
+usage, the finish reason and errors travel on separate channels. The
+adapters at the bottom turn an event stream back into the plain text
+chunks older callers expect.
+"""
+
+from typing import AsyncIterable, AsyncGenerator, Callable, Generator, Iterable, NamedTuple, Optional, Union
+
+
+class TextDelta(NamedTuple):
+    """A piece of generated text"""
+    text: str
+
+
+class Usage(NamedTuple):
+    """Token usage reported by the provider"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    
+    @property
+    def total_tokens(self) -> int:
+        """Prompt and completion tokens combined"""
+        return self.prompt_tokens + self.completion_tokens
+
+
+class Finish(NamedTuple):
+    """End of a completion with the provider's finish reason"""
+    reason: str = "stop"
+
+
+class ErrorEvent(NamedTuple):
+    """A failed completion
+    
+    ``kind`` is ``"network"`` for transport failures (after retries),
+    ``"timeout"`` when a stream's deadline or idle timeout expired and
+    ``"error"`` for everything else.
+    """
+    message: str
+    kind: str = "error"
+    
+    def __str__(self) -> str:
+        prefix = "Network error" if self.kind == "network" else "Error"
+        return f"{prefix}: {self.message}"
+
+
+class Notice(NamedTuple):
+    """Advisory message about a request, e.g. a trimmed context"""
+    message: str
+
+
+CompletionEvent = Union[TextDelta, Usage, Finish, ErrorEvent, Notice]
+
+
+class CompletionError(Exception):
+    """Raised by the text adapters when a completion fails"""
+    
+    def __init__(self, event: ErrorEvent):
+        """Initialize completion error
+        
+        Args:
+            event: Error event reported by the provider
+        """
+        super().__init__(str(event))
+        self.event = event
+
+
+class CompletionResult:
+    """Accumulated outcome of an event stream"""
+    
+    __slots__ = ("chunks", "usage", "finish_reason", "error", "notices")
+    
+    def __init__(self):
+        """Initialize an empty result"""
+        self.chunks = []
+        self.usage: Optional[Usage] = None
+        self.finish_reason: Optional[str] = None
+        self.error: Optional[ErrorEvent] = None
+        self.notices = []
+    
+    @property
+    def text(self) -> str:
+        """Full generated text"""
+        return "".join(self.chunks)
+    
+    @property
+    def ok(self) -> bool:
+        """True if the completion finished without an error"""
+        return self.error is None
+    
+    def add(self, event: CompletionEvent) -> None:
+        """Record one event
+        
+        Args:
+            event: Completion event
+        """
+        if type(event) is TextDelta:
+            self.chunks.append(event.text)
+        elif type(event) is Usage:
+            self.usage = event
+        elif type(event) is Finish:
+            self.finish_reason = event.reason
+        elif type(event) is ErrorEvent:
+            self.error = event
+        elif type(event) is Notice:
+            self.notices.append(event.message)
+    
+    @classmethod
+    def collect(cls, events: Iterable[CompletionEvent]) -> "CompletionResult":
+        """Consume an event stream
+        
+        Args:
+            events: Completion events
+        
+        Returns:
+            CompletionResult instance
+        """
+        result = cls()
+        for event in events:
+            result.add(event)
+        return result
+
+
+def text_events(chunks: Iterable[str]) -> Generator[CompletionEvent, None, None]:
+    """Wrap a plain text stream (e.g. a legacy provider) as events
+    
+    Args:
+        chunks: Text chunks
+    
+    Yields:
+        TextDelta events followed by a Finish event
+    """
+    for chunk in chunks:
+        yield TextDelta(chunk)
+    yield Finish()
+
+
+def iter_text(events: Iterable[CompletionEvent], raise_errors: bool = False,
+              on_notice: Optional[Callable[[str], None]] = None) -> Generator[str, None, None]:
+    """Adapt an event stream to plain text chunks
+    
+    Args:
+        events: Completion events
+        raise_errors: Raise CompletionError on failure instead of yielding
+            the error as text (the historical behaviour)
+        on_notice: Called with each Notice message (optional)
+    
+    Yields:
+        Text chunks
+    
+    Raises:
+        CompletionError: On an error event when raise_errors is set
+    """
+    for event in events:
+        if type(event) is TextDelta:
+            yield event.text
+        elif type(event) is ErrorEvent:
+            if raise_errors:
+                raise CompletionError(event)
+            yield str(event)
+        elif type(event) is Notice and on_notice is not None:
+            on_notice(event.message)
+
+
+async def aiter_text(events: AsyncIterable[CompletionEvent], raise_errors: bool = False,
+                     on_notice: Optional[Callable[[str], None]] = None) -> AsyncGenerator[str, None]:
+    """Asynchronous variant of iter_text
+    
+    Args:
+        events: Completion events
+        raise_errors: Raise CompletionError on failure
+        on_notice: Called with each Notice message (optional)
+    
+    Yields:
+        Text chunks
+    """
+    async for event in events:
+        if type(event) is TextDelta:
+            yield event.text
+        elif type(event) is ErrorEvent:
+            if raise_errors:
+                raise CompletionError(event)
+            yield str(event)
+        elif type(event) is Notice and on_notice is not None:
+            on_notice(event.message)
@@ -0,0 +1,285 @@
+"""
+Usage ledger for DrGPT
+
+Appends one fixed-size binary record per provider request (time, model,
+prompt and completion tokens, duration, status) to an append-only file,
+and keeps per-day, per-model aggregates in a rollup file that is
+advanced incrementally. Reports therefore only read records written since
+the last report, however many months of history the ledger holds.
+
+Files in the ledger directory:
+
+* ``usage.bin``: 8-byte header, then 24-byte little-endian records
+* ``names``: ``id<TAB>provider:model`` lines (ids are CRC-32 hashes, so
+  concurrent writers never need to coordinate)
+* ``rollup.json``: aggregates of the records before ``offset``
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Generator, Iterable, List, NamedTuple, Optional, Tuple
+
+from .config import SUPPORTED_PROVIDERS
+from .events import ErrorEvent, Finish, Usage
+
+
+HEADER = b"DRGU\x01\x00\x00\x00"
+
+# time, name id, prompt tokens, completion tokens, duration ms, status
+RECORD = struct.Struct("<IIIIIB3x")
+
+STATUSES = ("ok", "error", "cancelled")
+
+
+class UsageRow(NamedTuple):
+    """Aggregated usage of one model on one day"""
+    day: str
+    provider: str
+    model: str
+    requests: int
+    errors: int
+    prompt_tokens: int
+    completion_tokens: int
+    duration: float
+    
+    @property
+    def cost(self) -> Optional[float]:
+        """Estimated cost in USD at list prices, or None if unknown"""
+        price = model_price(self.provider, self.model)
+        if price is None:
+            return None
+        return (self.prompt_tokens * price[0] + self.completion_tokens * price[1]) / 1_000_000
+
+
+def model_price(provider: str, model: str) -> Optional[Tuple[float, float]]:
+    """Look up a model's list price in SUPPORTED_PROVIDERS
+    
+    Dated or suffixed model names match their longest listed prefix.
+    
+    Args:
+        provider: Provider name
+        model: Model name
+    
+    Returns:
+        Tuple of (USD per million prompt tokens, USD per million
+        completion tokens), or None if unknown
+    """
+    prices = SUPPORTED_PROVIDERS.get(provider, {}).get("prices", {})
+    if model in prices:
+        return tuple(prices[model])
+    for name in sorted(prices, key=len, reverse=True):
+        if model.startswith(name):
+            return tuple(prices[name])
+    return None
+
+
+class UsageLedger:
+    """Append-only usage records with incremental daily aggregates"""
+    
+    def __init__(self, directory: Path):
+        """Initialize usage ledger
+        
+        Args:
+            directory: Directory holding the ledger files
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / "usage.bin"
+        self._known_names = set()
+    
+    def append(self, provider: str, model: str, usage: Optional[Usage],
+               duration: float, status: str = "ok", timestamp: Optional[float] = None) -> None:
+        """Record one request (best effort, never raises)
+        
+        Args:
+            provider: Provider name
+            model: Model name
+            usage: Token usage reported by the provider, if any
+            duration: Request duration in seconds
+            status: ``ok``, ``error`` or ``cancelled``
+            timestamp: Request time (default: now)
+        """
+        name = f"{provider}:{model}"
+        name_id = zlib.crc32(name.encode("utf-8"))
+        usage = usage or Usage()
+        record = RECORD.pack(
+            int(timestamp if timestamp is not None else time.time()),
+            name_id,
+            max(0, usage.prompt_tokens),
+            max(0, usage.completion_tokens),
+            min(int(duration * 1000), 0xFFFFFFFF),
+            STATUSES.index(status) if status in STATUSES else 0,
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if name_id not in self._known_names:
+                self._add_name(name_id, name)
+            if not self.path.exists():
+                try:
+                    with open(self.path, "xb") as file:
+                        file.write(HEADER)
+                except FileExistsError:
+                    pass
+            # A single O_APPEND write, so concurrent processes never interleave
+            with open(self.path, "ab") as file:
+                file.write(record)
+        except OSError:
+            pass
+    
+    def track(self, events: Iterable, provider: str, model: str) -> Generator:
+        """Pass a provider's event stream through, recording its usage
+        
+        Args:
+            events: Provider event generator
+            provider: Provider name
+            model: Model name
+        
+        Yields:
+            The provider's events
+        """
+        start = time.time()
+        state = _StreamState()
+        events = iter(events)
+        try:
+            for event in events:
+                state.observe(event)
+                yield event
+        finally:
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+            if state.seen:
+                self.append(provider, model, state.usage, time.time() - start, state.status, start)
+    
+    async def atrack(self, events: AsyncGenerator, provider: str, model: str) -> AsyncGenerator:
+        """Asynchronous variant of track"""
+        start = time.time()
+        state = _StreamState()
+        try:
+            async for event in events:
+                state.observe(event)
+                yield event
+        finally:
+            await events.aclose()
+            if state.seen:
+                self.append(provider, model, state.usage, time.time() - start, state.status, start)
+    
+    def report(self, days: Optional[int] = None) -> List[UsageRow]:
+        """Aggregate usage per day, provider and model
+        
+        Args:
+            days: Only include the most recent number of days (optional)
+        
+        Returns:
+            Rows sorted by day, provider and model
+        """
+        rollup = self._update_rollup()
+        cutoff = None
+        if days is not None:
+            cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - (days - 1) * 86400))
+        
+        rows = []
+        for day, models in rollup["days"].items():
+            if cutoff is not None and day < cutoff:
+                continue
+            for name, (requests, errors, prompt, completion, duration_ms) in models.items():
+                provider, _, model = name.partition(":")
+                rows.append(UsageRow(day, provider, model, requests, errors, prompt, completion, duration_ms / 1000))
+        rows.sort(key=lambda row: (row.day, row.provider, row.model))
+        return rows
+    
+    def _update_rollup(self) -> Dict[str, Any]:
+        """Fold records appended since the last report into the rollup"""
+        rollup_path = self.directory / "rollup.json"
+        try:
+            with open(rollup_path, "r", encoding="utf-8") as file:
+                rollup = json.load(file)
+        except (OSError, ValueError):
+            rollup = {"offset": len(HEADER), "days": {}}
+        
+        try:
+            with open(self.path, "rb") as file:
+                if file.read(len(HEADER)) != HEADER:
+                    return rollup
+                file.seek(rollup["offset"])
+                data = file.read()
+        except OSError:
+            return rollup
+        
+        # Ignore a record that is still being written
+        complete = len(data) - len(data) % RECORD.size
+        if not complete:
+            return rollup
+        
+        names = self._read_names()
+        days = rollup["days"]
+        day_names = {}
+        for timestamp, name_id, prompt, completion, duration_ms, status in RECORD.iter_unpack(data[:complete]):
+            # Every UTC offset is a multiple of 15 minutes, so the local day
+            # is the same for a whole quarter hour and can be reused
+            quarter = timestamp // 900
+            day = day_names.get(quarter)
+            if day is None:
+                day = day_names[quarter] = time.strftime("%Y-%m-%d", time.localtime(timestamp))
+            name = names.get(name_id, f"unknown:{name_id:08x}")
+            totals = days.setdefault(day, {}).setdefault(name, [0, 0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += status == 1
+            totals[2] += prompt
+            totals[3] += completion
+            totals[4] += duration_ms
+        
+        rollup["offset"] += complete
+        tmp_path = rollup_path.with_name(f".{rollup_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(rollup, file)
+            os.replace(tmp_path, rollup_path)
+        except OSError:
+            pass
+        return rollup
+    
+    def _add_name(self, name_id: int, name: str) -> None:
+        """Make sure the names file maps name_id to name"""
+        names = self._read_names()
+        if name_id not in names:
+            with open(self.directory / "names", "a", encoding="utf-8") as file:
+                file.write(f"{name_id}\t{name}\n")
+        self._known_names.update(names)
+        self._known_names.add(name_id)
+    
+    def _read_names(self) -> Dict[int, str]:
+        """Read the id to name table"""
+        names = {}
+        try:
+            with open(self.directory / "names", "r", encoding="utf-8") as file:
+                for line in file:
+                    name_id, _, name = line.rstrip("\n").partition("\t")
+                    if name_id.isdigit() and name:
+                        names[int(name_id)] = name
+        except OSError:
+            pass
+        return names
+
+
+class _StreamState:
+    """Usage and outcome of a stream being recorded"""
+    
+    __slots__ = ("seen", "usage", "status")
+    
+    def __init__(self):
+        self.seen = False
+        self.usage = None
+        self.status = "cancelled"
+    
+    def observe(self, event) -> None:
+        self.seen = True
+        if type(event) is Usage:
+            self.usage = event
+        elif type(event) is Finish:
+            self.status = "ok"
+        elif type(event) is ErrorEvent:
+            self.status = "error"
@@ -5,11 +5,16 @@ Main manager class that coordinates between different components
 of the DrGPT system.
 """
 
-from typing import Optional, Dict, Any, Generator
+from typing import TYPE_CHECKING, Optional, Dict, Any, AsyncGenerator, List
 from pathlib import Path
 
-from .config import config
-from .ai_interface import ai_interface
+from .config import get_config
+from .ai_interface import get_ai_interface
+from .events import CompletionEvent
+from ..utils.lazy import LazyObject
+
+if TYPE_CHECKING:
+    from .stream import CompletionStream
 
 
 class DrGPTManager:
@@ -17,18 +22,19 @@ class DrGPTManager:
     
     def __init__(self):
         """Initialize DrGPT manager"""
-        self.config = config
-        self.ai = ai_interface
+        self.config = get_config()
+        self.ai = get_ai_interface()
         self._handlers = {}
     
     def query(
         self,
-        prompt: str,
+        prompt: Optional[str] = None,
         provider: Optional[str] = None,
         model: Optional[str] = None,
         mode: str = "default",
+        messages: Optional[List[Dict]] = None,
         **kwargs
-    ) -> Generator[str, None, None]:
+    ) -> "CompletionStream":
         """Execute a query using the AI interface
         
         Args:
@@ -36,23 +42,125 @@ class DrGPTManager:
             provider: AI provider to use
             model: AI model to use
             mode: Query mode (default, code, shell, etc.)
-            **kwargs: Additional parameters
+            messages: Full conversation to send instead of prompt (optional)
+            **kwargs: Additional parameters, e.g. deadline and idle_timeout
             
-        Yields:
-            Generated response chunks
+        Returns:
+            Cancellable stream of generated response chunks
         """
         # Determine role based on mode
         role = self._get_role_for_mode(mode)
         
         # Generate completion
-        yield from self.ai.generate_completion(
+        return self.ai.generate_completion(
             prompt=prompt,
             provider=provider,
             model=model,
             role=role,
+            messages=messages,
             **kwargs
         )
     
+    def query_events(
+        self,
+        prompt: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        mode: str = "default",
+        messages: Optional[List[Dict]] = None,
+        **kwargs
+    ) -> "CompletionStream":
+        """Execute a query and stream typed completion events
+        
+        Unlike query, errors arrive as ErrorEvent instead of text, and
+        token usage and the finish reason are reported.
+        
+        Args:
+            prompt: User prompt
+            provider: AI provider to use
+            model: AI model to use
+            mode: Query mode (default, code, shell, etc.)
+            messages: Full conversation to send instead of prompt (optional)
+            **kwargs: Additional parameters, e.g. deadline and idle_timeout
+            
+        Returns:
+            Cancellable stream of completion events
+        """
+        return self.ai.stream_events(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            role=self._get_role_for_mode(mode),
+            messages=messages,
+            **kwargs
+        )
+    
+    async def aquery(
+        self,
+        prompt: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        mode: str = "default",
+        messages: Optional[List[Dict]] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Asynchronous variant of query
+        
+        Args:
+            prompt: User prompt
+            provider: AI provider to use
+            model: AI model to use
+            mode: Query mode (default, code, shell, etc.)
+            messages: Full conversation to send instead of prompt (optional)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Generated response chunks
+        """
+        role = self._get_role_for_mode(mode)
+        
+        async for chunk in self.ai.agenerate_completion(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            role=role,
+            messages=messages,
+            **kwargs
+        ):
+            yield chunk
+    
+    async def aquery_events(
+        self,
+        prompt: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        mode: str = "default",
+        messages: Optional[List[Dict]] = None,
+        **kwargs
+    ) -> AsyncGenerator[CompletionEvent, None]:
+        """Asynchronous variant of query_events
+        
+        Args:
+            prompt: User prompt
+            provider: AI provider to use
+            model: AI model to use
+            mode: Query mode (default, code, shell, etc.)
+            messages: Full conversation to send instead of prompt (optional)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Completion events
+        """
+        async for event in self.ai.astream_events(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            role=self._get_role_for_mode(mode),
+            messages=messages,
+            **kwargs
+        ):
+            yield event
+    
     def _get_role_for_mode(self, mode: str) -> str:
         """Get appropriate role for the given mode
         
@@ -73,7 +181,8 @@ class DrGPTManager:
         self,
         provider: str,
         model: Optional[str] = None,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None
     ) -> None:
         """Set AI provider configuration
         
@@ -81,24 +190,30 @@ class DrGPTManager:
             provider: Provider name
             model: Model name (optional)
             api_key: API key (optional)
+            base_url: Base URL, e.g. of a local server for custom (optional)
         """
-        if api_key:
-            provider_config = self.config.get_provider_config(provider)
-            api_key_env = provider_config["api_key_env"]
-            self.config.set(api_key_env, api_key)
-        
-        self.config.set_provider(provider, model)
+        # One config write for the key, provider, model and base URL
+        with self.config.transaction():
+            if api_key:
+                provider_config = self.config.get_provider_config(provider)
+                api_key_env = provider_config["api_key_env"]
+                self.config.set(api_key_env, api_key)
+            
+            self.config.set_provider(provider, model, base_url)
         
         # Reinitialize AI interface to pick up new settings
         self.ai._initialize_providers()
     
-    def list_providers(self) -> Dict[str, Any]:
+    def list_providers(self, refresh: bool = False) -> Dict[str, Any]:
         """List available providers and models
         
+        Args:
+            refresh: Revalidate cached model lists even if they are fresh
+            
         Returns:
             Dictionary of provider information
         """
-        return self.ai.list_providers()
+        return self.ai.list_providers(refresh)
     
     def get_status(self) -> Dict[str, Any]:
         """Get current DrGPT status
@@ -115,9 +230,19 @@ class DrGPTManager:
             "model": current_model,
             "has_api_key": has_api_key,
             "config_path": str(self.config.config_path),
+            "cache": self.ai.cache.stats(),
             "available_providers": list(self.config.list_providers().keys())
         }
 
 
-# Global manager instance
-manager = DrGPTManager()
+def get_manager() -> DrGPTManager:
+    """Get the global manager, creating it on first use
+    
+    Returns:
+        Shared DrGPTManager instance
+    """
+    return manager._get_instance()
+
+
+# Global manager instance (constructed on first access)
+manager = LazyObject(DrGPTManager)
@@ -0,0 +1,378 @@
+"""
+Request metrics and tracing for DrGPT
+
+Times every provider request on the streaming hot path: connect time
+(until response headers), time to first token, gaps between tokens,
+total duration, bytes and network chunks read. Finished traces are
+aggregated into Prometheus-style counters and histograms and handed to
+exporters (``--timings`` output, OpenTelemetry spans).
+
+Metrics are disabled by default. A disabled request pays one attribute
+check and one context variable lookup; nothing is timed or allocated.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+from .events import ErrorEvent, Finish, TextDelta
+
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+GAP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Trace of the request whose provider stream is being read, so the
+# provider can report connect time and bytes without extra parameters
+current_trace: ContextVar[Optional["Trace"]] = ContextVar("drgpt_trace", default=None)
+
+
+class Trace:
+    """Timings of one provider request
+    
+    Times are seconds relative to the start of the request.
+    """
+    
+    __slots__ = (
+        "provider", "model", "wall_start", "start", "connect", "first_token", "duration",
+        "status", "tokens", "chunks", "bytes", "gaps", "_last_token",
+    )
+    
+    def __init__(self, provider: str, model: str):
+        """Start a trace
+        
+        Args:
+            provider: Provider name
+            model: Model name
+        """
+        self.provider = provider
+        self.model = model
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.connect: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.duration: Optional[float] = None
+        # "ok" after a Finish, "error" after an ErrorEvent, else "cancelled"
+        self.status = "cancelled"
+        self.tokens = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.gaps: List[float] = []
+        self._last_token = 0.0
+    
+    def connected(self) -> None:
+        """Mark the arrival of the response headers"""
+        self.connect = time.perf_counter() - self.start
+    
+    def received(self, size: int) -> None:
+        """Count one network chunk of size bytes"""
+        self.chunks += 1
+        self.bytes += size
+    
+    def observe(self, event) -> None:
+        """Account for one completion event"""
+        if type(event) is TextDelta:
+            now = time.perf_counter()
+            if self.first_token is None:
+                self.first_token = now - self.start
+            else:
+                self.gaps.append(now - self._last_token)
+            self._last_token = now
+            self.tokens += 1
+        elif type(event) is Finish:
+            self.status = "ok"
+        elif type(event) is ErrorEvent:
+            self.status = "error"
+    
+    def finish(self) -> None:
+        """Stop the clock"""
+        self.duration = time.perf_counter() - self.start
+    
+    def summary(self) -> Dict[str, Any]:
+        """Trace values as a dictionary"""
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "status": self.status,
+            "connect": self.connect,
+            "first_token": self.first_token,
+            "duration": self.duration,
+            "tokens": self.tokens,
+            "chunks": self.chunks,
+            "bytes": self.bytes,
+            "mean_gap": sum(self.gaps) / len(self.gaps) if self.gaps else None,
+            "max_gap": max(self.gaps) if self.gaps else None,
+        }
+    
+    def format(self) -> str:
+        """One-line human readable breakdown"""
+        def seconds(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.2f}s"
+        
+        parts = [
+            f"{self.provider}:{self.model}",
+            f"connect {seconds(self.connect)}",
+            f"first token {seconds(self.first_token)}",
+            f"total {seconds(self.duration)}",
+            f"{self.tokens} tokens in {self.chunks} chunks ({self.bytes / 1024:.1f} KB)",
+        ]
+        if self.gaps:
+            mean_gap = sum(self.gaps) / len(self.gaps)
+            parts.append(f"gap avg {mean_gap * 1000:.0f}ms max {max(self.gaps) * 1000:.0f}ms")
+        if self.status != "ok":
+            parts.append(self.status)
+        return " | ".join(parts)
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds"""
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """Add one sample"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Aggregates request traces and passes them to exporters"""
+    
+    # Prometheus metric name -> (type, help text)
+    DESCRIPTIONS = {
+        "drgpt_requests_total": ("counter", "Provider requests by final status"),
+        "drgpt_response_bytes_total": ("counter", "Response bytes read from providers"),
+        "drgpt_response_chunks_total": ("counter", "Network chunks read from providers"),
+        "drgpt_response_tokens_total": ("counter", "Text deltas streamed from providers"),
+        "drgpt_connect_seconds": ("histogram", "Time until response headers, including retries"),
+        "drgpt_time_to_first_token_seconds": ("histogram", "Time until the first text delta"),
+        "drgpt_request_duration_seconds": ("histogram", "Total request duration"),
+        "drgpt_inter_token_gap_seconds": ("histogram", "Time between consecutive text deltas"),
+    }
+    
+    def __init__(self):
+        """Initialize metrics (disabled)"""
+        self.enabled = False
+        self.exporters: List[Callable[[Trace], None]] = []
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._lock = threading.Lock()
+    
+    def enable(self) -> None:
+        """Start tracing requests"""
+        self.enabled = True
+    
+    def configure(self, config) -> None:
+        """Enable exporters requested in configuration
+        
+        ``METRICS_OTEL`` adds the OpenTelemetry exporter.
+        
+        Args:
+            config: Config instance
+        
+        Raises:
+            ImportError: If METRICS_OTEL is set but opentelemetry-api is missing
+        """
+        if config.get("METRICS_OTEL") and not any(
+            isinstance(exporter, OpenTelemetryExporter) for exporter in self.exporters
+        ):
+            self.add_exporter(OpenTelemetryExporter())
+    
+    def add_exporter(self, exporter: Callable[[Trace], None]) -> Callable[[Trace], None]:
+        """Call exporter with every finished trace (enables metrics)
+        
+        Args:
+            exporter: Callback receiving Trace objects
+        
+        Returns:
+            The exporter, for remove_exporter
+        """
+        self.exporters.append(exporter)
+        self.enable()
+        return exporter
+    
+    def remove_exporter(self, exporter: Callable[[Trace], None]) -> None:
+        """Stop calling an exporter"""
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+    
+    def trace(self, events: Iterable, provider: str, model: str) -> Generator:
+        """Pass a provider's event stream through, timing it
+        
+        Args:
+            events: Provider event generator
+            provider: Provider name
+            model: Model name
+        
+        Yields:
+            The provider's events
+        """
+        trace = Trace(provider, model)
+        events = iter(events)
+        try:
+            while True:
+                # Visible to the provider only while it produces an event
+                token = current_trace.set(trace)
+                try:
+                    event = next(events)
+                except StopIteration:
+                    break
+                finally:
+                    current_trace.reset(token)
+                trace.observe(event)
+                yield event
+        finally:
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+            self.record(trace)
+    
+    async def atrace(self, events: AsyncGenerator, provider: str, model: str) -> AsyncGenerator:
+        """Asynchronous variant of trace"""
+        trace = Trace(provider, model)
+        try:
+            while True:
+                token = current_trace.set(trace)
+                try:
+                    event = await events.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    current_trace.reset(token)
+                trace.observe(event)
+                yield event
+        finally:
+            await events.aclose()
+            self.record(trace)
+    
+    def record(self, trace: Trace) -> None:
+        """Aggregate a finished trace and export it"""
+        trace.finish()
+        labels = (("provider", trace.provider), ("model", trace.model))
+        with self._lock:
+            self._count("drgpt_requests_total", labels + (("status", trace.status),), 1)
+            self._count("drgpt_response_bytes_total", labels, trace.bytes)
+            self._count("drgpt_response_chunks_total", labels, trace.chunks)
+            self._count("drgpt_response_tokens_total", labels, trace.tokens)
+            if trace.connect is not None:
+                self._observe("drgpt_connect_seconds", labels, LATENCY_BUCKETS, trace.connect)
+            if trace.first_token is not None:
+                self._observe("drgpt_time_to_first_token_seconds", labels, LATENCY_BUCKETS, trace.first_token)
+            self._observe("drgpt_request_duration_seconds", labels, LATENCY_BUCKETS, trace.duration)
+            for gap in trace.gaps:
+                self._observe("drgpt_inter_token_gap_seconds", labels, GAP_BUCKETS, gap)
+        
+        for exporter in list(self.exporters):
+            try:
+                exporter(trace)
+            except Exception:
+                # Telemetry must never break a response
+                pass
+    
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self.DESCRIPTIONS.items():
+                if kind == "counter":
+                    samples = [(labels, value) for (key, labels), value in self._counters.items() if key == name]
+                else:
+                    samples = [(labels, value) for (key, labels), value in self._histograms.items() if key == name]
+                if not samples:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(samples, key=lambda sample: sample[0]):
+                    if kind == "counter":
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + (float("inf"),), value.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {value.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+    
+    def reset(self) -> None:
+        """Drop all aggregated values"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+    
+    def _count(self, name: str, labels, value: float) -> None:
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+    
+    def _observe(self, name: str, labels, buckets: Tuple[float, ...], value: float) -> None:
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def _format_labels(labels) -> str:
+    """Format Prometheus labels, escaping values"""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class OpenTelemetryExporter:
+    """Export each request as an OpenTelemetry span
+    
+    Needs ``opentelemetry-api`` (``pip install drgpt[otel]``); spans go to
+    whatever tracer provider the application or ``opentelemetry-instrument``
+    configured, and are dropped if there is none.
+    """
+    
+    def __init__(self, tracer=None):
+        """Initialize exporter
+        
+        Args:
+            tracer: OpenTelemetry tracer. If None, uses the global one.
+        
+        Raises:
+            ImportError: If opentelemetry-api is not installed
+        """
+        from opentelemetry import trace as otel_trace
+        
+        self._status_error = otel_trace.Status(otel_trace.StatusCode.ERROR)
+        self.tracer = tracer or otel_trace.get_tracer("drgpt")
+    
+    def __call__(self, trace: Trace) -> None:
+        start_ns = int(trace.wall_start * 1e9)
+        span = self.tracer.start_span(
+            "drgpt.completion",
+            start_time=start_ns,
+            attributes={
+                "gen_ai.system": trace.provider,
+                "gen_ai.request.model": trace.model,
+                "drgpt.status": trace.status,
+                "drgpt.tokens": trace.tokens,
+                "drgpt.chunks": trace.chunks,
+                "drgpt.bytes": trace.bytes,
+            },
+        )
+        if trace.connect is not None:
+            span.add_event("connected", timestamp=start_ns + int(trace.connect * 1e9))
+        if trace.first_token is not None:
+            span.add_event("first_token", timestamp=start_ns + int(trace.first_token * 1e9))
+        if trace.status == "error":
+            span.set_status(self._status_error)
+        span.end(end_time=start_ns + int((trace.duration or 0) * 1e9))
+
+
+# Global metrics
+metrics = Metrics()
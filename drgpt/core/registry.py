@@ -0,0 +1,138 @@
+"""
+Provider registry for DrGPT
+
+Maps provider names to ``AIProvider`` classes. Built-in providers
+register themselves with the ``register_provider`` decorator; third-party
+packages add providers through the ``drgpt.providers`` entry point group
+(``name = "package.module:ProviderClass"``). Entry points are only scanned
+when a name is not a built-in, and classes are only imported on lookup.
+
+A plugin class may set a ``provider_config`` dictionary (``name``,
+``base_url``, ``models``, ``api_key_env``, ``requires_auth``) which is
+added to ``SUPPORTED_PROVIDERS`` when the class is loaded.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import SUPPORTED_PROVIDERS
+
+
+ENTRY_POINT_GROUP = "drgpt.providers"
+
+
+class ProviderRegistry:
+    """Lazy name-to-class mapping of AI providers"""
+    
+    def __init__(self, group: str = ENTRY_POINT_GROUP):
+        """Initialize provider registry
+        
+        Args:
+            group: Entry point group scanned for plugin providers
+        """
+        self.group = group
+        # Name -> provider class, or an entry point not loaded yet
+        self._providers: Dict[str, Any] = {}
+        self._scanned = False
+    
+    def register(self, name: str, provider_class: Optional[type] = None):
+        """Register a provider class under a name
+        
+        Can be used directly or as a class decorator::
+        
+            @register_provider("mistral")
+            class MistralProvider(OpenAIProvider):
+                ...
+        
+        The name is also stored as the class's ``provider_name``.
+        
+        Args:
+            name: Provider name as used in config and --provider
+            provider_class: AIProvider subclass (omit to use as decorator)
+        
+        Returns:
+            The class, or a decorator when provider_class is omitted
+        """
+        if provider_class is None:
+            def decorator(cls: type) -> type:
+                self.register(name, cls)
+                return cls
+            return decorator
+        
+        self._providers[name] = provider_class
+        provider_class.provider_name = name
+        self._add_config(name, provider_class)
+        return provider_class
+    
+    def get(self, name: str) -> Optional[type]:
+        """Look up a provider class, loading plugins on demand
+        
+        Args:
+            name: Provider name
+        
+        Returns:
+            Provider class, or None if no provider has that name
+        """
+        if name not in self._providers:
+            self._scan_entry_points()
+        
+        provider_class = self._providers.get(name)
+        if provider_class is None or isinstance(provider_class, type):
+            return provider_class
+        
+        try:
+            loaded = provider_class.load()
+        except Exception as e:
+            print(f"Warning: Could not load provider plugin '{name}': {e}")
+            del self._providers[name]
+            return None
+        return self.register(name, loaded)
+    
+    def names(self) -> List[str]:
+        """Names of all registered and plugin providers"""
+        self._scan_entry_points()
+        return list(self._providers)
+    
+    def __contains__(self, name: str) -> bool:
+        if name not in self._providers:
+            self._scan_entry_points()
+        return name in self._providers
+    
+    def _scan_entry_points(self) -> None:
+        """Record the group's entry points without importing them"""
+        if self._scanned:
+            return
+        self._scanned = True
+        
+        from importlib.metadata import entry_points
+        
+        found = entry_points()
+        if hasattr(found, "select"):  # Python 3.10+
+            found = found.select(group=self.group)
+        else:
+            found = found.get(self.group, [])
+        for entry_point in found:
+            # Built-ins win over plugins of the same name
+            self._providers.setdefault(entry_point.name, entry_point)
+    
+    @staticmethod
+    def _add_config(name: str, provider_class: type) -> None:
+        """Make a plugin's provider settings known to config"""
+        provider_config = getattr(provider_class, "provider_config", None)
+        if name not in SUPPORTED_PROVIDERS and provider_config:
+            SUPPORTED_PROVIDERS[name] = {
+                "name": name.title(),
+                "base_url": "",
+                "models": [],
+                "api_key_env": f"{name.upper()}_API_KEY",
+                "requires_auth": True,
+                **provider_config,
+            }
+
+
+# Global provider registry
+registry = ProviderRegistry()
+
+
+def register_provider(name: str, provider_class: Optional[type] = None) -> Callable:
+    """Register a provider class in the global registry, see ProviderRegistry.register"""
+    return registry.register(name, provider_class)
@@ -0,0 +1,205 @@
+"""
+Retry and hedging policies for DrGPT
+
+Provides the retry policy used by providers before a response starts
+streaming, plus the latency tracking used to decide when to hedge a slow
+request with a second one.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Optional
+
+
+# Status codes worth retrying: timeouts, conflicts, rate limits, overload
+DEFAULT_RETRY_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+
+class RetryPolicy:
+    """Retry policy with exponential backoff, jitter and Retry-After support"""
+    
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        jitter: bool = True,
+        retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        respect_retry_after: bool = True
+    ):
+        """Initialize retry policy
+        
+        Args:
+            max_attempts: Total attempts including the first one
+            backoff_base: Delay in seconds before the first retry
+            backoff_max: Upper bound for any single delay
+            jitter: Randomize delays ("full jitter") to avoid retry storms
+            retry_statuses: HTTP status codes that are retried
+            respect_retry_after: Honor the server's Retry-After header
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = max(0.0, float(backoff_base))
+        self.backoff_max = max(0.0, float(backoff_max))
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+    
+    @classmethod
+    def from_config(cls, config) -> "RetryPolicy":
+        """Build a retry policy from DrGPT configuration
+        
+        Args:
+            config: Config instance
+        
+        Returns:
+            RetryPolicy instance
+        """
+        return cls(
+            max_attempts=config.get("RETRY_MAX_ATTEMPTS", 3),
+            backoff_base=config.get("RETRY_BACKOFF_BASE", 0.5),
+            backoff_max=config.get("RETRY_BACKOFF_MAX", 20.0),
+        )
+    
+    def is_retryable_status(self, status_code: int) -> bool:
+        """Check whether an HTTP status should be retried"""
+        return status_code in self.retry_statuses
+    
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Compute the delay before the next attempt
+        
+        Args:
+            attempt: Number of the failed attempt (starting at 1)
+            retry_after: Value of the Retry-After header, if any
+        
+        Returns:
+            Delay in seconds
+        """
+        if retry_after and self.respect_retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.backoff_max)
+        
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date)
+    
+    Args:
+        value: Header value
+    
+    Returns:
+        Seconds to wait, or None if the value is invalid
+    """
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with percentile lookup"""
+    
+    def __init__(self, window: int = 100):
+        """Initialize latency tracker
+        
+        Args:
+            window: Number of most recent samples kept
+        """
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float) -> None:
+        """Record one latency sample"""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, fraction: float, min_samples: int = 20) -> Optional[float]:
+        """Get a latency percentile
+        
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.95
+            min_samples: Samples required before a value is reported
+        
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+
+
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """Shared executor for hedged requests, created on first use"""
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="drgpt-hedge")
+        return _hedge_executor
+
+
+def hedged_call(call: Callable[[], Any], hedge_after: float,
+                discard: Callable[[Any], None]) -> Any:
+    """Run call, starting a duplicate if it is slower than hedge_after
+    
+    Whichever attempt succeeds first wins; the other one's result is passed
+    to discard (e.g. to close its response) once it arrives. If the first
+    finished attempt fails, the other one is still awaited.
+    
+    Args:
+        call: Function performing the request
+        hedge_after: Seconds to wait before firing the duplicate
+        discard: Cleanup for the losing result
+    
+    Returns:
+        Result of the winning attempt
+    
+    Raises:
+        Exception: The last error if every attempt fails
+    """
+    executor = _get_hedge_executor()
+    pending = {executor.submit(call)}
+    done, pending = wait(pending, timeout=hedge_after)
+    if not done:
+        pending.add(executor.submit(call))
+    
+    error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.add_done_callback(lambda f: _discard_result(f, discard))
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def _discard_result(future: Future, discard: Callable[[Any], None]) -> None:
+    """Clean up the result of a losing hedged attempt"""
+    if future.exception() is None:
+        try:
+            discard(future.result())
+        except Exception:
+            pass
@@ -0,0 +1,357 @@
+"""
+Multi-provider routing for DrGPT
+
+Spreads requests over a pool of (provider, model) targets. Each target
+keeps rolling time-to-first-token and error rate statistics; requests go
+to the best healthy target and fail over to the next one when a target
+errors before its first token. Failed targets cool down with exponential
+backoff before they are tried again.
+
+Targets are written as ``provider:model`` with an optional ``@weight``,
+separated by commas, e.g. ``openai:gpt-4o-mini@3,anthropic:claude-3-5-haiku-20241022``.
+"""
+
+import random
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, List, NamedTuple, Optional
+
+from .events import CompletionEvent, ErrorEvent, Finish, Notice, TextDelta
+
+
+# Pseudo provider name selecting the router
+ROUTER_PROVIDER = "auto"
+
+STRATEGIES = ("latency", "ordered", "weighted")
+
+# Weight of the newest sample in the rolling averages
+EWMA_ALPHA = 0.3
+
+# Upper bound for a target's cooldown after repeated failures
+MAX_COOLDOWN = 300.0
+
+
+class RouteTarget(NamedTuple):
+    """One (provider, model) destination of the router"""
+    provider: str
+    model: str
+    weight: float = 1.0
+    
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+def parse_targets(spec: str) -> List[RouteTarget]:
+    """Parse a comma-separated ``provider:model[@weight]`` list
+    
+    Args:
+        spec: Target list, e.g. from ROUTE_TARGETS
+    
+    Returns:
+        Targets in the given order
+    
+    Raises:
+        ValueError: If an entry has no model or an invalid weight
+    """
+    targets = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        provider, _, model = entry.partition(":")
+        weight = 1.0
+        if "@" in model:
+            model, _, weight_text = model.rpartition("@")
+            try:
+                weight = float(weight_text)
+            except ValueError:
+                raise ValueError(f"Invalid weight in route target: {entry}") from None
+        if not provider or not model or weight <= 0:
+            raise ValueError(f"Invalid route target (expected provider:model[@weight]): {entry}")
+        targets.append(RouteTarget(provider.strip(), model.strip(), weight))
+    return targets
+
+
+class TargetStats:
+    """Rolling latency and error statistics of one target"""
+    
+    def __init__(self, cooldown: float):
+        """Initialize target statistics
+        
+        Args:
+            cooldown: Seconds a target is skipped after its first failure
+        """
+        self.cooldown = cooldown
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+        self._lock = threading.Lock()
+    
+    def record_success(self, latency: float) -> None:
+        """Record a request that produced its first token after latency seconds"""
+        with self._lock:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += EWMA_ALPHA * (latency - self.latency)
+            self.error_rate *= 1 - EWMA_ALPHA
+            self.failures = 0
+            self.retry_at = 0.0
+    
+    def record_failure(self) -> None:
+        """Record a failed request and start or extend the cooldown"""
+        with self._lock:
+            self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+            self.failures += 1
+            delay = min(MAX_COOLDOWN, self.cooldown * 2 ** (self.failures - 1))
+            self.retry_at = time.monotonic() + delay
+    
+    def healthy(self, now: Optional[float] = None) -> bool:
+        """Whether the target is outside its cooldown"""
+        return (now if now is not None else time.monotonic()) >= self.retry_at
+    
+    def score(self) -> float:
+        """Expected time to first token, penalized by the error rate
+        
+        Targets without samples score 0 so they are tried early.
+        """
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1 + 4 * self.error_rate)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values as a dictionary"""
+        with self._lock:
+            return {
+                "latency": self.latency,
+                "error_rate": self.error_rate,
+                "failures": self.failures,
+                "healthy": self.healthy(),
+            }
+
+
+class Router:
+    """Route completions over a pool of targets with failover"""
+    
+    def __init__(
+        self,
+        ai,
+        targets: List[RouteTarget],
+        strategy: str = "latency",
+        cooldown: float = 30.0,
+        explore: float = 0.05
+    ):
+        """Initialize router
+        
+        Args:
+            ai: AIInterface preparing and sending the requests
+            targets: Targets in preference order
+            strategy: ``latency`` (fastest healthy target), ``ordered``
+                (first healthy target) or ``weighted`` (random by weight)
+            cooldown: Seconds a failed target is skipped, doubled for each
+                further consecutive failure
+            explore: Chance of trying a random healthy target first with
+                the latency strategy, so slower targets' statistics stay fresh
+        
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy} (choose from {', '.join(STRATEGIES)})")
+        self.ai = ai
+        self.targets = list(targets)
+        self.strategy = strategy
+        self.explore = explore
+        self.stats = {target: TargetStats(cooldown) for target in self.targets}
+    
+    @classmethod
+    def from_config(cls, ai, config, spec: Optional[str] = None) -> "Router":
+        """Build a router from DrGPT configuration
+        
+        Args:
+            ai: AIInterface sending the requests
+            config: Config instance
+            spec: Target list overriding ROUTE_TARGETS (optional)
+        
+        Returns:
+            Router instance
+        """
+        return cls(
+            ai,
+            parse_targets(spec if spec is not None else str(config.get("ROUTE_TARGETS") or "")),
+            strategy=config.get("ROUTE_STRATEGY") or "latency",
+            cooldown=float(config.get("ROUTE_COOLDOWN", 30)),
+        )
+    
+    def order(self) -> List[RouteTarget]:
+        """Targets in the order they should be tried for the next request
+        
+        Healthy targets come first, arranged by the strategy; targets in
+        their cooldown follow, soonest available first, as a last resort.
+        """
+        now = time.monotonic()
+        healthy = [target for target in self.targets if self.stats[target].healthy(now)]
+        cooling = sorted(
+            (target for target in self.targets if target not in healthy),
+            key=lambda target: self.stats[target].retry_at
+        )
+        
+        if self.strategy == "latency":
+            healthy.sort(key=lambda target: self.stats[target].score())
+            if len(healthy) > 1 and random.random() < self.explore:
+                healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        elif self.strategy == "weighted":
+            # Weighted sampling without replacement (Efraimidis-Spirakis)
+            healthy.sort(key=lambda target: random.random() ** (1 / target.weight), reverse=True)
+        
+        return healthy + cooling
+    
+    def stream_events(
+        self,
+        prompt: Optional[str] = None,
+        role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        **kwargs
+    ) -> Generator[CompletionEvent, None, None]:
+        """Stream a completion from the best available target
+        
+        Events of each attempt are held back until its first token, so a
+        target failing before that is replaced without any output. Errors
+        after the first token are passed through.
+        
+        Args:
+            prompt: User prompt (ignored when messages are given)
+            role: System role (optional)
+            messages: Full conversation to send (optional)
+            **kwargs: Additional parameters, see AIInterface.stream_events
+        
+        Yields:
+            Completion events, with a Notice for every failover
+        """
+        failed = []
+        for target in self.order():
+            request = self._prepare(target, prompt, role, messages, kwargs, failed)
+            if request is None:
+                continue
+            stats = self.stats[target]
+            held = [Notice(notice) for notice in request[-1]]
+            started = time.monotonic()
+            first = True
+            events = self.ai._request_events(*request[:-1])
+            try:
+                for event in events:
+                    if not first:
+                        if type(event) is ErrorEvent:
+                            stats.record_failure()
+                        yield event
+                        continue
+                    if type(event) is ErrorEvent:
+                        stats.record_failure()
+                        failed.append((target, event))
+                        break
+                    held.append(event)
+                    if type(event) is TextDelta or type(event) is Finish:
+                        first = False
+                        stats.record_success(time.monotonic() - started)
+                        yield from held
+                else:
+                    if first:
+                        # Ended without text, finish or error
+                        stats.record_success(time.monotonic() - started)
+                        yield from held
+                    return
+            finally:
+                events.close()
+            if not first:
+                return
+            yield self._failover_notice(target, event)
+        
+        yield self._final_error(failed)
+    
+    async def astream_events(
+        self,
+        prompt: Optional[str] = None,
+        role: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        executor=None,
+        **kwargs
+    ) -> AsyncGenerator[CompletionEvent, None]:
+        """Asynchronous variant of stream_events
+        
+        Args:
+            prompt: User prompt (ignored when messages are given)
+            role: System role (optional)
+            messages: Full conversation to send (optional)
+            executor: Executor running blocking provider reads (optional)
+            **kwargs: Additional parameters, see AIInterface.stream_events
+        
+        Yields:
+            Completion events, with a Notice for every failover
+        """
+        failed = []
+        for target in self.order():
+            request = self._prepare(target, prompt, role, messages, kwargs, failed)
+            if request is None:
+                continue
+            stats = self.stats[target]
+            held = [Notice(notice) for notice in request[-1]]
+            started = time.monotonic()
+            first = True
+            events = self.ai._arequest_events(*request[:-1], executor=executor)
+            try:
+                async for event in events:
+                    if not first:
+                        if type(event) is ErrorEvent:
+                            stats.record_failure()
+                        yield event
+                        continue
+                    if type(event) is ErrorEvent:
+                        stats.record_failure()
+                        failed.append((target, event))
+                        break
+                    held.append(event)
+                    if type(event) is TextDelta or type(event) is Finish:
+                        first = False
+                        stats.record_success(time.monotonic() - started)
+                        for held_event in held:
+                            yield held_event
+                else:
+                    if first:
+                        stats.record_success(time.monotonic() - started)
+                        for held_event in held:
+                            yield held_event
+                    return
+            finally:
+                await events.aclose()
+            if not first:
+                return
+            yield self._failover_notice(target, event)
+        
+        yield self._final_error(failed)
+    
+    def _prepare(self, target: RouteTarget, prompt, role, messages, kwargs, failed):
+        """Prepare the request for one target
+        
+        Returns:
+            The AIInterface._prepare_request tuple, or None (recorded in
+            failed) if the target's provider is not configured
+        """
+        request = self.ai._prepare_request(prompt, target.provider, target.model, role, messages, dict(kwargs))
+        if target.provider not in self.ai.providers:
+            failed.append((target, ErrorEvent("provider is not configured (missing API key or base URL)")))
+            return None
+        return request
+    
+    @staticmethod
+    def _failover_notice(target: RouteTarget, error: ErrorEvent) -> Notice:
+        """Notice reporting a failed attempt"""
+        return Notice(f"{target} failed before responding ({error}), trying the next route")
+    
+    def _final_error(self, failed) -> ErrorEvent:
+        """Error reported when no target produced a response"""
+        if not self.targets:
+            return ErrorEvent("No route targets configured (set ROUTE_TARGETS or pass --route)")
+        details = "; ".join(f"{target}: {error.message}" for target, error in failed)
+        kind = failed[-1][1].kind if failed else "error"
+        return ErrorEvent(f"All route targets failed ({details})", kind)
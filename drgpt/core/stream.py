@@ -0,0 +1,242 @@
+"""
+Cancellable completion streams for DrGPT
+
+A CompletionStream wraps a completion's event stream in a handle that
+can be cancelled from any thread and enforces an optional total deadline
+and an idle timeout between tokens. The provider registers its open
+response with the stream being read, so cancelling shuts the connection
+down even while a read is blocked; the response is always closed, and a
+connection whose body was not read to the end is discarded instead of
+being returned to the pool.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Generator, Iterable, Iterator, Optional, Union
+
+from .events import CompletionEvent, ErrorEvent, TextDelta, iter_text
+
+
+# Stream whose events are being produced, so the provider can register its
+# response without extra parameters
+current_stream: ContextVar[Optional["CompletionStream"]] = ContextVar("drgpt_stream", default=None)
+
+
+class CompletionStream:
+    """Handle on a streaming completion
+    
+    Iterating yields the completion's events, or its text chunks when
+    created with ``text=True``. After cancel() iteration ends without
+    further events; an expired deadline or idle timeout ends it with an
+    ErrorEvent of kind ``"timeout"``.
+    """
+    
+    def __init__(
+        self,
+        events: Iterable[CompletionEvent],
+        deadline: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        text: bool = False
+    ):
+        """Initialize completion stream
+        
+        Args:
+            events: Completion events
+            deadline: Seconds the whole completion may take (optional)
+            idle_timeout: Seconds to wait for the next token, counted from
+                the start for the first one (optional)
+            text: Yield text chunks, with errors in-band, instead of events
+        """
+        self.deadline = deadline or None
+        self.idle_timeout = idle_timeout or None
+        self.timeout_message: Optional[str] = None
+        self._events = iter(events)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._cancelled = False
+        self._closing = False
+        self._busy = False
+        self._response = None
+        self._last_token = 0.0
+        self._run_events = self._run()
+        self._iterator = iter_text(self._run_events) if text else self._run_events
+    
+    @classmethod
+    def from_config(
+        cls,
+        events: Iterable[CompletionEvent],
+        config,
+        deadline: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        text: bool = False
+    ) -> "CompletionStream":
+        """Create a stream with limits defaulting to DrGPT configuration
+        
+        Args:
+            events: Completion events
+            config: Config instance
+            deadline: Overrides STREAM_DEADLINE (optional)
+            idle_timeout: Overrides STREAM_IDLE_TIMEOUT (optional)
+            text: Yield text chunks instead of events
+        
+        Returns:
+            CompletionStream instance
+        """
+        if deadline is None:
+            deadline = config.get("STREAM_DEADLINE", 0)
+        if idle_timeout is None:
+            idle_timeout = config.get("STREAM_IDLE_TIMEOUT", 0)
+        return cls(events, deadline, idle_timeout, text)
+    
+    @property
+    def cancelled(self) -> bool:
+        """True once the stream was cancelled or timed out"""
+        return self._cancelled
+    
+    def __iter__(self) -> Iterator[Union[CompletionEvent, str]]:
+        return self
+    
+    def __next__(self) -> Union[CompletionEvent, str]:
+        with self._lock:
+            if self._closing:
+                raise StopIteration
+            self._busy = True
+        try:
+            return next(self._iterator)
+        finally:
+            with self._lock:
+                self._busy = False
+                closing = self._closing
+            if closing:
+                self._close_iterators()
+    
+    def __enter__(self) -> "CompletionStream":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def cancel(self) -> None:
+        """Stop the completion and tear down its connection
+        
+        Safe to call from any thread, also while another thread is
+        blocked reading the response.
+        """
+        self._abort()
+    
+    def close(self) -> None:
+        """Cancel the completion unless it finished, and close its response
+        
+        When another thread is reading the stream, that thread closes it
+        as soon as its read returns.
+        """
+        with self._lock:
+            self._closing = True
+            busy = self._busy
+        if busy:
+            self.cancel()
+        else:
+            self._close_iterators()
+    
+    def attach(self, response) -> None:
+        """Register the open response, aborting it if already cancelled"""
+        with self._lock:
+            self._response = response
+            cancelled = self._cancelled
+        if cancelled:
+            from .transport import abort_response
+            
+            abort_response(response)
+    
+    def detach(self) -> None:
+        """Forget the response before it is closed"""
+        with self._lock:
+            self._response = None
+    
+    def _abort(self, timeout_message: Optional[str] = None) -> None:
+        """Mark the stream cancelled and shut its response down"""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            self.timeout_message = timeout_message
+            response = self._response
+        self._stop.set()
+        if response is not None:
+            from .transport import abort_response
+            
+            abort_response(response)
+    
+    def _close_iterators(self) -> None:
+        """Close the adapter and event generators, releasing the response"""
+        self._iterator.close()
+        self._run_events.close()
+    
+    def _run(self) -> Generator[CompletionEvent, None, None]:
+        """Pass events through until they end or the stream is cancelled"""
+        self._last_token = time.monotonic()
+        if self.deadline or self.idle_timeout:
+            threading.Thread(target=self._watch, name="drgpt-stream", daemon=True).start()
+        events = self._events
+        try:
+            while not self._cancelled:
+                # Visible to the provider only while it produces an event
+                token = current_stream.set(self)
+                try:
+                    event = next(events)
+                except StopIteration:
+                    return
+                finally:
+                    current_stream.reset(token)
+                if self._cancelled:
+                    # Most likely the failed read of the aborted response
+                    break
+                if type(event) is TextDelta:
+                    self._last_token = time.monotonic()
+                yield event
+            if self.timeout_message is not None:
+                yield ErrorEvent(self.timeout_message, "timeout")
+        finally:
+            self._stop.set()
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+    
+    def _watch(self) -> None:
+        """Cancel the stream once its deadline or idle timeout expires"""
+        start = time.monotonic()
+        while True:
+            now = time.monotonic()
+            waits = []
+            if self.deadline:
+                remaining = start + self.deadline - now
+                if remaining <= 0:
+                    return self._abort(f"Completion exceeded its {self.deadline:g}s deadline")
+                waits.append(remaining)
+            if self.idle_timeout:
+                remaining = self._last_token + self.idle_timeout - now
+                if remaining <= 0:
+                    return self._abort(f"No tokens received for {self.idle_timeout:g}s")
+                waits.append(remaining)
+            if self._stop.wait(min(waits)):
+                return
+
+
+@contextmanager
+def attached(response) -> Generator[None, None, None]:
+    """Register a provider response with the stream being read, if any
+    
+    Args:
+        response: Streaming requests response
+    """
+    stream = current_stream.get()
+    if stream is None:
+        yield
+        return
+    stream.attach(response)
+    try:
+        yield
+    finally:
+        stream.detach()
@@ -0,0 +1,271 @@
+"""
+Token counting and context windows for DrGPT
+
+Counts tokens with ``tiktoken`` when it is installed (``pip install
+drgpt[tokens]``) and with a fast character-based estimate otherwise.
+Message counts are cached by content, so a long chat history is only
+tokenized once rather than on every turn. ``fit_messages`` uses the
+per-model context windows in ``SUPPORTED_PROVIDERS`` to trim history
+and clamp ``max_tokens`` before a request is sent.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+from .config import SUPPORTED_PROVIDERS
+
+
+# Tokens added per message by the chat format, and for priming the reply
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+# Completion tokens kept free when trimming history
+MIN_COMPLETION_TOKENS = 256
+
+# Cached message counts per tokenizer
+MESSAGE_CACHE_SIZE = 4096
+
+
+class HeuristicTokenizer:
+    """Dependency-free estimate of roughly four characters per token"""
+    
+    name = "heuristic"
+    
+    def count(self, text: str) -> int:
+        """Estimate the number of tokens in text
+        
+        Args:
+            text: Text to count
+        
+        Returns:
+            Estimated token count
+        """
+        return (len(text) + 3) // 4
+
+
+class TiktokenTokenizer:
+    """Exact counts for OpenAI models through tiktoken"""
+    
+    def __init__(self, model: str):
+        """Initialize tiktoken tokenizer
+        
+        Args:
+            model: Model name used to pick the encoding
+        
+        Raises:
+            ImportError: If tiktoken is not installed
+        """
+        import tiktoken
+        
+        try:
+            self._encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Unknown or non-OpenAI model, use the closest modern encoding
+            self._encoding = tiktoken.get_encoding("o200k_base" if "4o" in model else "cl100k_base")
+        self.name = f"tiktoken:{self._encoding.name}"
+    
+    def count(self, text: str) -> int:
+        """Count the tokens in text
+        
+        Args:
+            text: Text to count
+        
+        Returns:
+            Token count
+        """
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=32)
+def get_tokenizer(model: str = ""):
+    """Get the best available tokenizer for a model
+    
+    Args:
+        model: Model name
+    
+    Returns:
+        TiktokenTokenizer if tiktoken is installed, else HeuristicTokenizer
+    """
+    try:
+        return TiktokenTokenizer(model)
+    except ImportError:
+        return HeuristicTokenizer()
+
+
+class TokenCounter:
+    """Counts chat messages, caching the count of each message"""
+    
+    def __init__(self, tokenizer, max_entries: int = MESSAGE_CACHE_SIZE):
+        """Initialize token counter
+        
+        Args:
+            tokenizer: Object with a ``count(text)`` method
+            max_entries: Messages kept in the count cache
+        """
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+    
+    def count_text(self, text: str) -> int:
+        """Count the tokens in plain text"""
+        return self.tokenizer.count(text)
+    
+    def count_message(self, message: Dict) -> int:
+        """Count the tokens of one chat message, including format overhead
+        
+        Args:
+            message: Message dictionary with role and content
+        
+        Returns:
+            Token count
+        """
+        role = message.get("role", "")
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = str(content)
+        
+        key = (role, content)
+        tokens = self._cache.get(key)
+        if tokens is not None:
+            self._cache.move_to_end(key)
+            return tokens
+        
+        tokens = MESSAGE_OVERHEAD + self.tokenizer.count(role) + self.tokenizer.count(content)
+        self._cache[key] = tokens
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return tokens
+    
+    def count_messages(self, messages: List[Dict]) -> int:
+        """Count the tokens of a whole request
+        
+        Args:
+            messages: Chat messages
+        
+        Returns:
+            Token count including reply priming
+        """
+        return sum(self.count_message(message) for message in messages) + REPLY_OVERHEAD
+
+
+@lru_cache(maxsize=32)
+def get_counter(model: str = "") -> TokenCounter:
+    """Get the shared token counter for a model
+    
+    Args:
+        model: Model name
+    
+    Returns:
+        TokenCounter instance, reused across requests
+    """
+    return TokenCounter(get_tokenizer(model))
+
+
+def context_window(provider: str, model: str) -> Optional[int]:
+    """Look up a model's context window in SUPPORTED_PROVIDERS
+    
+    Dated or suffixed model names (``gpt-4o-2024-08-06``) match their
+    longest listed prefix; unlisted models get the provider default.
+    
+    Args:
+        provider: Provider name
+        model: Model name
+    
+    Returns:
+        Context window in tokens, or None if unknown
+    """
+    provider_config = SUPPORTED_PROVIDERS.get(provider)
+    if provider_config is None:
+        return None
+    
+    windows = provider_config.get("context_windows", {})
+    if model in windows:
+        return windows[model]
+    for name in sorted(windows, key=len, reverse=True):
+        if model.startswith(name):
+            return windows[name]
+    return provider_config.get("context_window")
+
+
+class ContextFit(NamedTuple):
+    """Messages and max_tokens adjusted to a context window"""
+    messages: List[Dict]
+    max_tokens: Optional[int]
+    prompt_tokens: int
+    notices: List[str]
+
+
+def fit_messages(
+    messages: List[Dict],
+    provider: str,
+    model: str,
+    max_tokens: Optional[int] = None
+) -> ContextFit:
+    """Fit a request into the model's context window
+    
+    The oldest history messages are dropped (system messages and the
+    latest message are always kept) until the prompt leaves room for a
+    reply, and max_tokens is clamped to the space that remains. Turns are
+    dropped whole: an answer whose question was dropped goes with it, so
+    the history never resumes with an assistant message.
+    
+    Args:
+        messages: Chat messages to send
+        provider: Provider name
+        model: Model name
+        max_tokens: Requested completion tokens (optional)
+    
+    Returns:
+        ContextFit with the messages to send, the clamped max_tokens, the
+        prompt size and notices describing any adjustment
+    
+    Raises:
+        ValueError: If a message is not a dictionary
+    """
+    for index, message in enumerate(messages):
+        if not isinstance(message, dict):
+            raise ValueError(
+                f"Message {index} must be a dictionary with role and content, "
+                f"not {type(message).__name__}"
+            )
+    
+    counter = get_counter(model)
+    counts = [counter.count_message(message) for message in messages]
+    prompt_tokens = sum(counts) + REPLY_OVERHEAD
+    
+    window = context_window(provider, model)
+    if window is None:
+        return ContextFit(messages, max_tokens, prompt_tokens, [])
+    
+    notices = []
+    budget = window - min(max_tokens or MIN_COMPLETION_TOKENS, MIN_COMPLETION_TOKENS)
+    if prompt_tokens > budget:
+        keep = [True] * len(messages)
+        dropped = 0
+        for index, message in enumerate(messages[:-1]):
+            if message.get("role") == "system":
+                continue
+            if prompt_tokens <= budget and message.get("role") != "assistant":
+                break
+            keep[index] = False
+            prompt_tokens -= counts[index]
+            dropped += 1
+        if dropped:
+            messages = [message for message, kept in zip(messages, keep) if kept]
+            notices.append(
+                f"Dropped {dropped} earlier message{'s' if dropped != 1 else ''} "
+                f"to fit the {window}-token context window of {model}"
+            )
+    
+    if prompt_tokens >= window:
+        notices.append(
+            f"Prompt is about {prompt_tokens} tokens, more than the {window}-token "
+            f"context window of {model}; the request will likely be rejected"
+        )
+    elif max_tokens and prompt_tokens + max_tokens > window:
+        clamped = window - prompt_tokens
+        notices.append(f"Reduced max_tokens from {max_tokens} to {clamped} to fit the context window of {model}")
+        max_tokens = clamped
+    
+    return ContextFit(messages, max_tokens, prompt_tokens, notices)
@@ -0,0 +1,282 @@
+"""
+HTTP transport for DrGPT providers
+
+Builds the ``requests`` sessions used by providers: pooled connections
+with TCP keep-alive, split connect/read timeouts, proxy and CA bundle
+settings from config, and optional HTTP/2 through ``httpx`` (installed
+with ``pip install drgpt[http2]``).
+"""
+
+import io
+import socket
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+
+# Idle seconds before keep-alive probes, probe interval and probe count
+KEEPALIVE_IDLE = 60
+KEEPALIVE_INTERVAL = 15
+KEEPALIVE_COUNT = 4
+
+
+class TransportSettings:
+    """Connection settings shared by all provider sessions"""
+    
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        keepalive: bool = True,
+        http2: bool = False,
+        proxy: str = "",
+        ca_bundle: str = ""
+    ):
+        """Initialize transport settings
+        
+        Args:
+            pool_size: Connections kept per host
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait between bytes of a response
+            keepalive: Enable TCP keep-alive probes on pooled sockets
+            http2: Multiplex requests over HTTP/2 when httpx is installed
+            proxy: Proxy URL for HTTP and HTTPS requests (optional)
+            ca_bundle: Path to a CA bundle used to verify TLS (optional)
+        """
+        self.pool_size = max(1, int(pool_size))
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.keepalive = bool(keepalive)
+        self.http2 = bool(http2)
+        self.proxy = proxy or ""
+        self.ca_bundle = ca_bundle or ""
+    
+    @classmethod
+    def from_config(cls, config) -> "TransportSettings":
+        """Build transport settings from DrGPT configuration
+        
+        Args:
+            config: Config instance
+        
+        Returns:
+            TransportSettings instance
+        """
+        return cls(
+            pool_size=config.get("HTTP_POOL_SIZE", 10),
+            connect_timeout=config.get("CONNECT_TIMEOUT", 10),
+            read_timeout=config.get("REQUEST_TIMEOUT", 60),
+            keepalive=config.get("TCP_KEEPALIVE", True),
+            http2=config.get("HTTP2", False),
+            proxy=config.get("PROXY_URL", ""),
+            ca_bundle=config.get("CA_BUNDLE", ""),
+        )
+    
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout tuple as accepted by requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+
+def keepalive_socket_options() -> list:
+    """Socket options enabling TCP keep-alive where the platform allows"""
+    from urllib3.connection import HTTPConnection
+    
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPALIVE", KEEPALIVE_IDLE),  # macOS spelling of TCP_KEEPIDLE
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", KEEPALIVE_COUNT),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+def create_adapter(settings: TransportSettings, pool_size: Optional[int] = None):
+    """Create a transport adapter for a session
+    
+    Args:
+        settings: Transport settings
+        pool_size: Connections kept per host. If None, uses settings.
+    
+    Returns:
+        requests transport adapter
+    """
+    from requests.adapters import HTTPAdapter
+    
+    size = pool_size or settings.pool_size
+    if settings.http2:
+        try:
+            return HTTP2Adapter(settings, size)
+        except ImportError:
+            # httpx[http2] is optional, fall back to pooled HTTP/1.1
+            pass
+    
+    if not settings.keepalive:
+        return HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    
+    class KeepAliveAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs["socket_options"] = keepalive_socket_options()
+            super().init_poolmanager(*args, **kwargs)
+    
+    return KeepAliveAdapter(pool_connections=size, pool_maxsize=size)
+
+
+def create_session(settings: TransportSettings, pool_size: Optional[int] = None):
+    """Create a provider session from transport settings
+    
+    Args:
+        settings: Transport settings
+        pool_size: Connections kept per host. If None, uses settings.
+    
+    Returns:
+        Configured requests.Session
+    """
+    import requests
+    
+    session = requests.Session()
+    mount_adapter(session, create_adapter(settings, pool_size))
+    if settings.proxy:
+        session.proxies.update({"http": settings.proxy, "https": settings.proxy})
+    if settings.ca_bundle:
+        session.verify = settings.ca_bundle
+    return session
+
+
+def mount_adapter(session, adapter) -> None:
+    """Mount adapter for both HTTP and HTTPS, closing the replaced one"""
+    previous = session.adapters.get("https://")
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if previous is not None and previous is not adapter:
+        previous.close()
+
+
+def pool_size_of(session) -> int:
+    """Connections per host kept by a session's HTTPS adapter"""
+    adapter = session.adapters.get("https://")
+    return getattr(adapter, "_pool_maxsize", 0)
+
+
+def abort_response(response) -> None:
+    """Interrupt a streaming response from any thread
+    
+    Closing a socket does not wake a thread blocked reading from it, so
+    the connection is shut down instead: the reader sees the stream end
+    early, and the response's own close() then discards the connection
+    rather than returning it to the pool. A connection urllib3 has
+    already released (the body was read to the end) is left alone.
+    
+    Args:
+        response: Streaming requests response
+    """
+    connection = getattr(response.raw, "_connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        # HTTP/2 streams share their connection; they stop at the next chunk
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        # Already closed by the peer or the reader
+        pass
+
+
+class _HTTPXStream(io.RawIOBase):
+    """File-like view of an httpx response body for requests.Response.raw"""
+    
+    def __init__(self, response):
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._pending = b""
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> bytes:
+        if not self._pending:
+            self._pending = next(self._chunks, b"")
+        if size is None or size < 0 or size >= len(self._pending):
+            data, self._pending = self._pending, b""
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+    
+    def close(self) -> None:
+        self._response.close()
+        super().close()
+
+
+class HTTP2Adapter:
+    """requests adapter sending requests through an HTTP/2 httpx client
+    
+    Requests to the same host are multiplexed over one connection. Only
+    the subset of the requests API used by providers is supported.
+    """
+    
+    def __init__(self, settings: TransportSettings, pool_size: int):
+        """Initialize HTTP/2 adapter
+        
+        Args:
+            settings: Transport settings
+            pool_size: Maximum connections kept alive
+        
+        Raises:
+            ImportError: If httpx with HTTP/2 support is not installed
+        """
+        import h2  # noqa: F401 - httpx needs it for http2=True
+        import httpx
+        
+        self._httpx = httpx
+        self._pool_maxsize = pool_size
+        self.client = httpx.Client(
+            http2=True,
+            verify=settings.ca_bundle or True,
+            proxy=settings.proxy or None,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+        )
+    
+    def send(self, request, stream: bool = False, timeout: Any = None,
+             verify: Any = True, cert: Any = None, proxies: Optional[Dict] = None):
+        """Send a prepared request (requests adapter interface)"""
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        
+        httpx = self._httpx
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        
+        start = time.perf_counter()
+        try:
+            httpx_request = self.client.build_request(
+                request.method, request.url, headers=dict(request.headers),
+                content=request.body, timeout=timeout,
+            )
+            httpx_response = self.client.send(httpx_request, stream=True)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e), request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request)
+        
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.headers = CaseInsensitiveDict(httpx_response.headers.multi_items())
+        response.raw = _HTTPXStream(httpx_response)
+        response.url = request.url
+        response.request = request
+        response.reason = httpx_response.reason_phrase
+        response.encoding = httpx_response.charset_encoding
+        response.connection = self
+        response.elapsed = timedelta(seconds=time.perf_counter() - start)
+        if not stream:
+            response.content  # noqa: B018 - read the body now, like HTTPAdapter
+        return response
+    
+    def close(self) -> None:
+        """Close the underlying client"""
+        self.client.close()
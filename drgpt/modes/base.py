@@ -5,6 +5,7 @@ Provides the foundation for all operational modes.
 """
 
 from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
 
 
 class BaseMode(ABC):
@@ -41,6 +42,21 @@ class BaseMode(ABC):
         """
         pass
     
+    def get_messages(self, prompt: str) -> Optional[List[Dict]]:
+        """Get the full conversation to send for a processed prompt
+        
+        Args:
+            prompt: The processed prompt
+            
+        Returns:
+            Message list, or None to send the prompt on its own
+        """
+        return None
+    
+    def close(self) -> None:
+        """Release resources held by the mode"""
+        pass
+    
     def get_mode_name(self) -> str:
         """Get the name of this mode
         
@@ -4,7 +4,11 @@ Chat mode for DrGPT
 Handles chat session functionality.
 """
 
+from pathlib import Path
+from typing import Dict, List, Optional
+
 from .base import BaseMode
+from ..core.chat_history import ChatHistoryStore
 
 
 class ChatMode(BaseMode):
@@ -19,6 +23,12 @@ class ChatMode(BaseMode):
         """
         super().__init__(manager)
         self.session_id = session_id or "default"
+        self.history = ChatHistoryStore(
+            Path(manager.config.get("CHAT_CACHE_PATH")),
+            self.session_id,
+            max_length=manager.config.get("CHAT_CACHE_LENGTH", 100)
+        )
+        self._pending_prompt: Optional[str] = None
     
     def process_prompt(self, prompt: str, **kwargs) -> str:
         """Process prompt for chat mode
@@ -28,17 +38,40 @@ class ChatMode(BaseMode):
             **kwargs: Additional arguments
             
         Returns:
-            Prompt with chat context
+            Unmodified prompt (context is supplied through get_messages)
         """
-        # TODO: Implement chat session context handling
+        self._pending_prompt = prompt
         return prompt
     
+    def get_messages(self, prompt: str) -> Optional[List[Dict]]:
+        """Get session history followed by the new prompt
+        
+        Args:
+            prompt: The processed prompt
+            
+        Returns:
+            Message list including previous turns of the session
+        """
+        messages = self.history.load()
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
     def handle_response(self, response: str, **kwargs) -> None:
-        """Handle chat mode response
+        """Record the completed turn in the session history
         
         Args:
             response: The AI response
             **kwargs: Additional arguments
         """
-        # TODO: Implement chat session history management
-        pass
+        if self._pending_prompt is None or not response.strip():
+            return
+        
+        self.history.append("user", self._pending_prompt)
+        self.history.append("assistant", response)
+        # Hand the turn to the OS; fsyncs stay batched until close()
+        self.history.flush(sync=False)
+        self._pending_prompt = None
+    
+    def close(self) -> None:
+        """Sync and close the session history"""
+        self.history.close()
@@ -0,0 +1,10 @@
+"""
+DrGPT Server Package
+
+Long-running processes that keep DrGPT warm between requests.
+"""
+
+from .api import OpenAICompatServer, run_server
+from .daemon import DrGPTDaemon, run_daemon
+
+__all__ = ['OpenAICompatServer', 'run_server', 'DrGPTDaemon', 'run_daemon']
@@ -0,0 +1,425 @@
+"""
+OpenAI-compatible HTTP server for DrGPT
+
+Keeps one DrGPTManager (providers, connection pools, caches) warm and
+serves ``/v1/chat/completions`` (streaming and non-streaming) and
+``/v1/models`` over HTTP/1.1 with keep-alive, using asyncio streams so
+many clients can be served concurrently.
+"""
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..core.events import CompletionResult, ErrorEvent, Finish, Notice, TextDelta, Usage
+from ..core.metrics import metrics
+from ..core.router import ROUTER_PROVIDER
+
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 8 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+}
+
+# Request fields forwarded to the provider as generation parameters
+GENERATION_PARAMS = ("temperature", "max_tokens", "top_p")
+
+
+class HTTPError(Exception):
+    """Error answered with an OpenAI-style JSON error body"""
+    
+    def __init__(self, status: int, message: str, error_type: str = "invalid_request_error"):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+def split_model(model: Optional[str], providers) -> Tuple[Optional[str], Optional[str]]:
+    """Split a ``provider/model`` name into its parts
+    
+    The model name ``auto`` selects the router.
+    
+    Args:
+        model: Requested model, optionally prefixed with a provider name
+        providers: Known provider names
+    
+    Returns:
+        Tuple of (provider or None, model or None)
+    """
+    if model == ROUTER_PROVIDER:
+        return ROUTER_PROVIDER, None
+    if model and "/" in model:
+        provider, _, name = model.partition("/")
+        if provider in providers:
+            return provider, name or None
+    return None, model or None
+
+
+class OpenAICompatServer:
+    """Serve DrGPTManager through the OpenAI chat completions API"""
+    
+    def __init__(self, manager, host: str = "127.0.0.1", port: int = 8080,
+                 workers: Optional[int] = None, log: Optional[Callable[[str], None]] = None):
+        """Initialize server
+        
+        Args:
+            manager: DrGPTManager instance kept warm for all requests
+            host: Interface to bind (localhost by default)
+            port: Port to bind (0 picks a free port)
+            workers: Maximum concurrent provider requests.
+                If None, uses MAX_CONCURRENCY from config.
+            log: Callback receiving one access log line per request.
+                If None, lines are written to stderr.
+        """
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.workers = max(1, int(workers or manager.config.get("MAX_CONCURRENCY", 8)))
+        self.log = log or (lambda line: print(line, file=sys.stderr, flush=True))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="drgpt-serve")
+        self._sized_providers = set()
+        self._connections = set()
+        self._server = None
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) the server is listening on"""
+        if self._server is None:
+            return self.host, self.port
+        return self._server.sockets[0].getsockname()[:2]
+    
+    async def start(self) -> None:
+        """Start listening"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+    
+    async def serve_forever(self) -> None:
+        """Start listening (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+    
+    async def close(self) -> None:
+        """Stop listening, drop open connections and release the worker threads"""
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve keep-alive requests on one connection"""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                start = time.perf_counter()
+                status = await self._dispatch(method, path, body, writer)
+                self.log(f"{method} {path} {status} {(time.perf_counter() - start) * 1000:.1f}ms")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+    
+    async def _read_request(self, reader, writer) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Read one request, or return None when the client is done"""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            await self._send_error(writer, HTTPError(400, "Malformed request line"))
+            return None
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_SIZE:
+            await self._send_error(writer, HTTPError(413, "Request body too large"))
+            return None
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+    
+    async def _dispatch(self, method: str, path: str, body: bytes, writer) -> int:
+        """Route a request and write its response
+        
+        Returns:
+            HTTP status code sent
+        """
+        try:
+            if path in ("/health", "/v1/health"):
+                return await self._send_json(writer, 200, {"status": "ok"})
+            if path == "/metrics":
+                return await self._send_text(writer, 200, metrics.render_prometheus())
+            if path == "/v1/models":
+                if method != "GET":
+                    raise HTTPError(405, "Use GET for /v1/models")
+                # Listing may fetch every provider's models, so keep it off the event loop
+                models = await asyncio.get_running_loop().run_in_executor(self._executor, self._models)
+                return await self._send_json(writer, 200, models)
+            if path == "/v1/chat/completions":
+                if method != "POST":
+                    raise HTTPError(405, "Use POST for /v1/chat/completions")
+                return await self._chat_completions(body, writer)
+            raise HTTPError(404, f"Unknown path {path}")
+        except HTTPError as e:
+            return await self._send_error(writer, e)
+        except (ValueError, TypeError) as e:
+            return await self._send_error(writer, HTTPError(400, str(e)))
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # Answer instead of dropping the connection without a response
+            self.log(f"{method} {path} failed: {e!r}")
+            return await self._send_error(writer, HTTPError(500, "Internal server error", "server_error"))
+    
+    def _models(self) -> Dict[str, Any]:
+        """Models response listing every provider's models"""
+        data = []
+        for provider, models in self.manager.list_providers().items():
+            for model in models:
+                data.append({"id": f"{provider.lower()}/{model}", "object": "model", "owned_by": provider.lower()})
+        return {"object": "list", "data": data}
+    
+    def _parse_chat_request(self, body: bytes) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Validate a chat completions request
+        
+        Returns:
+            Tuple of (request, DrGPTManager.aquery_events arguments)
+        """
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        
+        messages = request.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise HTTPError(400, "'messages' must be a non-empty list")
+        for index, message in enumerate(messages):
+            if not (isinstance(message, dict) and isinstance(message.get("role"), str)
+                    and isinstance(message.get("content"), str)):
+                raise HTTPError(400, f"'messages[{index}]' must be an object with string 'role' and 'content'")
+        
+        provider, model = split_model(request.get("model"), self.manager.ai.provider_names())
+        query = {
+            "messages": messages,
+            "provider": request.get("provider") or provider,
+            "model": model,
+            "mode": request.get("mode", "default"),
+        }
+        query.update({key: request[key] for key in GENERATION_PARAMS if request.get(key) is not None})
+        return request, query
+    
+    async def _chat_completions(self, body: bytes, writer) -> int:
+        """Handle POST /v1/chat/completions"""
+        request, query = self._parse_chat_request(body)
+        
+        provider = query["provider"] or self.manager.config.get("DEFAULT_PROVIDER")
+        if provider not in self._sized_providers:
+            self._sized_providers.add(provider)
+            # Creating a provider reads its config (and may prompt for a key),
+            # so keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: self.manager.ai.get_provider(provider).resize_pool(self.workers)
+            )
+        
+        response_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = query["model"] or self.manager.config.get("DEFAULT_MODEL")
+        events = self.manager.aquery_events(executor=self._executor, **query)
+        try:
+            if request.get("stream"):
+                include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+                return await self._stream_response(events, writer, response_id, model, include_usage)
+            
+            result = CompletionResult()
+            async for event in events:
+                result.add(event)
+        finally:
+            # Stops the provider stream if the client went away
+            await events.aclose()
+        
+        if result.error is not None:
+            raise HTTPError(502, str(result.error), "provider_error")
+        return await self._send_json(writer, 200, {
+            "id": response_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": result.text},
+                "finish_reason": result.finish_reason or "stop",
+            }],
+            "usage": _usage_dict(result.usage),
+        })
+    
+    async def _stream_response(self, events, writer, response_id: str, model: str, include_usage: bool) -> int:
+        """Relay completion events as OpenAI-style Server-Sent Events"""
+        created = int(time.time())
+        started = False
+        usage = None
+        
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": response_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+        
+        async def send(data: Any) -> None:
+            payload = data if isinstance(data, bytes) else json.dumps(data, ensure_ascii=False).encode("utf-8")
+            frame = b"data: " + payload + b"\n\n"
+            writer.write(f"{len(frame):x}\r\n".encode("ascii") + frame + b"\r\n")
+            await writer.drain()
+        
+        try:
+            async for event in events:
+                if type(event) is Notice:
+                    # No place for advisories in the OpenAI stream format
+                    continue
+                if type(event) is ErrorEvent:
+                    if not started:
+                        # Nothing sent yet, so report a proper HTTP error
+                        raise HTTPError(502, str(event), "provider_error")
+                    await send({"error": {"message": str(event), "type": "provider_error"}})
+                    break
+                
+                if not started:
+                    started = True
+                    self._write_head(writer, 200, {
+                        "Content-Type": "text/event-stream",
+                        "Cache-Control": "no-cache",
+                        "Transfer-Encoding": "chunked",
+                    })
+                    await send(chunk({"role": "assistant", "content": ""}))
+                
+                if type(event) is TextDelta:
+                    await send(chunk({"content": event.text}))
+                elif type(event) is Usage:
+                    usage = event
+                elif type(event) is Finish:
+                    await send(chunk({}, event.reason))
+        except (HTTPError, ConnectionError):
+            raise
+        except Exception as e:
+            if not started:
+                raise
+            # The status line is already sent, so report the failure in-stream
+            self.log(f"Stream failed: {e!r}")
+            await send({"error": {"message": "Internal server error", "type": "server_error"}})
+        
+        if include_usage:
+            data = chunk({})
+            data["choices"] = []
+            data["usage"] = _usage_dict(usage)
+            await send(data)
+        await send(b"[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return 200
+    
+    def _write_head(self, writer, status: int, headers: Dict[str, str]) -> None:
+        """Write the status line and headers"""
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    
+    async def _send_json(self, writer, status: int, data: Dict[str, Any]) -> int:
+        """Write a complete JSON response"""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self._write_head(writer, status, {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+        })
+        writer.write(body)
+        await writer.drain()
+        return status
+    
+    async def _send_text(self, writer, status: int, text: str) -> int:
+        """Write a complete plain text (Prometheus exposition format) response"""
+        body = text.encode("utf-8")
+        self._write_head(writer, status, {
+            "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+            "Content-Length": str(len(body)),
+        })
+        writer.write(body)
+        await writer.drain()
+        return status
+    
+    async def _send_error(self, writer, error: HTTPError) -> int:
+        """Write an OpenAI-style error response"""
+        return await self._send_json(writer, error.status, {
+            "error": {"message": str(error), "type": error.error_type}
+        })
+
+
+def _usage_dict(usage: Optional[Usage]) -> Optional[Dict[str, int]]:
+    """OpenAI usage object, or None when the provider reported none"""
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+def run_server(manager, host: str = "127.0.0.1", port: int = 8080,
+               workers: Optional[int] = None, ready: Optional[Callable[[OpenAICompatServer], None]] = None) -> None:
+    """Run the server until interrupted
+    
+    Args:
+        manager: DrGPTManager instance
+        host: Interface to bind
+        port: Port to bind
+        workers: Maximum concurrent provider requests (optional)
+        ready: Called with the server once it is listening (optional)
+    """
+    server = OpenAICompatServer(manager, host, port, workers)
+    # Request metrics for GET /metrics
+    metrics.enable()
+    metrics.configure(manager.config)
+    
+    async def main() -> None:
+        await server.start()
+        if ready is not None:
+            ready(server)
+        await server.serve_forever()
+    
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+"""
+DrGPT daemon client
+
+Tiny client used by the terminal aliases. It only imports the standard
+library and can be run directly (``python -S client.py ...``) so the
+time from Enter to request-sent stays in the tens of milliseconds. If no
+daemon is listening it hands over to the regular ``drgpt`` command.
+
+Usage:
+    client.py [--code | --shell] PROMPT...
+    client.py --metrics
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+
+
+def default_socket_path() -> str:
+    """Path of the daemon's Unix socket
+    
+    ``DRGPT_SOCKET`` overrides the default of ``$XDG_RUNTIME_DIR/drgpt.sock``
+    (or ``drgpt.sock`` in a private per-user directory under the temp
+    directory, see temp_socket_dir).
+    
+    Returns:
+        Socket path
+    """
+    path = os.environ.get("DRGPT_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "drgpt.sock")
+    return os.path.join(temp_socket_dir(), "drgpt.sock")
+
+
+def temp_socket_dir() -> str:
+    """Per-user socket directory used when there is no XDG_RUNTIME_DIR
+    
+    The daemon creates it with mode 0700, so other users can neither
+    reach the socket nor put one in its place.
+    
+    Returns:
+        Directory path
+    """
+    import tempfile
+    
+    return os.path.join(tempfile.gettempdir(), f"drgpt-{os.getuid()}")
+
+
+def check_socket(path: str) -> None:
+    """Refuse a socket path that another user could have planted
+    
+    Prompts and piped input are sent to whoever listens on the socket,
+    and shell mode offers to run the command it answers with, so the
+    socket must be one the current user created.
+    
+    Args:
+        path: Socket path
+    
+    Raises:
+        FileNotFoundError: If nothing exists at path
+        PermissionError: If path is not a socket owned by the current user
+    """
+    info = os.lstat(path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a socket owned by the current user")
+
+
+def connect(path: str = None) -> socket.socket:
+    """Connect to the daemon
+    
+    Args:
+        path: Socket path. If None, uses default_socket_path().
+    
+    Returns:
+        Connected socket
+    
+    Raises:
+        OSError: If no daemon is listening, or the socket is not the
+            current user's (PermissionError)
+    """
+    path = path or default_socket_path()
+    check_socket(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(sock: socket.socket, message: dict, out=None):
+    """Send one request and stream the reply
+    
+    Text is written to out as it arrives, notices go to stderr.
+    
+    Args:
+        sock: Connected socket
+        message: Request message
+        out: Text stream for response text (default: stdout)
+    
+    Returns:
+        Final message of the reply (``done`` or ``error``)
+    """
+    out = out or sys.stdout
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    reader = sock.makefile("rb")
+    for line in reader:
+        reply = json.loads(line)
+        if "text" in reply:
+            out.write(reply["text"])
+            out.flush()
+        elif "notice" in reply:
+            print(f"Warning: {reply['notice']}", file=sys.stderr)
+        else:
+            return reply
+    return {"error": "Daemon closed the connection"}
+
+
+def _fallback(argv) -> None:
+    """Run the full drgpt command instead of talking to the daemon"""
+    os.execv(sys.executable, [sys.executable, "-m", "drgpt", *argv])
+
+
+def _handle_command(sock: socket.socket, reply: dict) -> None:
+    """Offer to execute or describe a generated shell command"""
+    command = reply.get("command")
+    if not command:
+        print("No valid command found in response:", file=sys.stderr)
+        print(reply.get("response", ""), file=sys.stderr)
+        return
+    
+    print(command)
+    if not sys.stdin.isatty():
+        return
+    
+    while True:
+        try:
+            choice = input("\n[E]xecute, [D]escribe, [A]bort (e/d/a): ").lower().strip()
+        except EOFError:
+            return
+        if choice in ("a", "abort"):
+            return
+        if choice in ("e", "execute"):
+            import subprocess
+            
+            subprocess.run(command, shell=True)
+            return
+        if choice in ("d", "describe"):
+            reply = request(sock, {"prompt": f"Explain this shell command in detail: {command}"})
+            print()
+            if "error" in reply:
+                print(f"Error: {reply['error']}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    """Client entry point
+    
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+    
+    Returns:
+        Process exit code
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv == ["--metrics"]:
+        try:
+            with connect() as sock:
+                sys.stdout.write(request(sock, {"metrics": True}).get("metrics", ""))
+        except OSError:
+            print("No daemon is running", file=sys.stderr)
+            return 1
+        return 0
+    
+    mode = "default"
+    if argv and argv[0] in ("--code", "-c", "--shell", "-s"):
+        mode = "code" if argv[0] in ("--code", "-c") else "shell"
+        words = argv[1:]
+    else:
+        words = argv
+    if any(word.startswith("-") for word in words[:1]) or (not words and sys.stdin.isatty()):
+        # Options (or a missing prompt) the daemon does not handle
+        _fallback(argv)
+    
+    try:
+        sock = connect()
+    except OSError:
+        _fallback(argv)
+    
+    message = {"prompt": " ".join(words), "mode": mode}
+    if not sys.stdin.isatty():
+        message["stdin"] = sys.stdin.read()
+    
+    with sock:
+        try:
+            reply = request(sock, message)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user", file=sys.stderr)
+            return 1
+        
+        if "error" in reply:
+            print(f"\nError: {reply['error']}", file=sys.stderr)
+            return 1
+        if mode == "shell":
+            _handle_command(sock, reply)
+        else:
+            print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
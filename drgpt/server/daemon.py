@@ -0,0 +1,210 @@
+"""
+Unix-socket daemon for DrGPT
+
+Keeps the imported modules, configuration and provider sessions of one
+DrGPT process alive so the terminal aliases only have to start the tiny
+client in ``client.py``. The protocol is newline-delimited JSON: the
+client sends ``{"prompt", "mode", "stdin"}`` and receives ``{"text"}``
+messages followed by ``{"done": true, ...}`` or ``{"error"}``. A
+``{"metrics": true}`` request is answered with ``{"metrics": TEXT}`` in
+the Prometheus text format.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from ..core.events import CompletionResult, ErrorEvent, Notice, TextDelta
+from ..core.metrics import metrics
+from ..utils.storage import ensure_private_dir
+from .client import check_socket, default_socket_path, temp_socket_dir
+
+
+class DrGPTDaemon:
+    """Serve queries to the alias client over a Unix domain socket"""
+    
+    def __init__(self, manager, socket_path: Optional[str] = None, workers: Optional[int] = None):
+        """Initialize daemon
+        
+        Args:
+            manager: DrGPTManager instance kept warm for all requests
+            socket_path: Socket to listen on. If None, uses the default.
+            workers: Maximum concurrent provider requests.
+                If None, uses MAX_CONCURRENCY from config.
+        """
+        from ..modes import CodeMode, ShellMode, StandardMode
+        
+        self.manager = manager
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = max(1, int(workers or manager.config.get("MAX_CONCURRENCY", 8)))
+        self.modes = {
+            "default": StandardMode(manager),
+            "code": CodeMode(manager),
+            "shell": ShellMode(manager),
+        }
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="drgpt-daemon")
+        self._connections = set()
+        self._server = None
+    
+    async def start(self) -> None:
+        """Start listening, replacing a stale socket file
+        
+        The per-user temp socket directory is created private to the
+        current user. Anything at the socket path that is not the current
+        user's own socket is left alone.
+        
+        Raises:
+            OSError: If another daemon is already listening
+            PermissionError: If the socket directory or file belongs to
+                another user
+        """
+        directory = os.path.dirname(self.socket_path)
+        if directory == temp_socket_dir():
+            ensure_private_dir(directory)
+        if os.path.lexists(self.socket_path):
+            check_socket(self.socket_path)
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                writer.close()
+                raise OSError(f"A daemon is already listening on {self.socket_path}")
+        
+        # The socket must never be reachable by other users
+        old_umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle_connection, self.socket_path)
+        finally:
+            os.umask(old_umask)
+    
+    async def serve_forever(self) -> None:
+        """Start listening (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self._cleanup()
+    
+    async def close(self) -> None:
+        """Stop listening and remove the socket"""
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        self._cleanup()
+    
+    def _cleanup(self) -> None:
+        self._executor.shutdown(wait=False)
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one client"""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                    if message.get("metrics"):
+                        reply = {"metrics": metrics.render_prometheus()}
+                    else:
+                        reply = await self._query(message, writer)
+                except ValueError as e:
+                    reply = {"error": str(e)}
+                await self._send(writer, reply)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+    
+    async def _query(self, message: Dict[str, Any], writer) -> Dict[str, Any]:
+        """Run one query, streaming its text to the client
+        
+        Returns:
+            Final reply message
+        """
+        # Pick up settings changed by other drgpt commands (one stat call)
+        self.manager.config.refresh()
+        
+        mode_name = message.get("mode") or "default"
+        mode = self.modes.get(mode_name)
+        if mode is None:
+            raise ValueError(f"Unsupported mode: {mode_name}")
+        
+        prompt = message.get("prompt") or ""
+        stdin = (message.get("stdin") or "").strip()
+        if stdin:
+            prompt = f"{prompt}\n\nInput data:\n{stdin}" if prompt else stdin
+        if not prompt:
+            raise ValueError("No prompt provided")
+        
+        # Shell commands are shown once extracted, not while streaming
+        stream_text = mode_name != "shell"
+        result = CompletionResult()
+        events = self.manager.aquery_events(
+            prompt=mode.process_prompt(prompt),
+            mode=mode.get_mode_name(),
+            executor=self._executor,
+        )
+        try:
+            async for event in events:
+                result.add(event)
+                if stream_text and type(event) is TextDelta:
+                    await self._send(writer, {"text": event.text})
+                elif type(event) is Notice:
+                    await self._send(writer, {"notice": event.message})
+                elif type(event) is ErrorEvent:
+                    return {"error": str(event)}
+        finally:
+            # Stops the provider stream if the client went away
+            await events.aclose()
+        
+        reply = {"done": True, "finish_reason": result.finish_reason}
+        if mode_name == "shell":
+            reply["command"] = mode._extract_command(result.text)
+            reply["response"] = result.text
+        return reply
+    
+    @staticmethod
+    async def _send(writer, message: Dict[str, Any]) -> None:
+        writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+
+
+def run_daemon(manager, socket_path: Optional[str] = None, workers: Optional[int] = None) -> None:
+    """Run the daemon until interrupted
+    
+    Args:
+        manager: DrGPTManager instance
+        socket_path: Socket to listen on (optional)
+        workers: Maximum concurrent provider requests (optional)
+    """
+    daemon = DrGPTDaemon(manager, socket_path, workers)
+    metrics.enable()
+    metrics.configure(manager.config)
+    
+    async def main() -> None:
+        await daemon.start()
+        # Remove the socket on "kill" as well as on Ctrl-C
+        task = asyncio.current_task()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        sys.stderr.write(f"DrGPT daemon listening on {daemon.socket_path}\n")
+        try:
+            await daemon.serve_forever()
+        except asyncio.CancelledError:
+            pass
+    
+    asyncio.run(main())
@@ -4,11 +4,27 @@ Console utilities for DrGPT
 Provides centralized console functionality.
 """
 
-from rich.console import Console
-from rich.markdown import Markdown
+from .lazy import LazyObject
 
-# Global console instance
-console = Console()
+
+def _create_console():
+    """Create the rich console (imports rich on first use)"""
+    from rich.console import Console
+    
+    return Console()
+
+
+# Global console instance (rich is only imported when it is first used)
+console = LazyObject(_create_console)
+
+
+def get_console():
+    """Get the global rich console, creating it on first use
+    
+    Returns:
+        Shared rich Console instance
+    """
+    return console._get_instance()
 
 
 def print_markdown(content: str) -> None:
@@ -18,6 +34,8 @@ def print_markdown(content: str) -> None:
         content: Content to print as markdown
     """
     if content.strip():
+        from rich.markdown import Markdown
+        
         markdown = Markdown(content)
         console.print(markdown)
 
@@ -0,0 +1,65 @@
+"""
+Lazy object utilities for DrGPT
+
+Provides a proxy that defers construction of module-level singletons
+until they are first used, keeping package import free of side effects.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+
+class LazyObject:
+    """Proxy that builds the wrapped object on first attribute access"""
+    
+    def __init__(self, factory: Callable[[], Any]):
+        """Initialize lazy proxy
+        
+        Args:
+            factory: Callable that builds the wrapped object
+        """
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+    
+    def _get_instance(self) -> Any:
+        """Return the wrapped object, constructing it if needed
+        
+        Returns:
+            Wrapped object instance
+        """
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+    
+    def _is_initialized(self) -> bool:
+        """Check whether the wrapped object has been constructed
+        
+        Returns:
+            True if the factory has already run
+        """
+        return self._instance is not None
+    
+    def _reset_instance(self, instance: Optional[Any] = None) -> None:
+        """Drop or replace the wrapped object
+        
+        Args:
+            instance: Replacement object. If None, the next access rebuilds it.
+        """
+        object.__setattr__(self, "_instance", instance)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_instance(), name)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._get_instance(), name, value)
+    
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<LazyObject {getattr(self._factory, '__name__', 'factory')} (uninitialized)>"
+        return repr(self._instance)
@@ -0,0 +1,128 @@
+"""
+Streaming Markdown rendering for DrGPT
+
+Renders a response as Markdown while it is still streaming. Completed
+blocks are printed once; only the trailing, still-growing block is
+re-rendered in a live region at a throttled frame rate.
+"""
+
+from .console import get_console
+
+
+class MarkdownStreamRenderer:
+    """Incremental Markdown renderer built on rich.live.Live
+    
+    The response is split at blank lines outside code fences. Everything
+    before the last such boundary is final and printed permanently; the
+    remainder is shown in a transient live region (with an open code fence
+    closed so it renders as code) that is redrawn refresh_per_second times
+    and only re-parsed when it changed, so CPU use stays bounded on very
+    long responses.
+    """
+    
+    def __init__(self, console=None, refresh_per_second: float = 10.0):
+        """Initialize streaming renderer
+        
+        Args:
+            console: Rich console to render to. If None, uses the global one.
+            refresh_per_second: Live region redraws per second
+        """
+        self.console = console or get_console()
+        self.refresh_per_second = refresh_per_second
+        
+        self._pending = ""
+        self._scan_pos = 0
+        self._boundary = 0
+        self._in_fence = False
+        self._rendered = None
+        self._live = None
+        self._finished = False
+    
+    def __enter__(self) -> "MarkdownStreamRenderer":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.finish()
+    
+    def feed(self, chunk: str) -> None:
+        """Add a chunk of the streamed response
+        
+        Args:
+            chunk: Text chunk
+        """
+        if not chunk:
+            return
+        self._pending += chunk
+        self._scan()
+        
+        if self._boundary:
+            block = self._pending[:self._boundary]
+            self._pending = self._pending[self._boundary:]
+            self._scan_pos -= self._boundary
+            self._boundary = 0
+            self._print_block(block)
+        
+        self._refresh()
+    
+    def finish(self) -> None:
+        """Render the final block and stop the live region"""
+        if self._finished:
+            return
+        self._finished = True
+        
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+        self._print_block(self._pending)
+        self._pending = ""
+    
+    def _scan(self) -> None:
+        """Track code fences and block boundaries over newly completed lines"""
+        pending = self._pending
+        pos = self._scan_pos
+        while True:
+            end = pending.find("\n", pos)
+            if end < 0:
+                break
+            line = pending[pos:end].strip()
+            if line.startswith(("```", "~~~")):
+                self._in_fence = not self._in_fence
+            elif not line and not self._in_fence:
+                self._boundary = end + 1
+            pos = end + 1
+        self._scan_pos = pos
+    
+    def _print_block(self, block: str) -> None:
+        """Permanently print a completed block"""
+        if block.strip():
+            from rich.markdown import Markdown
+            
+            self.console.print(Markdown(block))
+    
+    def _refresh(self) -> None:
+        """Start the live region on the first chunk"""
+        if self._live is not None or not self.console.is_terminal:
+            # When piped there is nothing to animate; blocks print as they complete
+            return
+        
+        from rich.live import Live
+        
+        self._live = Live(
+            console=self.console,
+            refresh_per_second=self.refresh_per_second,
+            transient=True,
+            vertical_overflow="visible",
+            get_renderable=self._render_trailing,
+        )
+        # Draw immediately so the first token shows without waiting a frame
+        self._live.start(refresh=True)
+    
+    def _render_trailing(self):
+        """Build the renderable for the trailing block (called per frame)"""
+        text = self._pending
+        in_fence = self._in_fence
+        if self._rendered is None or self._rendered[0] != (text, in_fence):
+            from rich.markdown import Markdown
+            
+            self._rendered = ((text, in_fence), Markdown(text + "\n```" if in_fence else text))
+        return self._rendered[1]
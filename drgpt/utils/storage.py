@@ -0,0 +1,59 @@
+"""
+Private storage utilities for DrGPT
+
+Chat sessions and cached responses hold prompts and answers and live
+under the shared temp directory by default, so their directories and
+files are kept accessible to the current user only.
+"""
+
+import os
+from pathlib import Path
+from typing import BinaryIO, Union
+
+
+# os.open flags per file mode (O_BINARY only exists on Windows)
+_OPEN_FLAGS = {
+    "ab": os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+    "wb": os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+}
+
+
+def ensure_private_dir(path: Union[str, Path]) -> Path:
+    """Create a directory that only the current user can access
+    
+    An existing directory owned by the current user has its group and
+    other permissions removed. One owned by somebody else is refused,
+    since its owner could read or plant files in it.
+    
+    Args:
+        path: Directory path
+    
+    Returns:
+        The directory as a Path
+    
+    Raises:
+        PermissionError: If the directory belongs to another user
+    """
+    path = Path(path)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, "getuid"):
+        stat = path.stat()
+        if stat.st_uid != os.getuid():
+            raise PermissionError(f"{path} is owned by another user")
+        if stat.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+def open_private(path: Union[str, Path], mode: str = "ab") -> BinaryIO:
+    """Open a binary file, creating it readable by the current user only
+    
+    Args:
+        path: File path
+        mode: ``"ab"`` to append or ``"wb"`` to truncate
+    
+    Returns:
+        Open binary file object
+    """
+    fd = os.open(path, _OPEN_FLAGS[mode] | getattr(os, "O_BINARY", 0), 0o600)
+    return os.fdopen(fd, mode)
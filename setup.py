@@ -42,6 +42,11 @@ setup(
     extras_require={
         "openai": ["openai>=1.0.0"],
         "anthropic": ["anthropic>=0.25.0"],
+        "speedups": ["orjson>=3.0.0"],
+        "http2": ["httpx[http2]>=0.26.0"],
+        "tokens": ["tiktoken>=0.5.0"],
+        "otel": ["opentelemetry-api>=1.20.0"],
+        "repl": ["prompt_toolkit>=3.0.0"],
         "all": ["openai>=1.0.0", "anthropic>=0.25.0"],
         "dev": ["pytest>=7.0.0", "black>=22.0.0", "flake8>=5.0.0"],
         "docs": [
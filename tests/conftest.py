@@ -0,0 +1,33 @@
+"""
+Shared fixtures for the DrGPT tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.core.ai_interface import AIInterface  # noqa: E402
+from drgpt.core.config import Config, config  # noqa: E402
+
+
+@pytest.fixture
+def isolated_config(tmp_path):
+    """Global config backed by a file under tmp_path, restored afterwards"""
+    test_config = Config(tmp_path / "config")
+    config._reset_instance(test_config)
+    yield test_config
+    config._reset_instance()
+
+
+@pytest.fixture
+def make_interface(isolated_config):
+    """Factory for AI interfaces that only know the given providers"""
+    def make(**providers):
+        ai = AIInterface()
+        ai.providers.update(providers)
+        return ai
+    return make
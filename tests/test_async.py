@@ -0,0 +1,31 @@
+"""
+Tests for the asynchronous completion API
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+
+
+def test_agather_runs_concurrently_in_order(make_interface):
+    """agather returns responses in input order and overlaps requests"""
+    with MockProviderServer(MockSettings(tokens=3, latency=0.2)) as server:
+        ai = make_interface(openai=OpenAIProvider("key", server.base_url))
+        
+        prompts = [f"prompt {index}" for index in range(8)]
+        start = time.perf_counter()
+        results = asyncio.run(
+            ai.agather(prompts, concurrency=8, provider="openai", model="mock")
+        )
+        elapsed = time.perf_counter() - start
+    
+    assert results == ["tok0 tok1 tok2 "] * 8
+    # Eight serial requests would take at least 1.6 seconds
+    assert elapsed < 1.2
@@ -0,0 +1,117 @@
+"""
+Tests for batch processing
+"""
+
+import asyncio
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.batch import BatchRunner, parse_batch_line, read_batch_items  # noqa: E402
+from drgpt.core.events import ErrorEvent, Finish, TextDelta, Usage  # noqa: E402
+
+
+class FakeProvider:
+    def resize_pool(self, size):
+        pass
+
+
+class FakeAI:
+    def get_provider(self, name=None):
+        return FakeProvider()
+
+
+class FakeManager:
+    """Manager stub answering in reverse order of arrival"""
+    
+    def __init__(self):
+        self.config = {"DEFAULT_PROVIDER": "fake", "DEFAULT_MODEL": "fake-model"}
+        self.ai = FakeAI()
+        self.in_flight = 0
+        self.peak = 0
+    
+    async def aquery_events(self, prompt=None, executor=None, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.05 / (int(prompt) + 1))
+        self.in_flight -= 1
+        if prompt == "9":
+            yield ErrorEvent("rate limited", "network")
+            return
+        yield TextDelta(f"answer {prompt}")
+        yield Usage(3, 2)
+        yield Finish("stop")
+
+
+def test_parse_batch_line():
+    """Plain text, JSON strings and JSON objects are accepted"""
+    assert parse_batch_line("  ") is None
+    assert parse_batch_line("hello") == {"prompt": "hello"}
+    assert parse_batch_line('"hello"') == {"prompt": "hello"}
+    assert parse_batch_line('{"id": 1, "prompt": "hi"}') == {"id": 1, "prompt": "hi"}
+
+
+def test_results_are_written_in_input_order():
+    """Ordered mode writes results by index with per-provider caps"""
+    manager = FakeManager()
+    output = io.StringIO()
+    lines = [json.dumps({"id": f"item-{i}", "prompt": str(i)}) for i in range(10)]
+    
+    summary = BatchRunner(manager, workers=3).run(read_batch_items(lines), output)
+    
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r["id"] for r in records] == [f"item-{i}" for i in range(10)]
+    assert records[4]["response"] == "answer 4"
+    assert (records[4]["prompt_tokens"], records[4]["completion_tokens"]) == (3, 2)
+    assert records[9]["error"] == "Network error: rate limited"
+    assert summary["total"] == 10
+    assert (summary["succeeded"], summary["failed"]) == (9, 1)
+    assert manager.peak == 3
+
+
+def test_completed_order():
+    """Completed mode writes results as soon as they finish"""
+    output = io.StringIO()
+    BatchRunner(FakeManager(), workers=4, ordered=False).run(
+        read_batch_items(["0", "1", "2", "3"]), output
+    )
+    
+    indexes = [json.loads(line)["index"] for line in output.getvalue().splitlines()]
+    assert sorted(indexes) == [0, 1, 2, 3]
+    assert indexes[0] == 3
+
+
+def test_malformed_item_becomes_an_error_record():
+    """A bad item in the middle gets an error record and later items are still written"""
+    output = io.StringIO()
+    lines = ['{"prompt": "0"}', '{"id": "bad", "messages": "oops"}', '{"prompt": "2"}']
+    
+    summary = BatchRunner(FakeManager(), workers=2).run(read_batch_items(lines), output)
+    
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r["index"] for r in records] == [0, 1, 2]
+    assert records[1]["id"] == "bad" and records[1]["error"]
+    assert records[2]["response"] == "answer 2"
+    assert (summary["succeeded"], summary["failed"]) == (2, 1)
+
+
+def test_cancelled_item_gets_a_record():
+    """A cancelled item does not stall ordered output or abort the batch"""
+    class CancellingManager(FakeManager):
+        async def aquery_events(self, prompt=None, executor=None, **kwargs):
+            if prompt == "0":
+                raise asyncio.CancelledError()
+            async for event in super().aquery_events(prompt, executor, **kwargs):
+                yield event
+    
+    output = io.StringIO()
+    summary = BatchRunner(CancellingManager(), workers=2).run(iter([{"prompt": "0"}, {"prompt": "1"}]), output)
+    
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r["index"] for r in records] == [0, 1]
+    assert records[0]["error"] == "Cancelled"
+    assert records[1]["response"] == "answer 1"
+    assert (summary["succeeded"], summary["failed"]) == (1, 1)
@@ -0,0 +1,74 @@
+"""
+Tests for the mock provider server and the benchmark suite
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench import MockProviderServer, MockSettings, compare, run_suite  # noqa: E402
+from drgpt.core.config import config  # noqa: E402
+
+
+def test_injects_errors_and_dropped_streams():
+    """Faults follow the seed, and dropped streams end without a terminator"""
+    settings = MockSettings(tokens=6, error_rate=0.3, drop_rate=0.3, seed=7)
+    outcomes = [settings.fault(sequence) for sequence in range(1, 201)]
+    replay = MockSettings(error_rate=0.3, drop_rate=0.3, seed=7)
+    assert outcomes == [replay.fault(sequence) for sequence in range(1, 201)]
+    assert 40 < outcomes.count("error") < 80 and 40 < outcomes.count("drop") < 80
+    
+    body = {"messages": [{"role": "user", "content": "hi"}], "stream": True}
+    with MockProviderServer(MockSettings(tokens=6, drop_rate=1.0)) as server:
+        response = requests.post(f"{server.base_url}/chat/completions", json=body, stream=True)
+        try:
+            data = b"".join(response.iter_content(None))
+        except requests.exceptions.ChunkedEncodingError:
+            data = b""
+    assert b"[DONE]" not in data
+
+
+def test_suite_reports_json_and_restores_globals():
+    """Stream and batch sections run against the mock and leave no trace"""
+    before = config._instance
+    settings = MockSettings(tokens=5, jitter=0.002, error_rate=0.2, seed=1)
+    results = run_suite(["stream", "batch"], settings, providers=["openai"], runs=3, requests=12, concurrency=4)
+    
+    assert config._instance is before
+    results = json.loads(json.dumps(results))
+    assert results["settings"]["error_rate"] == 0.2
+    stream = results["results"]["stream"]["openai"]
+    assert set(stream) == {"markdown", "plain"}
+    assert stream["plain"]["ttft"]["median_ms"] > 0 and stream["plain"]["tokens_per_s"] > 0
+    batch = results["results"]["batch"]["openai"]
+    assert batch["requests"] == 12 and batch["requests_per_s"] > 0
+    
+    slower = json.loads(json.dumps(results))
+    slower["results"]["stream"]["openai"]["plain"]["ttft"]["median_ms"] *= 2
+    slower["results"]["batch"]["openai"]["requests_per_s"] /= 2
+    assert compare(results, results) == []
+    regressions = compare(results, slower)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("stream.openai.plain.ttft.median_ms")
+
+
+def test_bench_rejects_unknown_sections(capsys):
+    """--bench names the valid sections instead of running anything"""
+    from drgpt.cli.bench import handle_bench
+    
+    args = argparse.Namespace(bench="stream,foo", provider=None, baseline=None, workers=None, output=None)
+    with pytest.raises(SystemExit) as excinfo:
+        handle_bench(args)
+    
+    assert excinfo.value.code == 1
+    output = capsys.readouterr()
+    message = " ".join((output.out + output.err).split())
+    assert "section(s): foo;" in message
+    assert "startup, stream, render, batch" in message
@@ -0,0 +1,111 @@
+"""
+Tests for the response cache
+"""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.cache import ResponseCache  # noqa: E402
+from drgpt.core.events import Finish, TextDelta  # noqa: E402
+
+
+class CountingProvider:
+    """Provider stub that counts how often it is called"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def stream_events(self, messages, model, **kwargs):
+        self.calls += 1
+        yield TextDelta("Hello")
+        yield TextDelta(", world")
+        yield Finish("stop")
+
+
+@pytest.fixture
+def cached_interface(tmp_path, isolated_config, make_interface):
+    isolated_config._config["DEFAULT_PROVIDER"] = "custom"
+    isolated_config._config["CACHE_PATH"] = str(tmp_path / "cache")
+    provider = CountingProvider()
+    return make_interface(fake=provider), provider
+
+
+def test_key_depends_on_request():
+    """Different sampling parameters produce different keys"""
+    messages = [{"role": "user", "content": "hi"}]
+    key = ResponseCache.make_key("openai", "gpt-4o", messages, {"temperature": 0})
+    assert key == ResponseCache.make_key("openai", "gpt-4o", messages, {"temperature": 0})
+    assert key != ResponseCache.make_key("openai", "gpt-4o", messages, {"temperature": 0.5})
+    assert ResponseCache.make_key("custom", "llama", messages, {}, "http://a:8000/v1") != (
+        ResponseCache.make_key("custom", "llama", messages, {}, "http://b:8000/v1")
+    )
+
+
+def test_lru_eviction(tmp_path):
+    """Least recently used entries are evicted beyond max_entries"""
+    cache = ResponseCache(tmp_path, max_entries=2)
+    for index, key in enumerate(("a", "b")):
+        cache.put(key, [key])
+        os.utime(tmp_path / f"{key}.json", (index, index))
+    
+    assert cache.get("a") == ["a"]  # refreshes "a"
+    cache.put("c", ["c"])
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == ["a"]
+    assert cache.get("c") == ["c"]
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_entries_are_private(tmp_path):
+    """The cache directory and entries are only accessible to their owner"""
+    directory = tmp_path / "cache"
+    directory.mkdir(mode=0o755)
+    os.chmod(directory, 0o755)
+    
+    cache = ResponseCache(directory)
+    cache.put("a", ["a"])
+    assert cache.get("a") == ["a"]
+    
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+    assert stat.S_IMODE((directory / "a.json").stat().st_mode) == 0o600
+    assert stat.S_IMODE((directory / ResponseCache.STATS_FILE).stat().st_mode) == 0o600
+
+
+def test_foreign_directory_is_not_used(tmp_path, monkeypatch):
+    """A cache directory owned by another user is neither read nor written"""
+    ResponseCache(tmp_path).put("a", ["a"])
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(tmp_path).st_uid + 1)
+    
+    cache = ResponseCache(tmp_path)
+    assert cache.get("a") is None
+    cache.put("b", ["b"])
+    assert not (tmp_path / "b.json").exists()
+
+
+def test_interface_replays_cached_chunks(cached_interface):
+    """Deterministic requests are answered from the cache"""
+    ai, provider = cached_interface
+    first = list(ai.generate_completion("hi", provider="fake", temperature=0))
+    second = list(ai.generate_completion("hi", provider="fake", temperature=0))
+    
+    assert first == second == ["Hello", ", world"]
+    assert provider.calls == 1
+
+
+def test_interface_bypasses_cache_for_sampling(cached_interface):
+    """Requests with temperature above 0 skip the cache unless forced"""
+    ai, provider = cached_interface
+    list(ai.generate_completion("hi", provider="fake", temperature=0.7))
+    list(ai.generate_completion("hi", provider="fake", temperature=0.7))
+    assert provider.calls == 2
+    
+    list(ai.generate_completion("hi", provider="fake", temperature=0.7, use_cache=True))
+    list(ai.generate_completion("hi", provider="fake", temperature=0.7, use_cache=True))
+    assert provider.calls == 3
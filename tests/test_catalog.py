@@ -0,0 +1,64 @@
+"""
+Tests for the cached model catalog
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MODELS_ETAG, MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import CustomProvider, OpenAIProvider  # noqa: E402
+from drgpt.core.catalog import ModelCatalog  # noqa: E402
+from drgpt.core.config import SUPPORTED_PROVIDERS  # noqa: E402
+
+
+def test_cached_revalidated_and_offline(tmp_path, isolated_config):
+    """Fresh lists need no request, stale ones revalidate, offline keeps the cache"""
+    settings = MockSettings()
+    with MockProviderServer(settings) as server:
+        provider = CustomProvider("", server.base_url)
+        catalog = ModelCatalog(tmp_path / "models", ttl=3600)
+        
+        assert catalog.get("custom", lambda: provider) == ["mock-model"]
+        assert catalog.get("custom", lambda: None) == ["mock-model"]
+        assert settings.requests == 1
+        
+        stale = ModelCatalog(tmp_path / "models", ttl=0)
+        assert stale.get("custom", lambda: provider) == ["mock-model"]
+        assert settings.requests == 2
+        assert settings.last_request[1]["If-None-Match"] == MODELS_ETAG
+    
+    # Server gone: the last fetched list is still served
+    assert stale.get("custom", lambda: provider) == ["mock-model"]
+
+
+def test_falls_back_to_static_list(tmp_path, isolated_config):
+    """Unavailable providers and filtered-out lists use SUPPORTED_PROVIDERS"""
+    catalog = ModelCatalog(tmp_path / "models")
+    assert catalog.get("anthropic", lambda: None) == SUPPORTED_PROVIDERS["anthropic"]["models"]
+    
+    with MockProviderServer(MockSettings()) as server:
+        # The mock's only model is not an OpenAI chat model
+        provider = OpenAIProvider("key", server.base_url)
+        assert provider.fetch_models() == ([], MODELS_ETAG)
+        assert catalog.get("openai", lambda: provider) == SUPPORTED_PROVIDERS["openai"]["models"]
+    assert not (tmp_path / "models" / "openai.json").exists()
+
+
+def test_cache_is_private_and_bound_to_base_url(tmp_path, isolated_config):
+    """Entries are written privately and a changed base URL is never served"""
+    settings = MockSettings()
+    with MockProviderServer(settings) as server:
+        provider = CustomProvider("", server.base_url)
+        catalog = ModelCatalog(tmp_path / "models", ttl=3600)
+        assert catalog.get("custom", lambda: provider, base_url=server.base_url) == ["mock-model"]
+        
+        assert ((tmp_path / "models").stat().st_mode & 0o777) == 0o700
+        assert ((tmp_path / "models" / "custom.json").stat().st_mode & 0o777) == 0o600
+        
+        # Fresh, but fetched from another server
+        moved = "http://127.0.0.1:9/v1"
+        assert catalog.get("custom", lambda: None, base_url=moved) == SUPPORTED_PROVIDERS["custom"]["models"]
+        assert settings.requests == 1
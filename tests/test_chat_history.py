@@ -0,0 +1,85 @@
+"""
+Tests for the chat history store
+"""
+
+import stat
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.chat_history import ChatHistoryStore  # noqa: E402
+
+
+def test_append_and_load_tail(tmp_path):
+    """Only the requested tail of the session is returned, oldest first"""
+    with ChatHistoryStore(tmp_path, "session", max_length=10) as store:
+        for i in range(6):
+            store.append("user" if i % 2 == 0 else "assistant", f"message {i}")
+    
+    store = ChatHistoryStore(tmp_path, "session", max_length=10)
+    assert len(store) == 6
+    # Trimmed to whole turns: an answer without its question is dropped
+    assert [m["content"] for m in store.load(3)] == ["message 4", "message 5"]
+    assert [m["content"] for m in store.load(4)] == ["message 2", "message 3", "message 4", "message 5"]
+    assert store.load()[0] == {"role": "user", "content": "message 0"}
+
+
+def test_rolling_window_compaction(tmp_path):
+    """The log is compacted to the window once it doubles in size"""
+    store = ChatHistoryStore(tmp_path, "session", max_length=4, sync_every=3)
+    for i in range(9):
+        store.append("user", f"line\n{i}")
+    store.close()
+    
+    assert len(store) == 4
+    assert [m["content"] for m in store.load()] == [f"line\n{i}" for i in range(5, 9)]
+
+
+def test_torn_record_is_skipped(tmp_path):
+    """A partially written trailing record does not break loading"""
+    with ChatHistoryStore(tmp_path, "session") as store:
+        store.append("user", "hello")
+        store.append("assistant", "hi")
+    
+    with open(store.log_path, "ab") as log_file:
+        log_file.write(b'{"role": "user", "cont')
+    with open(store.index_path, "ab") as index_file:
+        index_file.write((store.log_path.stat().st_size - 22).to_bytes(8, "little"))
+    
+    assert store.load() == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi"},
+    ]
+
+
+def test_session_id_is_sanitized(tmp_path):
+    """Session identifiers cannot escape the chat directory"""
+    store = ChatHistoryStore(tmp_path, "../../etc/passwd")
+    assert store.log_path.parent == tmp_path
+
+
+def test_session_files_are_private(tmp_path):
+    """The chat directory and session files are only accessible to their owner"""
+    directory = tmp_path / "chats"
+    with ChatHistoryStore(directory, "session", max_length=1) as store:
+        store.append("user", "secret")
+        store.append("assistant", "answer")
+        store.append("user", "again")
+    
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+    assert stat.S_IMODE(store.log_path.stat().st_mode) == 0o600
+    assert stat.S_IMODE(store.index_path.stat().st_mode) == 0o600
+
+
+def test_flush_without_sync_keeps_store_open(tmp_path):
+    """Records are visible after a non-syncing flush and appends keep working"""
+    store = ChatHistoryStore(tmp_path, "session")
+    store.append("user", "hello")
+    store.append("assistant", "hi")
+    store.flush(sync=False)
+    
+    assert len(ChatHistoryStore(tmp_path, "session").load()) == 2
+    store.append("user", "more")
+    store.close()
+    assert len(ChatHistoryStore(tmp_path, "session").load()) == 3
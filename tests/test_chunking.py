@@ -0,0 +1,144 @@
+"""
+Tests for chunked map-reduce over large inputs
+"""
+
+import asyncio
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.chunking import MapReduce, iter_chunks  # noqa: E402
+from drgpt.core.events import CompletionResult, ErrorEvent, Finish, Notice, TextDelta  # noqa: E402
+
+
+class FakeProvider:
+    def resize_pool(self, size):
+        pass
+
+
+class FakeAI:
+    def get_provider(self, name=None):
+        return FakeProvider()
+
+
+class FakeManager:
+    """Manager stub answering map prompts with their part number"""
+    
+    def __init__(self, fail_part=None):
+        self.config = {"DEFAULT_PROVIDER": "fake"}
+        self.ai = FakeAI()
+        self.fail_part = fail_part
+        self.prompts = []
+        self.messages = []
+        self.in_flight = 0
+        self.peak = 0
+    
+    async def aquery_events(self, prompt=None, executor=None, messages=None, **kwargs):
+        self.prompts.append(prompt)
+        self.messages.append(messages)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "Partial answer" in prompt:
+            yield TextDelta(f"combined({prompt.count('Partial answer ')})")
+        else:
+            part = prompt.split("(part ", 1)[1].split(")", 1)[0]
+            if part == self.fail_part:
+                yield ErrorEvent("rate limited", "network")
+                return
+            yield TextDelta(f"p{part}")
+        yield Finish()
+
+
+class CountingReader(io.StringIO):
+    """StringIO tracking the largest single read"""
+    
+    largest = 0
+    
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest = max(self.largest, len(data))
+        return data
+
+
+def test_chunks_are_bounded_and_overlap():
+    """Chunks respect the size limit, prefer line breaks and overlap"""
+    text = "".join(f"line {n:04d}\n" for n in range(500))
+    source = CountingReader(text)
+    
+    chunks = list(iter_chunks(source, 400, overlap=20))
+    
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert source.largest <= 400
+    assert chunks[1].startswith(chunks[0][-20:])
+    assert chunks[0] + "".join(chunk[20:] for chunk in chunks[1:]) == text
+
+
+def test_map_reduce_combines_all_parts():
+    """Every chunk is mapped concurrently and reduced into one answer"""
+    manager = FakeManager()
+    runner = MapReduce(manager, workers=4, chunk_size=100, overlap=0)
+    
+    result = CompletionResult.collect(runner.stream_events("count", io.StringIO("x" * 1000)))
+    
+    map_prompts = [prompt for prompt in manager.prompts if "Partial answer" not in prompt]
+    assert len(map_prompts) == 10
+    assert 1 < manager.peak <= 4
+    assert result.ok
+    assert result.notices and "10 parts" in result.notices[0]
+    assert result.text.startswith("combined(")
+    final = manager.prompts[-1]
+    assert final.startswith("count") and "p10" in final
+
+
+def test_final_request_keeps_history():
+    """Earlier turns of a chat are sent with the combining request only"""
+    manager = FakeManager()
+    runner = MapReduce(manager, workers=2, chunk_size=100, overlap=0)
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    
+    result = CompletionResult.collect(
+        runner.stream_events("count", io.StringIO("x" * 300), history=history)
+    )
+    
+    assert result.ok
+    assert manager.messages[:-1] == [None] * (len(manager.messages) - 1)
+    assert manager.messages[-1] == [*history, {"role": "user", "content": manager.prompts[-1]}]
+
+
+def test_map_reduce_reports_failures():
+    """A failed chunk ends the stream with its error"""
+    manager = FakeManager(fail_part="3")
+    runner = MapReduce(manager, workers=2, chunk_size=100, overlap=0)
+    
+    events = list(runner.stream_events("count", io.StringIO("x" * 1000)))
+    
+    assert events == [ErrorEvent("rate limited", "network")]
+    assert not any(isinstance(event, Notice) for event in events)
+
+
+def test_tiny_context_window_always_chunks(tmp_path, isolated_config, monkeypatch):
+    """A window smaller than the completion reserve chunks any input"""
+    import argparse
+    import importlib
+    
+    from drgpt.core import tokens
+    
+    # drgpt.cli re-exports main(), which shadows the module attribute
+    main = importlib.import_module("drgpt.cli.main")
+    monkeypatch.setattr(tokens, "context_window", lambda provider, model: tokens.MIN_COMPLETION_TOKENS // 2)
+    data = tmp_path / "input.txt"
+    data.write_text("small input")
+    args = argparse.Namespace(input=str(data), chunk=False, chunk_size=None, model="m",
+                              route=None, provider="openai", prompt="summarize")
+    
+    main._read_input(args)
+    
+    assert args.input_source is not None
+    assert args.input_head == "s"
+    assert args.prompt == "summarize"
+    args.input_source.close()
@@ -0,0 +1,94 @@
+"""
+Tests for configuration storage
+"""
+
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.config import Config  # noqa: E402
+
+
+def _count_writes(monkeypatch):
+    """Patch os.replace to count config writes"""
+    writes = []
+    replace = os.replace
+    
+    def counting_replace(src, dst):
+        writes.append(dst)
+        replace(src, dst)
+    
+    monkeypatch.setattr(os, "replace", counting_replace)
+    return writes
+
+
+def test_set_provider_writes_once(tmp_path, monkeypatch):
+    """Provider, model and base URL are saved in a single atomic write"""
+    test_config = Config(tmp_path / "config")
+    writes = _count_writes(monkeypatch)
+    
+    test_config.set_provider("anthropic", "claude-3-opus")
+    test_config.set("DEFAULT_MODEL", "claude-3-opus")  # unchanged, no write
+    
+    assert len(writes) == 1
+    reloaded = Config(tmp_path / "config")
+    assert reloaded.get("DEFAULT_PROVIDER") == "anthropic"
+    assert reloaded.get("DEFAULT_MODEL") == "claude-3-opus"
+    assert oct((tmp_path / "config").stat().st_mode & 0o777) == oct(0o600)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_transaction_rolls_back(tmp_path, monkeypatch):
+    """A failing transaction restores values and writes nothing"""
+    test_config = Config(tmp_path / "config")
+    writes = _count_writes(monkeypatch)
+    
+    with pytest.raises(RuntimeError):
+        with test_config.transaction():
+            test_config.set("TEMPERATURE", 0.1)
+            raise RuntimeError("abort")
+    
+    assert test_config.get("TEMPERATURE") == 0.7
+    assert writes == []
+
+
+def test_writers_merge_and_readers_refresh(tmp_path):
+    """Writers keep each other's keys and refresh() picks up changes"""
+    first = Config(tmp_path / "config")
+    second = Config(tmp_path / "config")
+    
+    first.set("TEMPERATURE", 0.2)
+    second.set("MAX_TOKENS", 100)
+    
+    assert Config(tmp_path / "config").get("TEMPERATURE") == 0.2
+    assert first.refresh() is True
+    assert first.get("MAX_TOKENS") == 100
+    assert first.refresh() is False
+
+
+def _set_many(path, key, count):
+    config = Config(Path(path))
+    for value in range(count):
+        config.set(key, value)
+
+
+def test_concurrent_processes_do_not_corrupt(tmp_path):
+    """Processes writing different keys at once all persist their keys"""
+    path = tmp_path / "config"
+    Config(path)
+    keys = ["MAX_TOKENS", "CACHE_LENGTH", "CHAT_CACHE_LENGTH"]
+    processes = [
+        multiprocessing.Process(target=_set_many, args=(str(path), key, 20)) for key in keys
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    
+    final = Config(path)
+    assert all(final.get(key) == 19 for key in keys)
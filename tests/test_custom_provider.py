@@ -0,0 +1,47 @@
+"""
+Tests for the OpenAI-compatible custom provider
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import AIInterface, CustomProvider, FallbackProvider  # noqa: E402
+from drgpt.core.events import CompletionResult, ErrorEvent, Usage  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "say three words"}]
+
+
+def test_streams_and_discovers_models(isolated_config):
+    """Completions stream from a local server and /models lists its models"""
+    settings = MockSettings(tokens=3)
+    with MockProviderServer(settings) as server:
+        provider = CustomProvider("", server.base_url)
+        result = CompletionResult.collect(provider.stream_events(MESSAGES, "mock-model"))
+        path, headers, body = settings.last_request
+        models = provider.get_models()
+    
+    assert path == "/v1/chat/completions"
+    assert "Authorization" not in headers
+    assert body["model"] == "mock-model"
+    assert result.text == "tok0 tok1 tok2 "
+    assert result.usage == Usage(3, 3)
+    assert models == ["mock-model"]
+
+
+def test_requires_base_url(isolated_config):
+    """Without CUSTOM_BASE_URL the canned fallback answers instead"""
+    ai = AIInterface()
+    assert isinstance(ai.get_provider("custom"), FallbackProvider)
+    assert "custom" not in ai.providers
+    
+    isolated_config.set("CUSTOM_BASE_URL", "http://127.0.0.1:9/v1/")
+    provider = ai.get_provider("custom")
+    assert isinstance(provider, CustomProvider)
+    assert provider.base_url == "http://127.0.0.1:9/v1"
+    
+    events = list(CustomProvider("", "").stream_events(MESSAGES, "mock-model"))
+    assert len(events) == 1 and isinstance(events[0], ErrorEvent)
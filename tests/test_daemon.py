@@ -0,0 +1,124 @@
+"""
+Tests for the alias daemon and its client
+"""
+
+import asyncio
+import io
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.core.events import Finish, TextDelta  # noqa: E402
+from drgpt.server import client  # noqa: E402
+from drgpt.server.daemon import DrGPTDaemon  # noqa: E402
+
+
+class FakeConfig(dict):
+    def refresh(self):
+        return False
+
+
+class FakeManager:
+    """Manager stub echoing the processed prompt"""
+    
+    def __init__(self):
+        self.config = FakeConfig(MAX_CONCURRENCY=2)
+        self.prompts = []
+    
+    async def aquery_events(self, prompt=None, mode="default", executor=None, **kwargs):
+        self.prompts.append((prompt, mode))
+        if mode == "shell":
+            yield TextDelta("```bash\nls -la\n```")
+        else:
+            yield TextDelta("hello ")
+            yield TextDelta("world")
+        yield Finish("stop")
+
+
+class DaemonThread:
+    """Run a DrGPTDaemon on a background event loop"""
+    
+    def __init__(self, manager, socket_path):
+        self.daemon = DrGPTDaemon(manager, str(socket_path))
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+    
+    def __enter__(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.daemon.start(), self.loop).result(5)
+        return self.daemon
+    
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.daemon.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+
+
+def test_client_streams_text_and_commands(tmp_path):
+    """Text is streamed back and shell commands are extracted"""
+    manager = FakeManager()
+    socket_path = tmp_path / "drgpt.sock"
+    output = io.StringIO()
+    
+    with DaemonThread(manager, socket_path):
+        assert (socket_path.stat().st_mode & 0o777) == 0o600
+        with client.connect(str(socket_path)) as sock:
+            reply = client.request(sock, {"prompt": "hi", "stdin": "data"}, out=output)
+            shell_reply = client.request(sock, {"prompt": "list files", "mode": "shell"}, out=output)
+            bad_reply = client.request(sock, {"prompt": "x", "mode": "nope"}, out=output)
+    
+    assert output.getvalue() == "hello world"
+    assert reply == {"done": True, "finish_reason": "stop"}
+    assert manager.prompts[0] == ("hi\n\nInput data:\ndata", "standard")
+    assert shell_reply["command"] == "ls -la"
+    assert "Unsupported mode" in bad_reply["error"]
+    assert not socket_path.exists()
+
+
+def test_client_starts_fast(tmp_path):
+    """The client imports nothing but the standard library"""
+    code = (
+        "import sys, time; start = time.perf_counter(); "
+        f"sys.path.insert(0, {str(PROJECT_ROOT / 'drgpt' / 'server')!r}); import client; "
+        "print(time.perf_counter() - start); "
+        "print(any(name.startswith(('drgpt', 'rich', 'requests')) for name in sys.modules))"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-S", "-c", code], capture_output=True, text=True, check=True)
+    total = time.perf_counter() - start
+    
+    import_time, imported_heavy = result.stdout.split()
+    assert imported_heavy == "False"
+    assert float(import_time) < 0.05
+    assert total < 1.0
+
+
+def test_foreign_socket_paths_are_refused(tmp_path, monkeypatch):
+    """Neither side uses a socket path it did not create itself"""
+    planted = tmp_path / "drgpt.sock"
+    planted.write_text("")
+    
+    with pytest.raises(PermissionError):
+        client.connect(str(planted))
+    with pytest.raises(PermissionError):
+        asyncio.run(DrGPTDaemon(FakeManager(), str(planted)).start())
+    assert planted.exists()
+    
+    # Without XDG_RUNTIME_DIR the socket lives in a private directory
+    monkeypatch.delenv("DRGPT_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    socket_path = Path(client.default_socket_path())
+    with DaemonThread(FakeManager(), socket_path):
+        assert socket_path.parent.parent == tmp_path
+        assert (socket_path.parent.stat().st_mode & 0o777) == 0o700
+        with client.connect() as sock:
+            assert client.request(sock, {"prompt": "hi"}, out=io.StringIO())["done"]
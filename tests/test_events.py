@@ -0,0 +1,67 @@
+"""
+Tests for typed completion events
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import AnthropicProvider, GoogleProvider, OpenAIProvider  # noqa: E402
+from drgpt.core.events import (  # noqa: E402
+    CompletionError, CompletionResult, ErrorEvent, Finish, TextDelta, Usage, iter_text
+)
+from drgpt.core.retry import RetryPolicy  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "say two words"}]
+
+
+def test_iter_text_adapter():
+    """The adapter yields text and reports errors in-band or raises"""
+    events = [TextDelta("a"), Usage(1, 1), TextDelta("b"), ErrorEvent("boom", "network")]
+    assert list(iter_text(events)) == ["a", "b", "Network error: boom"]
+    
+    with pytest.raises(CompletionError) as excinfo:
+        list(iter_text(events, raise_errors=True))
+    assert excinfo.value.event.message == "boom"
+
+
+@pytest.mark.parametrize("provider_class", [OpenAIProvider, AnthropicProvider, GoogleProvider])
+def test_providers_report_usage_and_finish(isolated_config, provider_class):
+    """Providers stream text, usage and a normalized finish reason"""
+    with MockProviderServer(MockSettings(tokens=2)) as server:
+        provider = provider_class("key", server.base_url)
+        result = CompletionResult.collect(provider.stream_events(MESSAGES, "mock"))
+    
+    assert result.text == "tok0 tok1 "
+    assert result.usage == Usage(3, 2)
+    assert result.finish_reason == "stop"
+    assert result.ok
+
+
+def test_errors_are_typed_and_not_cached(tmp_path, isolated_config, make_interface):
+    """A failed request yields an ErrorEvent and leaves the cache empty"""
+    isolated_config._config["CACHE_PATH"] = str(tmp_path / "cache")
+    with MockProviderServer(MockSettings(fail_requests=1, error_status=500)) as server:
+        ai = make_interface(openai=OpenAIProvider("key", server.base_url, RetryPolicy(max_attempts=1)))
+        
+        events = list(ai.stream_events("hi", provider="openai", model="mock", use_cache=True))
+        stats = ai.cache.stats()
+    
+    assert len(events) == 1
+    assert isinstance(events[0], ErrorEvent)
+    assert events[0].kind == "network"
+    assert stats["entries"] == 0
+
+
+def test_custom_provider_finishes():
+    """The fallback provider ends its stream with a Finish event"""
+    from drgpt.core.ai_interface import FallbackProvider
+    
+    events = list(FallbackProvider("", "").stream_events(MESSAGES, "custom-model"))
+    assert events[-1] == Finish("stop")
+    assert all(isinstance(event, TextDelta) for event in events[:-1])
@@ -0,0 +1,45 @@
+"""
+Tests for the Google Gemini provider
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import GoogleProvider  # noqa: E402
+from drgpt.core.events import CompletionResult, Usage  # noqa: E402
+from drgpt.core.retry import RetryPolicy  # noqa: E402
+
+MESSAGES = [
+    {"role": "system", "content": "be brief"},
+    {"role": "user", "content": "hello"},
+    {"role": "assistant", "content": "hi"},
+    {"role": "user", "content": "say"},
+    {"role": "user", "content": "three words"},
+]
+
+
+def test_request_mapping_and_retry(isolated_config):
+    """System messages map to systemInstruction and a 503 is retried"""
+    settings = MockSettings(tokens=3, fail_requests=1, error_status=503)
+    with MockProviderServer(settings) as server:
+        provider = GoogleProvider("secret", server.base_url, RetryPolicy(backoff_base=0.01))
+        result = CompletionResult.collect(
+            provider.stream_events(MESSAGES, "gemini-1.5-flash", max_tokens=64)
+        )
+    
+    path, headers, body = settings.last_request
+    assert path == "/v1/models/gemini-1.5-flash:streamGenerateContent?alt=sse"
+    assert headers["x-goog-api-key"] == "secret"
+    assert body["systemInstruction"] == {"parts": [{"text": "be brief"}]}
+    assert [content["role"] for content in body["contents"]] == ["user", "model", "user"]
+    assert len(body["contents"][-1]["parts"]) == 2
+    assert body["generationConfig"]["maxOutputTokens"] == 64
+    
+    assert settings.requests == 2
+    assert result.text == "tok0 tok1 tok2 "
+    assert result.usage == Usage(5, 3)
+    assert result.finish_reason == "stop"
@@ -0,0 +1,55 @@
+"""
+Tests for the usage ledger
+"""
+
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+from drgpt.core.events import Usage  # noqa: E402
+from drgpt.core.ledger import RECORD, UsageLedger  # noqa: E402
+
+
+def test_report_aggregates_incrementally(tmp_path):
+    """Reports fold only new records into the rollup and price known models"""
+    ledger = UsageLedger(tmp_path)
+    yesterday = time.time() - 86400
+    ledger.append("openai", "gpt-4o-mini", Usage(1_000_000, 0), 1.5, timestamp=yesterday)
+    ledger.append("openai", "gpt-4o-mini-2024-07-18", Usage(0, 1_000_000), 0.5)
+    ledger.append("custom", "llama3:8b", None, 2.0, status="error")
+    
+    rows = ledger.report()
+    assert [(row.provider, row.model, row.requests, row.errors) for row in rows] == [
+        ("openai", "gpt-4o-mini", 1, 0),
+        ("custom", "llama3:8b", 1, 1),
+        ("openai", "gpt-4o-mini-2024-07-18", 1, 0),
+    ]
+    assert rows[0].cost == 0.15 and rows[2].cost == 0.6
+    assert rows[1].cost is None
+    assert len(ledger.report(days=1)) == 2
+    
+    # Only the new record is read; a torn write is left for later
+    ledger.append("openai", "gpt-4o-mini-2024-07-18", Usage(10, 20), 0.1)
+    with open(ledger.path, "ab") as file:
+        file.write(b"\x00" * 5)
+    today = ledger.report(days=1)
+    assert today[-1].requests == 2 and today[-1].completion_tokens == 1_000_020
+    assert ledger.path.stat().st_size == 8 + 4 * RECORD.size + 5
+
+
+def test_requests_are_recorded(tmp_path, make_interface):
+    """Provider usage reported in-stream lands in the ledger"""
+    with MockProviderServer(MockSettings(tokens=3)) as server:
+        ai = make_interface(openai=OpenAIProvider("key", server.base_url))
+        list(ai.stream_events("say three words", provider="openai", model="mock"))
+    rows = ai.ledger.report()
+    
+    assert (tmp_path / "usage" / "usage.bin").exists()
+    assert len(rows) == 1
+    assert (rows[0].provider, rows[0].model, rows[0].requests) == ("openai", "mock", 1)
+    assert rows[0].completion_tokens == 3
@@ -0,0 +1,54 @@
+"""
+Tests for streaming Markdown rendering
+"""
+
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console  # noqa: E402
+
+from drgpt.utils.markdown_stream import MarkdownStreamRenderer  # noqa: E402
+
+
+def _console(terminal: bool = False) -> Console:
+    return Console(file=io.StringIO(), force_terminal=terminal, width=60, color_system=None)
+
+
+def test_completed_blocks_print_before_stream_ends():
+    """Paragraphs are printed as soon as a blank line completes them"""
+    console = _console()
+    renderer = MarkdownStreamRenderer(console)
+    
+    renderer.feed("First para")
+    assert console.file.getvalue() == ""
+    renderer.feed("graph.\n\nSecond")
+    assert "First paragraph." in console.file.getvalue()
+    assert "Second" not in console.file.getvalue()
+    
+    renderer.finish()
+    assert "Second" in console.file.getvalue()
+
+
+def test_blank_lines_inside_code_fence_do_not_split():
+    """A code block is only committed once its fence is closed"""
+    renderer = MarkdownStreamRenderer(_console())
+    renderer.feed("```python\nx = 1\n\ny = 2\n")
+    assert renderer._pending.startswith("```python")
+    assert renderer._in_fence
+    
+    renderer.feed("```\n\nDone")
+    assert renderer._pending == "Done"
+    renderer.finish()
+
+
+def test_live_region_is_transient_on_terminals():
+    """On a terminal the trailing block is shown live and then replaced"""
+    console = _console(terminal=True)
+    with MarkdownStreamRenderer(console, refresh_per_second=100) as renderer:
+        renderer.feed("# Title\n\nstreaming ```code")
+        assert renderer._live is not None
+    assert renderer._live is None
+    assert "streaming" in console.file.getvalue()
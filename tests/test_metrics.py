@@ -0,0 +1,50 @@
+"""
+Tests for request metrics and tracing
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+from drgpt.core.events import CompletionResult  # noqa: E402
+from drgpt.core.metrics import metrics  # noqa: E402
+
+
+async def _collect(events):
+    return CompletionResult.collect([event async for event in events])
+
+
+def test_traces_sync_and_async_requests(make_interface):
+    """Both request paths report connect, first token, gaps and bytes"""
+    traces = []
+    try:
+        with MockProviderServer(MockSettings(tokens=4, latency=0.05, token_rate=100)) as server:
+            ai = make_interface(openai=OpenAIProvider("key", server.base_url))
+            list(ai.stream_events("hi", provider="openai", model="mock"))
+            assert traces == []  # disabled: nothing is timed
+            
+            metrics.add_exporter(traces.append)
+            result = CompletionResult.collect(ai.stream_events("hi", provider="openai", model="mock"))
+            asyncio.run(_collect(ai.astream_events("hi", provider="openai", model="mock")))
+            exposition = metrics.render_prometheus()
+    finally:
+        metrics.remove_exporter(traces.append)
+        metrics.enabled = False
+        metrics.reset()
+    
+    assert result.text == "tok0 tok1 tok2 tok3 "
+    assert len(traces) == 2
+    for trace in traces:
+        assert trace.status == "ok" and trace.provider == "openai"
+        assert trace.connect is not None and trace.first_token >= 0.05
+        assert trace.duration >= trace.first_token >= trace.connect
+        assert trace.tokens == 4 and len(trace.gaps) == 3
+        assert trace.chunks > 0 and trace.bytes > 0
+    assert "first token" in traces[0].format()
+    assert 'drgpt_requests_total{provider="openai",model="mock",status="ok"} 2' in exposition
+    assert 'drgpt_inter_token_gap_seconds_count{provider="openai",model="mock"} 6' in exposition
@@ -0,0 +1,67 @@
+"""
+Tests for the provider registry and lazy provider creation
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.ai_interface import (  # noqa: E402
+    AIInterface, AnthropicProvider, CustomProvider, FallbackProvider
+)
+from drgpt.core.config import SUPPORTED_PROVIDERS  # noqa: E402
+from drgpt.core.events import Finish, TextDelta  # noqa: E402
+from drgpt.core.registry import ProviderRegistry  # noqa: E402
+
+
+class EchoProvider(CustomProvider):
+    """Plugin provider echoing the last message"""
+    
+    provider_config = {"base_url": "http://echo.invalid", "models": ["echo-1"], "requires_auth": False}
+    
+    def stream_events(self, messages, model, **kwargs):
+        yield TextDelta(messages[-1]["content"])
+        yield Finish()
+
+
+class FakeEntryPoint:
+    """Stand-in for importlib.metadata.EntryPoint"""
+    
+    name = "echo"
+    
+    def __init__(self):
+        self.loads = 0
+    
+    def load(self):
+        self.loads += 1
+        return EchoProvider
+
+
+def test_entry_points_load_on_first_lookup(monkeypatch):
+    """Plugins are imported only when looked up, and their config is added"""
+    entry_point = FakeEntryPoint()
+    registry = ProviderRegistry()
+    monkeypatch.setattr(registry, "_scan_entry_points", lambda: registry._providers.setdefault("echo", entry_point))
+    monkeypatch.delitem(SUPPORTED_PROVIDERS, "echo", raising=False)
+    
+    assert "echo" in registry
+    assert entry_point.loads == 0
+    assert registry.get("echo") is EchoProvider
+    assert registry.get("echo") is EchoProvider
+    assert entry_point.loads == 1
+    assert SUPPORTED_PROVIDERS["echo"]["models"] == ["echo-1"]
+    assert registry.get("missing") is None
+
+
+def test_providers_are_created_on_first_use(monkeypatch, isolated_config):
+    """Only requested providers with a key are instantiated"""
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "key")
+    isolated_config._config["DEFAULT_PROVIDER"] = "custom"
+    ai = AIInterface()
+    assert ai.providers == {}
+    
+    assert isinstance(ai.get_provider("anthropic"), AnthropicProvider)
+    assert isinstance(ai.get_provider("google"), FallbackProvider)  # no key
+    assert set(ai.providers) == {"anthropic"}
+    assert "openai" in ai.provider_names()
@@ -0,0 +1,94 @@
+"""
+Tests for the interactive REPL
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.cli.repl import Repl  # noqa: E402
+from drgpt.core.ai_interface import AnthropicProvider, OpenAIProvider, ai_interface  # noqa: E402
+from drgpt.core.manager import manager  # noqa: E402
+from drgpt.utils.console import console  # noqa: E402
+
+
+class ScriptedReader:
+    """Line reader returning prepared messages"""
+    
+    def __init__(self, lines):
+        self.lines = list(lines)
+    
+    def read_message(self, prompt):
+        if not self.lines:
+            raise EOFError
+        return self.lines.pop(0)
+    
+    def close(self):
+        pass
+
+
+class InterruptingWriter(io.StringIO):
+    """Console output that presses Ctrl-C at the first streamed token"""
+    
+    armed = False
+    
+    def write(self, text):
+        if self.armed and "tok" in text:
+            self.armed = False
+            raise KeyboardInterrupt
+        return super().write(text)
+
+
+def _args(**overrides):
+    values = dict(
+        provider="openai", model="mock", chat="test", code=False, shell=False, no_markdown=True,
+        temperature=None, max_tokens=None, no_cache=True, timings=False,
+    )
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_repl_keeps_session_and_switches_in_place(tmp_path, isolated_config):
+    """Turns share the history and pool, commands switch without a restart"""
+    from rich.console import Console
+    
+    output = InterruptingWriter()
+    isolated_config.set("CHAT_CACHE_PATH", str(tmp_path / "chats"))
+    ai_interface._reset_instance()
+    manager._reset_instance()
+    console._reset_instance(Console(file=output, width=100))
+    try:
+        settings = MockSettings(tokens=3)
+        with MockProviderServer(settings) as server:
+            openai = ai_interface.providers["openai"] = OpenAIProvider("key", server.base_url)
+            ai_interface.providers["anthropic"] = AnthropicProvider("key", server.base_url)
+            
+            repl = Repl(_args(), reader=ScriptedReader(["first question", "/mode code", "/mode"]))
+            repl.run()
+            assert repl.mode_name == "code" and "Mode: code" in output.getvalue()
+            
+            # Ctrl-C mid-stream is not recorded and leaves the session usable
+            repl.mode_name = "chat"
+            output.armed = True
+            repl.ask("interrupted question")
+            assert "Cancelled" in output.getvalue()
+            repl.ask("second question")
+            messages = settings.last_request[2]["messages"]
+            assert [message["content"] for message in messages if message["role"] == "user"] == [
+                "first question", "second question"
+            ]
+            assert ai_interface.providers["openai"] is openai
+            
+            repl.reader = ScriptedReader(["/provider anthropic", "/model mock", "third question", "/exit"])
+            repl.run()
+            assert settings.last_request[0].endswith("/messages")
+            assert settings.last_request[2]["model"] == "mock"
+            assert settings.requests == 4
+    finally:
+        for proxy in (ai_interface, manager, console):
+            proxy._reset_instance()
@@ -0,0 +1,67 @@
+"""
+Tests for retry and hedging
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+from drgpt.core.retry import RetryPolicy, hedged_call, parse_retry_after  # noqa: E402
+
+
+def test_backoff_and_retry_after():
+    """Delays grow exponentially, are capped and honor Retry-After"""
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0, jitter=False)
+    assert [policy.delay(attempt) for attempt in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+    assert policy.delay(1, retry_after="3") == 3.0
+    assert policy.delay(1, retry_after="120") == 5.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_provider_retries_retryable_status(isolated_config):
+    """429/5xx responses are retried before anything is streamed"""
+    settings = MockSettings(tokens=2, fail_requests=2, error_status=429, retry_after="0")
+    with MockProviderServer(settings) as server:
+        provider = OpenAIProvider("key", server.base_url, RetryPolicy(max_attempts=3, backoff_base=0))
+        chunks = list(provider.generate_completion([{"role": "user", "content": "hi"}], "mock"))
+    
+    assert chunks == ["tok0 ", "tok1 "]
+    assert settings.requests == 3
+
+
+def test_provider_gives_up_after_max_attempts(isolated_config):
+    """Errors are reported once the attempts are exhausted"""
+    settings = MockSettings(fail_requests=5, error_status=503)
+    with MockProviderServer(settings) as server:
+        provider = OpenAIProvider("key", server.base_url, RetryPolicy(max_attempts=2, backoff_base=0))
+        chunks = list(provider.generate_completion([{"role": "user", "content": "hi"}], "mock"))
+    
+    assert chunks[0].startswith("Network error: 503")
+    assert settings.requests == 2
+
+
+def test_hedged_call_takes_first_success():
+    """A slow first attempt is overtaken by the hedge and then discarded"""
+    calls = []
+    discarded = threading.Event()
+    
+    def call():
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            time.sleep(0.3)
+            return "slow"
+        return "fast"
+    
+    start = time.perf_counter()
+    result = hedged_call(call, 0.05, discard=lambda value: discarded.set())
+    
+    assert result == "fast"
+    assert time.perf_counter() - start < 0.25
+    assert discarded.wait(1.0)
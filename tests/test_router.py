@@ -0,0 +1,95 @@
+"""
+Tests for multi-provider routing and failover
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.events import CompletionResult, ErrorEvent, Finish, TextDelta, Usage  # noqa: E402
+from drgpt.core.router import RouteTarget, Router, parse_targets  # noqa: E402
+
+
+class ScriptedProvider:
+    """Provider replaying a fixed list of events"""
+    
+    def __init__(self, events):
+        self.events = events
+        self.calls = 0
+    
+    def stream_events(self, messages, model, **kwargs):
+        self.calls += 1
+        yield from self.events
+    
+    async def astream_events(self, messages, model, executor=None, **kwargs):
+        for event in self.stream_events(messages, model, **kwargs):
+            yield event
+
+
+def test_parse_targets():
+    """Targets keep their order, weights and colons inside model names"""
+    assert parse_targets(" openai:gpt-4o-mini@3, custom:llama3:8b ,") == [
+        RouteTarget("openai", "gpt-4o-mini", 3.0),
+        RouteTarget("custom", "llama3:8b", 1.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_targets("openai")
+    with pytest.raises(ValueError):
+        parse_targets("openai:gpt-4o@fast")
+
+
+def test_fails_over_before_first_token(make_interface):
+    """An early error moves to the next target without any output"""
+    failing = ScriptedProvider([Usage(5, 0), ErrorEvent("overloaded", "network")])
+    working = ScriptedProvider([TextDelta("hi"), Finish("stop")])
+    ai = make_interface(openai=failing, anthropic=working)
+    ai.set_routes("openai:gpt-4o-mini,anthropic:claude-3-haiku-20240307,google:gemini-pro")
+    ai.router.strategy = "ordered"
+    
+    result = CompletionResult.collect(ai.stream_events("hello", provider="auto"))
+    retried = CompletionResult.collect(ai.stream_events("hello", provider="auto"))
+    
+    assert result.ok and result.text == "hi"
+    assert result.usage is None  # the failed attempt's events are dropped
+    assert len(result.notices) == 1 and "openai:gpt-4o-mini failed" in result.notices[0]
+    # The failed target cools down, so the next request skips it
+    assert retried.text == "hi" and not retried.notices
+    assert (failing.calls, working.calls) == (1, 2)
+    assert ai.router.order()[-1] == RouteTarget("openai", "gpt-4o-mini")
+
+
+def test_errors_after_first_token_and_exhaustion(make_interface):
+    """Mid-stream errors pass through and a dead pool reports every failure"""
+    broken = ScriptedProvider([TextDelta("par"), ErrorEvent("reset", "network")])
+    down = ScriptedProvider([ErrorEvent("bad key")])
+    ai = make_interface(openai=broken, anthropic=down)
+    ai.set_routes("openai:gpt-4o-mini")
+    partial = list(ai.stream_events("hello", provider="auto"))
+    
+    ai.set_routes("anthropic:claude-3-haiku-20240307,google:gemini-pro")
+    events = asyncio.run(_collect(ai.astream_events("hello", provider="auto")))
+    
+    assert partial == [TextDelta("par"), ErrorEvent("reset", "network")]
+    assert type(events[-1]) is ErrorEvent
+    assert "anthropic:claude-3-haiku-20240307: bad key" in events[-1].message
+    assert "google:gemini-pro: provider is not configured" in events[-1].message
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+def test_latency_strategy_prefers_fastest_healthy_target():
+    """Faster targets go first and failing ones are penalized"""
+    targets = parse_targets("a:slow,b:fast,c:flaky")
+    router = Router(None, targets, strategy="latency", explore=0)
+    router.stats[targets[0]].record_success(2.0)
+    router.stats[targets[1]].record_success(0.5)
+    router.stats[targets[2]].record_success(0.1)
+    router.stats[targets[2]].record_failure()
+    
+    assert router.order() == [targets[1], targets[0], targets[2]]
@@ -0,0 +1,117 @@
+"""
+Tests for the OpenAI-compatible server
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+from drgpt.core.config import config  # noqa: E402
+from drgpt.core.manager import DrGPTManager  # noqa: E402
+from drgpt.server import OpenAICompatServer  # noqa: E402
+
+
+class ServerThread:
+    """Run an OpenAICompatServer on a background event loop"""
+    
+    def __init__(self, manager):
+        self.lines = []
+        self.server = OpenAICompatServer(manager, port=0, workers=4, log=self.lines.append)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+    
+    def __enter__(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result(5)
+        host, port = self.server.address
+        self.url = f"http://{host}:{port}/v1"
+        return self
+    
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+
+
+@pytest.fixture
+def make_manager(make_interface):
+    """Factory for managers whose only provider is OpenAI at base_url"""
+    def make(base_url):
+        manager = DrGPTManager.__new__(DrGPTManager)
+        manager.config = config._get_instance()
+        manager.ai = make_interface(openai=OpenAIProvider("key", base_url))
+        return manager
+    return make
+
+
+def test_chat_completions(make_manager):
+    """Non-streaming and streaming completions follow the OpenAI format"""
+    body = {"model": "openai/mock", "messages": [{"role": "user", "content": "hi there"}]}
+    with MockProviderServer(MockSettings(tokens=3)) as upstream, ServerThread(make_manager(upstream.base_url)) as server:
+        with requests.Session() as session:
+            response = session.post(f"{server.url}/chat/completions", json=body)
+            streamed = session.post(
+                f"{server.url}/chat/completions",
+                json=dict(body, stream=True, stream_options={"include_usage": True}),
+                stream=True,
+            )
+            frames = [line[6:] for line in streamed.iter_lines() if line.startswith(b"data: ")]
+            invalid = session.post(f"{server.url}/chat/completions", json={"messages": []})
+    
+    data = response.json()
+    assert response.status_code == 200
+    assert data["choices"][0]["message"]["content"] == "tok0 tok1 tok2 "
+    assert data["choices"][0]["finish_reason"] == "stop"
+    assert data["usage"] == {"prompt_tokens": 2, "completion_tokens": 3, "total_tokens": 5}
+    
+    assert frames[-1] == b"[DONE]"
+    chunks = [json.loads(frame) for frame in frames[:-1]]
+    text = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks if chunk["choices"])
+    assert text == "tok0 tok1 tok2 "
+    assert chunks[-1]["usage"]["completion_tokens"] == 3
+    
+    assert invalid.status_code == 400
+    assert "messages" in invalid.json()["error"]["message"]
+    assert server.lines[0].startswith("POST /v1/chat/completions 200 ")
+
+
+def test_provider_errors_become_http_errors(isolated_config, make_manager):
+    """A failing provider is reported as 502 with an error body"""
+    isolated_config._config["RETRY_MAX_ATTEMPTS"] = 1
+    body = {"model": "openai/mock", "messages": [{"role": "user", "content": "hi"}], "stream": True}
+    with MockProviderServer(MockSettings(fail_requests=1, error_status=500)) as upstream, \
+            ServerThread(make_manager(upstream.base_url)) as server:
+        response = requests.post(f"{server.url}/chat/completions", json=body)
+    
+    assert response.status_code == 502
+    assert response.json()["error"]["type"] == "provider_error"
+
+
+def test_malformed_messages_and_internal_errors(make_manager):
+    """Messages that are not role/content objects get a 400, unexpected failures a 500"""
+    
+    def broken():
+        raise RuntimeError("boom")
+    
+    manager = make_manager("http://127.0.0.1:9")
+    manager.list_providers = broken
+    with ServerThread(manager) as server:
+        with requests.Session() as session:
+            invalid = session.post(f"{server.url}/chat/completions", json={"messages": ["hi"]})
+            failed = session.get(f"{server.url}/models")
+    
+    assert invalid.status_code == 400
+    assert "messages[0]" in invalid.json()["error"]["message"]
+    assert failed.status_code == 500
+    assert failed.json()["error"]["type"] == "server_error"
+    assert "boom" in server.lines[-2]
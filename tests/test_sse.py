@@ -0,0 +1,42 @@
+"""
+Tests for the incremental SSE decoder
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drgpt.core.ai_interface import SSEDecoder, SSEEvent  # noqa: E402
+
+
+def _decode(*chunks):
+    decoder = SSEDecoder()
+    events = []
+    for chunk in chunks:
+        events.extend(decoder.feed(chunk))
+    events.extend(decoder.flush())
+    return events
+
+
+def test_frames_split_across_reads():
+    """Events spanning several network reads are reassembled"""
+    events = _decode(b'data: {"a"', b': 1}\n', b'\ndata: [DONE]\n\n')
+    assert events == [SSEEvent("message", b'{"a": 1}'), SSEEvent("message", b"[DONE]")]
+
+
+def test_event_field_multiline_data_and_crlf():
+    """event: names the event and multiple data: lines are joined"""
+    events = _decode(b"event: delta\r\ndata: line1\r\ndata:line2\r\n\r\n")
+    assert events == [SSEEvent("delta", b"line1\nline2")]
+
+
+def test_keep_alives_and_comments_are_skipped():
+    """Comment lines and empty frames produce no events"""
+    events = _decode(b": keep-alive\n\n\n\nid: 7\nretry: 10\n\ndata: x\n\n")
+    assert events == [SSEEvent("message", b"x")]
+
+
+def test_unterminated_final_event_is_flushed():
+    """A trailing event without a blank line is still delivered"""
+    assert _decode(b"data: last") == [SSEEvent("message", b"last")]
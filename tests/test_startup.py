@@ -0,0 +1,67 @@
+"""
+Startup tests for DrGPT
+
+Guards the lazy import behaviour: importing the package must not touch
+the user's config or import heavy dependencies, and cheap commands must
+stay within their import budget.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+from bench_startup import BUDGETS_MS, parse_importtime, run_command  # noqa: E402
+
+
+def _run_python(code: str, home: Path) -> subprocess.CompletedProcess:
+    env = dict(os.environ, HOME=str(home), PYTHONPATH=str(PROJECT_ROOT))
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(home),
+    )
+
+
+def test_package_import_is_side_effect_free(tmp_path):
+    """Importing drgpt must not create config or import heavy modules"""
+    result = _run_python("import drgpt, drgpt.core, drgpt.cli.main", tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert not (tmp_path / ".config").exists()
+    
+    _, modules = parse_importtime(result.stderr)
+    for name in ("rich", "requests", "packaging"):
+        assert name not in modules
+
+
+def test_lazy_instances_construct_on_first_use(tmp_path):
+    """Accessing the config proxy builds the real Config instance"""
+    result = _run_python(
+        "from drgpt import config, get_config\n"
+        "assert not config._is_initialized()\n"
+        "assert config.get('DEFAULT_PROVIDER') == 'openai'\n"
+        "assert config._get_instance() is get_config()\n",
+        tmp_path,
+    )
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / ".config" / "drgpt" / "config").exists()
+
+
+def test_cli_startup_budget(tmp_path):
+    """Cheap CLI commands stay within the budget bench_startup.py --check enforces"""
+    for command, budget in BUDGETS_MS.items():
+        samples = [run_command(command, str(tmp_path)) for _ in range(3)]
+        sample = samples[-1]
+        assert sample["returncode"] == 0, command
+        assert "requests" not in sample["heavy_modules"], command
+        assert "packaging" not in sample["heavy_modules"], command
+        # Median of cold runs, as --check compares
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        assert import_ms <= budget, (command, import_ms)
@@ -0,0 +1,112 @@
+"""
+Tests for cancellable completion streams
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+from drgpt.core.events import ErrorEvent, Finish, TextDelta  # noqa: E402
+from drgpt.core.retry import RetryPolicy  # noqa: E402
+from drgpt.core.stream import CompletionStream  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _provider(server):
+    return OpenAIProvider("key", server.base_url, RetryPolicy(max_attempts=1))
+
+
+def test_cancel_interrupts_a_blocked_read(isolated_config):
+    """cancel() from another thread ends the stream without waiting for the next token"""
+    settings = MockSettings(tokens=3, token_rate=0.5)
+    with MockProviderServer(settings) as server:
+        provider = _provider(server)
+        stream = provider.generate_completion(MESSAGES, "mock")
+        assert next(stream) == "tok0 "
+        
+        threading.Timer(0.1, stream.cancel).start()
+        started = time.monotonic()
+        rest = list(stream)
+        elapsed = time.monotonic() - started
+        
+        # The aborted connection is discarded and the pool still works
+        settings.token_rate = 0
+        text = "".join(provider.generate_completion(MESSAGES, "mock"))
+    
+    assert rest == []
+    assert stream.cancelled
+    assert elapsed < 1.0
+    assert text == "tok0 tok1 tok2 "
+    assert len(settings.peers) == 2
+
+
+def test_idle_timeout_reports_a_timeout_error(isolated_config):
+    """A stream waiting too long for a token ends with a timeout ErrorEvent"""
+    with MockProviderServer(MockSettings(tokens=3, token_rate=1.0)) as server:
+        events = CompletionStream(_provider(server).stream_events(MESSAGES, "mock"), idle_timeout=0.3)
+        started = time.monotonic()
+        collected = list(events)
+        elapsed = time.monotonic() - started
+    
+    assert collected[0] == TextDelta("tok0 ")
+    assert collected[-1] == ErrorEvent("No tokens received for 0.3s", "timeout")
+    assert elapsed < 1.0
+
+
+def test_deadline_from_config(isolated_config):
+    """STREAM_DEADLINE bounds a whole completion, however steady its tokens"""
+    isolated_config._config["STREAM_DEADLINE"] = 0.5
+    with MockProviderServer(MockSettings(tokens=50, token_rate=10)) as server:
+        text = "".join(_provider(server).generate_completion(MESSAGES, "mock"))
+    
+    assert text.startswith("tok0 ")
+    assert text.endswith("Error: Completion exceeded its 0.5s deadline")
+
+
+def test_close_before_the_end_closes_the_response(isolated_config):
+    """Closing a stream early discards its connection instead of reusing it"""
+    settings = MockSettings(tokens=20)
+    with MockProviderServer(settings) as server:
+        provider = _provider(server)
+        with provider.generate_completion(MESSAGES, "mock") as stream:
+            assert next(stream) == "tok0 "
+        events = list(provider.stream_events(MESSAGES, "mock"))
+    
+    assert list(stream) == []
+    assert type(events[-1]) is Finish
+    assert len(settings.peers) == 2
+
+
+def test_async_stream_closes_while_a_worker_reads(isolated_config):
+    """Cancelling an async consumer tears down the response on the worker thread"""
+    
+    async def consume(provider):
+        chunks = []
+        
+        async def read():
+            async for chunk in provider.agenerate_completion(MESSAGES, "mock"):
+                chunks.append(chunk)
+        
+        task = asyncio.ensure_future(read())
+        await asyncio.sleep(0.3)
+        task.cancel()
+        started = time.monotonic()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return chunks, time.monotonic() - started
+    
+    with MockProviderServer(MockSettings(tokens=3, token_rate=0.5)) as server:
+        chunks, elapsed = asyncio.run(consume(_provider(server)))
+    
+    assert chunks == ["tok0 "]
+    assert elapsed < 1.0
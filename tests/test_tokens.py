@@ -0,0 +1,123 @@
+"""
+Tests for token counting and context window fitting
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.core.events import Finish, Notice, TextDelta, iter_text  # noqa: E402
+from drgpt.core.tokens import (  # noqa: E402
+    HeuristicTokenizer, TokenCounter, context_window, fit_messages
+)
+
+
+class CountingTokenizer(HeuristicTokenizer):
+    """Heuristic tokenizer recording how much text it was given"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def count(self, text: str) -> int:
+        self.calls += 1
+        return super().count(text)
+
+
+def test_message_counts_are_cached():
+    """Re-counting a growing history only tokenizes the new message"""
+    tokenizer = CountingTokenizer()
+    counter = TokenCounter(tokenizer)
+    history = [{"role": "user", "content": "x" * 40}, {"role": "assistant", "content": "y" * 40}]
+    
+    first = counter.count_messages(history)
+    calls = tokenizer.calls
+    history.append({"role": "user", "content": "z" * 40})
+    second = counter.count_messages([dict(message) for message in history])
+    
+    assert second > first
+    assert tokenizer.calls == calls + 2  # role and content of the new message
+
+
+def test_context_window_lookup():
+    """Models match exactly, by longest prefix, or get the provider default"""
+    assert context_window("openai", "gpt-4") == 8192
+    assert context_window("openai", "gpt-4o-mini-2024-07-18") == 128000
+    assert context_window("anthropic", "claude-3-opus") == 200000
+    assert context_window("custom", "anything") is None
+
+
+def test_fit_drops_oldest_history():
+    """System prompt and latest message survive, older turns are dropped"""
+    system = {"role": "system", "content": "be brief"}
+    old = [{"role": "user", "content": "word " * 3000} for _ in range(4)]
+    latest = {"role": "user", "content": "and now?"}
+    
+    fit = fit_messages([system, *old, latest], "openai", "gpt-4", max_tokens=512)
+    
+    assert fit.messages[0] is system
+    assert fit.messages[-1] is latest
+    assert len(fit.messages) < 6
+    assert fit.prompt_tokens + fit.max_tokens <= 8192
+    assert "Dropped" in fit.notices[0]
+
+
+def test_fit_drops_whole_turns():
+    """An answer is never left in front of the history without its question"""
+    system = {"role": "system", "content": "be brief"}
+    history = []
+    for _ in range(3):
+        history.append({"role": "user", "content": "word " * 3000})
+        history.append({"role": "assistant", "content": "short answer"})
+    latest = {"role": "user", "content": "word " * 1500}
+    
+    fit = fit_messages([system, *history, latest], "openai", "gpt-4", max_tokens=512)
+    
+    assert fit.messages[0] is system
+    assert fit.messages[1]["role"] == "user"
+    assert fit.messages[-1] is latest
+    assert (len(fit.messages) - 2) % 2 == 0
+
+
+def test_fit_rejects_malformed_messages():
+    """Non-dictionary messages raise a ValueError naming the message"""
+    with pytest.raises(ValueError, match="Message 1"):
+        fit_messages([{"role": "user", "content": "hi"}, "oops"], "openai", "gpt-4")
+
+
+def test_fit_clamps_max_tokens():
+    """max_tokens shrinks to the space left after the prompt"""
+    messages = [{"role": "user", "content": "word " * 6000}]
+    
+    fit = fit_messages(messages, "openai", "gpt-4", max_tokens=4096)
+    
+    assert fit.messages == messages
+    assert fit.max_tokens == 8192 - fit.prompt_tokens
+    assert "max_tokens" in fit.notices[-1]
+
+
+def test_notices_reach_the_caller(make_interface):
+    """AIInterface sends the fitted request and reports adjustments first"""
+    sent = {}
+    
+    class RecordingProvider:
+        def stream_events(self, messages, model, **kwargs):
+            sent["max_tokens"] = kwargs["max_tokens"]
+            yield TextDelta("ok")
+            yield Finish()
+    
+    ai = make_interface(openai=RecordingProvider())
+    
+    events = list(ai.stream_events(
+        "word " * 6000, provider="openai", model="gpt-4", max_tokens=4096, use_cache=False
+    ))
+    notices = []
+    text = "".join(iter_text(events, on_notice=notices.append))
+    
+    assert isinstance(events[0], Notice)
+    assert notices == [events[0].message]
+    assert sent["max_tokens"] < 4096
+    assert text == "ok"
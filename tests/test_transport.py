@@ -0,0 +1,66 @@
+"""
+Tests for the provider HTTP transport
+"""
+
+import socket
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from drgpt.bench.mock_server import MockProviderServer, MockSettings  # noqa: E402
+from drgpt.core.ai_interface import OpenAIProvider  # noqa: E402
+from drgpt.core.config import Config  # noqa: E402
+from drgpt.core.retry import RetryPolicy  # noqa: E402
+from drgpt.core.transport import TransportSettings, create_session, keepalive_socket_options, pool_size_of  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def test_settings_from_config(tmp_path):
+    """Timeouts, pool size and proxy come from config"""
+    test_config = Config(tmp_path / "config")
+    test_config._config.update({
+        "REQUEST_TIMEOUT": 30, "CONNECT_TIMEOUT": 2, "HTTP_POOL_SIZE": 4,
+        "PROXY_URL": "http://proxy.local:3128", "CA_BUNDLE": "/etc/ssl/bundle.pem",
+    })
+    settings = TransportSettings.from_config(test_config)
+    session = create_session(settings)
+    
+    assert settings.timeout == (2.0, 30.0)
+    assert pool_size_of(session) == 4
+    assert session.proxies["https"] == "http://proxy.local:3128"
+    assert session.verify == "/etc/ssl/bundle.pem"
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in keepalive_socket_options()
+
+
+def test_http2_falls_back_without_httpx():
+    """Requesting HTTP/2 without httpx installed keeps a pooled HTTP/1.1 adapter"""
+    session = create_session(TransportSettings(pool_size=3, http2=True))
+    assert pool_size_of(session) == 3
+
+
+def test_connections_are_reused(isolated_config):
+    """Sequential requests share one kept-alive connection"""
+    settings = MockSettings(tokens=2)
+    with MockProviderServer(settings) as server:
+        provider = OpenAIProvider("key", server.base_url)
+        for _ in range(3):
+            assert "".join(provider.generate_completion(MESSAGES, "mock")) == "tok0 tok1 "
+    
+    assert settings.requests == 3
+    assert len(settings.peers) == 1
+
+
+def test_read_timeout_is_configurable(isolated_config):
+    """REQUEST_TIMEOUT bounds the wait for a response"""
+    with MockProviderServer(MockSettings(latency=1.0)) as server:
+        provider = OpenAIProvider(
+            "key", server.base_url, RetryPolicy(max_attempts=1),
+            TransportSettings(read_timeout=0.2)
+        )
+        text = "".join(provider.generate_completion(MESSAGES, "mock"))
+    
+    assert text.startswith("Network error:")
+    assert "timed out" in text